@@ -27,6 +27,18 @@ if "scheduler_initialized" not in st.session_state:
     init_scheduler()
     st.session_state.scheduler_initialized = True
 
+# ============================================================
+# CrossEncoder Reranker 백그라운드 워밍업 (프로세스당 1회)
+# ============================================================
+if "reranker_warmup_started" not in st.session_state:
+    try:
+        from rag.reranker import warm_up_reranker
+
+        warm_up_reranker()
+    except ImportError as e:
+        logger.warning(f"Reranker warm-up skipped: {e}")
+    st.session_state.reranker_warmup_started = True
+
 # Page configuration
 st.set_page_config(
     page_title="미국 재무제표 분석 및 투자 인사이트 봇",
@@ -2,7 +2,6 @@
 import os
 import sys
 import logging
-import time
 from pathlib import Path
 from tqdm import tqdm
 
@@ -44,10 +43,19 @@ def build_relationships(batch_size=50, limit=1000, offset=0):
             # 병렬 처리를 위해 extracted_from 체크는 로컬 메모리보단 건너뛰기 전략이 낫지만
             # 일단 안전을 위해 체크합니다. 
             # (주의: 병렬 실행 시 processed_docs가 실시간 동기화되진 않지만, 중복 저장은 큰 문제 없습니다)
-            rels = supabase.table("company_relationships").select("extracted_from").execute()
+            try:
+                rels = (
+                    supabase.table("company_relationships")
+                    .select("extracted_from, source_documents")
+                    .execute()
+                )
+            except Exception:
+                # source_documents 컬럼 미배포
+                rels = supabase.table("company_relationships").select("extracted_from").execute()
             for r in rels.data:
                 if r.get("extracted_from"):
-                    processed_docs.add(r["extracted_from"])
+                    processed_docs.add(str(r["extracted_from"]))
+                processed_docs.update(str(doc_id) for doc_id in r.get("source_documents") or [])
             logger.info(f"✅ 이미 처리된 문서: {len(processed_docs)}개")
         except Exception as e:
             logger.warning(f"⚠️ 기처리 문서 확인 실패: {e}")
@@ -69,8 +77,9 @@ def build_relationships(batch_size=50, limit=1000, offset=0):
         total_extracted = 0
         skipped_count = 0
         
-        # 2. 문서별 관계 추출
-        for i, doc in enumerate(tqdm(documents, desc="Processing Documents")):
+        # 처리 대상 선별
+        pending = []
+        for doc in documents:
             doc_id = doc.get("id")
             
             # 이미 처리된 문서면 건너뛰기
@@ -85,32 +94,46 @@ def build_relationships(batch_size=50, limit=1000, offset=0):
             source_ticker = None
             if isinstance(metadata, dict):
                 source_ticker = metadata.get("ticker")
-            
+
             # 텍스트가 너무 짧으면 스킵
             if len(content) < 100:
                 continue
                 
-            # 관계 추출 (LLM 호출)
-            # 비용 절약을 위해 텍스트 앞부분 2000자만 사용
-            relationships = graph_rag.extract_relationships(content[:2000], source_ticker=source_ticker)
-            
-            if relationships:
-                # 저장
-                saved_count = graph_rag.save_relationships(
-                    relationships, 
-                    extracted_from=str(doc_id),
-                    filing_date=doc.get("metadata", {}).get("date")
+            pending.append((doc, {"text": content, "source_ticker": source_ticker}))
+
+        # 2. 관계 일괄 추출 (여러 청크를 한 요청으로 묶어 동시 실행, 결과는 청크 해시로 캐시)
+        # 비용 절약을 위해 텍스트 앞부분 2000자만 사용
+        chunks_per_request = int(os.getenv("EXTRACT_CHUNKS_PER_REQUEST", "8"))
+        max_concurrency = int(os.getenv("EXTRACT_CONCURRENCY", "4"))
+
+        with tqdm(total=len(pending), desc="Processing Documents") as progress:
+            for start in range(0, len(pending), batch_size):
+                window = pending[start : start + batch_size]
+                extracted = graph_rag.extract_relationships_batch(
+                    [chunk for _, chunk in window],
+                    chunks_per_request=chunks_per_request,
+                    max_concurrency=max_concurrency,
+                    max_chars=2000,
                 )
-                total_extracted += saved_count
-                
-            # Rate Limit 방지
-            time.sleep(0.5)
-            
-            if (i + 1) % batch_size == 0:
-                logger.info(f"🔄 중간 집계: {i+1}/{len(documents)} 처리, {total_extracted}개 관계 저장")
+
+                # 윈도우 내 모든 문서의 관계를 모아 한 번에 저장 (문서 간 중복 관계 병합, 출처 누적)
+                window_relationships = []
+                for (doc, _), relationships in zip(window, extracted):
+                    for rel in relationships or []:
+                        window_relationships.append({
+                            **rel,
+                            "extracted_from": str(doc.get("id")),
+                            "filing_date": (doc.get("metadata") or {}).get("date"),
+                        })
+                if window_relationships:
+                    total_extracted += graph_rag.save_relationships(window_relationships)
+
+                progress.update(len(window))
+                logger.info(f"🔄 중간 집계: {start + len(window)}/{len(pending)} 처리, {total_extracted}개 관계 저장")
 
         logger.info("="*50)
         logger.info(f"🎉 완료! 총 {total_extracted}개의 새로운 기업 관계가 추출되었습니다. (Skipped: {skipped_count})")
+        logger.info(f"⚠️ 티커 누락/자기 참조로 저장하지 않은 관계: {graph_rag.skipped_relationships}")
         logger.info("="*50)
 
     except Exception as e:
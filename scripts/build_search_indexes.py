@@ -0,0 +1,61 @@
+"""
+로컬 검색 인덱스 빌드 (Vector Index + BM25 Keyword Index)
+
+Supabase documents 테이블을 읽어 data/vector_store/ 아래에
+- LocalVectorIndex (USE_LOCAL_VECTOR_INDEX=true 시 similarity_search에서 사용)
+- BM25Index (hybrid_search 키워드 검색에서 자동 사용)
+를 생성합니다.
+
+usage: python scripts/build_search_indexes.py [--skip-vector] [--skip-bm25]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from supabase import create_client
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from rag.local_index import LocalVectorIndex
+from rag.bm25_index import BM25Index
+
+load_dotenv()
+
+
+def main():
+    print("=" * 60)
+    print("🗂️ 로컬 검색 인덱스 빌드")
+    print("=" * 60)
+
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_KEY")
+    if not supabase_url or not supabase_key:
+        raise ValueError("SUPABASE_URL과 SUPABASE_KEY 환경 변수가 필요합니다.")
+
+    supabase = create_client(supabase_url, supabase_key)
+
+    vector_built = False
+    if "--skip-vector" not in sys.argv:
+        start = time.time()
+        index = LocalVectorIndex(supabase=supabase)
+        count = index.build()
+        index.load()  # HNSW/양자화 파일도 미리 생성 (실행 중인 앱은 버전 변경을 감지해 재로드)
+        print(f"✅ Vector index: {count}개 문서 ({time.time() - start:.1f}s)")
+        vector_built = True
+
+    if "--skip-bm25" not in sys.argv:
+        start = time.time()
+        # 벡터 인덱스와 함께 빌드하면 청크 본문은 documents_meta.json을 공유
+        if vector_built:
+            count = BM25Index().build_from_local_index()
+        else:
+            count = BM25Index().build_from_supabase(supabase)
+        print(f"✅ BM25 index: {count}개 문서 ({time.time() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
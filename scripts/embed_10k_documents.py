@@ -3,27 +3,61 @@
 
 수집된 10-K 텍스트 파일(data/10k_documents/)을 읽어와서
 청킹(Chunking) 후 OpenAI 임베딩을 생성하여 Supabase에 저장합니다.
+
+파이프라인 구조:
+    청킹(main) -> 임베딩(동시 N개, rate limit) -> 업로드(별도 스레드) -> 체크포인트 기록
+- 체크포인트(data/10k_documents/embed_manifest.jsonl)에 (ticker, section, chunk hash)를 기록하여
+  재실행 시 완료된 청크는 건너뜁니다.
+- 문서 ID는 (ticker, section, chunk hash)로부터 결정적으로 생성하고 upsert하므로
+  중단 후 재실행해도 중복 행이 생기지 않습니다. (규칙은 src/rag/document_ids.py -
+  VectorStore.add_documents(dedup=True)와 공유, 해시는 metadata.content_hash에 저장)
+- 업로드가 끝나면 (ticker, section)별로 새 청크 집합에 없는 기존 행(수정/삭제된 문단)을
+  삭제하고 체크포인트에서도 제거합니다. 내용이 같아 다시 임베딩하지 않은 청크도
+  위치(chunk_index 등 metadata)가 바뀌었으면 metadata만 갱신합니다.
+  (실패가 있었던 기업은 다음 실행으로 미룸)
+- 임베딩 호출 속도는 공용 토큰 버킷(src/tools/rate_limiter.py)으로 제한합니다.
+
+usage: python scripts/embed_10k_documents.py [--fresh] [TICKER ...]
+    --fresh: 체크포인트를 무시하고 대상 기업의 기존 문서를 삭제 후 다시 임베딩
 """
 
+import json
 import os
+import queue
+import sys
+import threading
 import time
-import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, List, Set, Tuple
 import pandas as pd
 from dotenv import load_dotenv
 from openai import OpenAI
 from supabase import create_client
 from langchain_classic.text_splitter import RecursiveCharacterTextSplitter
 
+# src 디렉토리를 path에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from rag.document_ids import content_hash, document_id
+from tools.rate_limiter import TokenBucketLimiter
+
 load_dotenv()
 
 # 설정
 DATA_DIR = Path("data/10k_documents")
+MANIFEST_PATH = DATA_DIR / "embed_manifest.jsonl"
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBED_BATCH_SIZE = 100  # 임베딩 요청당 청크 수
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))  # 동시 임베딩 요청 수
+EMBED_REQUESTS_PER_MINUTE = int(os.getenv("EMBED_RPM", "300"))
+UPLOAD_BATCH_SIZE = 200  # Supabase upsert 배치 크기
+MAX_RETRIES = 5
+
 if not all([SUPABASE_URL, SUPABASE_KEY, OPENAI_API_KEY]):
     raise ValueError("필수 환경 변수(.env)가 설정되지 않았습니다.")
 
@@ -39,21 +73,77 @@ text_splitter = RecursiveCharacterTextSplitter(
 )
 
 
-def get_embedding(text: str) -> List[float]:
-    """OpenAI 임베딩 생성"""
-    text = text.replace("\n", " ")
-    return (
-        openai_client.embeddings.create(input=[text], model="text-embedding-3-small")
-        .data[0]
-        .embedding
-    )
-
-
-def process_company_documents(ticker: str, directory: Path):
-    """특정 기업의 문서를 처리하여 업로드"""
-    print(f"\n📄 {ticker} 문서 처리 중...")
-
-    # 처리할 파일 목록
+# 임베딩 콜백 스레드와 업로드 스레드가 함께 갱신하는 stats 보호
+_stats_lock = threading.Lock()
+
+
+def count_uploaded(stats: Dict, documents: List[Dict]):
+    with _stats_lock:
+        stats["uploaded"] += len(documents)
+
+
+def count_failed(stats: Dict, documents: List[Dict]):
+    with _stats_lock:
+        stats["failed"] += len(documents)
+        stats["failed_tickers"].update(doc["metadata"]["ticker"] for doc in documents)
+
+
+class Manifest:
+    """완료된 (ticker, section, chunk hash) 체크포인트 (JSONL append)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.done: Set[Tuple[str, str, str]] = set()
+        self._lock = threading.Lock()
+
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                        self.done.add((row["ticker"], row["section"], row["hash"]))
+                    except (ValueError, KeyError):
+                        continue  # 중단 시 잘린 마지막 줄 무시
+
+    def tickers(self) -> Set[str]:
+        return {ticker for ticker, _, _ in self.done}
+
+    def forget(self, ticker: str):
+        """특정 기업 체크포인트 제거 (--fresh)"""
+        self._rewrite(lambda key: key[0] != ticker)
+
+    def retain(self, ticker: str, section: str, hashes: Set[str]):
+        """(ticker, section)의 체크포인트를 현재 청크 해시만 남기고 제거 (삭제된 행 재적재 보장)"""
+        self._rewrite(lambda key: key[:2] != (ticker, section) or key[2] in hashes)
+
+    def _rewrite(self, keep):
+        with self._lock:
+            remaining = {key for key in self.done if keep(key)}
+            if len(remaining) == len(self.done):
+                return
+            self.done = remaining
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                for t, section, h in self.done:
+                    f.write(json.dumps({"ticker": t, "section": section, "hash": h}) + "\n")
+
+    def record(self, documents: List[Dict]):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for doc in documents:
+                    meta = doc["metadata"]
+                    key = (meta["ticker"], meta["section"], doc["hash"])
+                    self.done.add(key)
+                    f.write(
+                        json.dumps({"ticker": key[0], "section": key[1], "hash": key[2]})
+                        + "\n"
+                    )
+                f.flush()
+
+
+def load_company_chunks(ticker: str, directory: Path) -> List[Dict]:
+    """특정 기업의 문서를 청킹하여 업로드 대상 목록 생성"""
     files = {
         "business": directory / "business.txt",
         "risk_factors": directory / "risk_factors.txt",
@@ -72,75 +162,282 @@ def process_company_documents(ticker: str, directory: Path):
         if not text:
             continue
 
-        # 1. 텍스트 청킹
+        # 텍스트 청킹
         chunks = text_splitter.split_text(text)
-        print(f"   - {section}: {len(chunks)} chunks")
+        print(f"   - {ticker}/{section}: {len(chunks)} chunks")
 
-        # 2. 임베딩 및 데이터 준비
+        seen = set()
         for i, chunk in enumerate(chunks):
+            h = content_hash(chunk)
+            if h in seen:
+                continue  # 동일 내용 청크는 같은 ID가 되므로 1회만 적재
+            seen.add(h)
             documents.append(
                 {
+                    "id": document_id(ticker, section, h),
+                    "hash": h,
                     "content": chunk,
                     "metadata": {
                         "ticker": ticker,  # ticker를 metadata에 포함
                         "section": section,
                         "chunk_index": i,
                         "source": "10-K",
+                        "content_hash": h,
                     },
                 }
             )
 
-    if not documents:
-        print("   ⚠️ 처리할 문서가 없습니다.")
-        return
+    return documents
 
-    # 3. 배치 업로드 (OpenAI Rate Limit 및 네트워크 고려)
-    batch_size = 20  # 임베딩 배치 크기
-    total_uploaded = 0
 
-    print(f"   🚀 업로드 시작 (총 {len(documents)}개 청크)")
+def embed_batch(batch: List[Dict], limiter: TokenBucketLimiter) -> List[Dict]:
+    """임베딩 생성 (429 등 오류 시 지수 백오프 재시도)"""
+    for attempt in range(MAX_RETRIES):
+        limiter.acquire("batch")
+        try:
+            response = openai_client.embeddings.create(
+                input=[doc["content"].replace("\n", " ") for doc in batch],
+                model=EMBEDDING_MODEL,
+            )
+            return [
+                {**doc, "embedding": item.embedding}
+                for doc, item in zip(batch, response.data)
+            ]
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            backoff = 2**attempt
+            if getattr(e, "status_code", None) == 429:
+                limiter.penalize(backoff)  # 다른 임베딩 워커도 함께 대기
+            print(f"\n   ⚠️ 임베딩 재시도 {attempt + 1}/{MAX_RETRIES} ({backoff}s): {e}")
+            time.sleep(backoff)
+
+
+def uploader(upload_queue: "queue.Queue", manifest: Manifest, stats: Dict):
+    """
+    임베딩 결과를 모아 Supabase에 upsert 후 체크포인트 기록 (별도 스레드)
+    예상하지 못한 오류는 stats["error"]에 남기고 종료 신호(None)까지 큐를 비워
+    임베딩 스테이지의 put이 막히지 않도록 합니다.
+    """
+    pending: List[Dict] = []
+
+    def _flush():
+        if not pending:
+            return
+        records = [
+            {
+                "id": doc["id"],
+                "content": doc["content"],
+                "metadata": doc["metadata"],
+                "embedding": doc["embedding"],
+            }
+            for doc in pending
+        ]
+        for attempt in range(MAX_RETRIES):
+            try:
+                supabase.table("documents").upsert(records).execute()
+                break
+            except Exception as e:
+                if attempt == MAX_RETRIES - 1:
+                    print(f"\n   ❌ 업로드 실패 ({len(pending)}개, 다음 실행 시 재처리): {e}")
+                    count_failed(stats, pending)
+                    pending.clear()
+                    return
+                time.sleep(2**attempt)
+        manifest.record(pending)
+        count_uploaded(stats, pending)
+        pending.clear()
+        print(f"      Running... ({stats['uploaded']}/{stats['total']})", end="\r")
 
-    # 기존 데이터 삭제 (metadata->ticker 기반)
     try:
-        supabase.table("documents").delete().eq("metadata->>ticker", ticker).execute()
-    except:
-        pass  # 기존 데이터 없으면 무시
-
-    for i in range(0, len(documents), batch_size):
-        batch = documents[i : i + batch_size]
+        while True:
+            item = upload_queue.get()
+            if item is None:
+                _flush()
+                return
+            pending.extend(item)
+            if len(pending) >= UPLOAD_BATCH_SIZE:
+                _flush()
+    except Exception as e:
+        stats["error"] = e
+        count_failed(stats, pending)
+        while True:
+            item = upload_queue.get()
+            if item is None:
+                return
+            count_failed(stats, item)
+
+
+def sync_section_rows(ticker: str, section: str, documents: List[Dict]) -> Tuple[int, int]:
+    """
+    (ticker, section)의 기존 행을 현재 청크 집합에 맞춤
+    - 새 청크 집합에 없는 행 삭제
+    - 내용은 같지만 metadata(chunk_index 등)가 바뀐 행은 metadata만 갱신
+
+    Returns:
+        (삭제한 행 수, metadata를 갱신한 행 수)
+    """
+    current = {doc["id"]: doc for doc in documents}
+    existing: Dict[str, Dict] = {}
+    page_size = 1000
+    while True:
+        response = (
+            supabase.table("documents")
+            .select("id, metadata")
+            .eq("metadata->>ticker", ticker)
+            .eq("metadata->>section", section)
+            .order("id")
+            .range(len(existing), len(existing) + page_size - 1)
+            .execute()
+        )
+        rows = response.data or []
+        existing.update((str(row["id"]), row.get("metadata") or {}) for row in rows)
+        if len(rows) < page_size:
+            break
+
+    stale = [doc_id for doc_id in existing if doc_id not in current]
+    for i in range(0, len(stale), 200):
+        supabase.table("documents").delete().in_("id", stale[i : i + 200]).execute()
+
+    moved = [
+        doc
+        for doc_id, doc in current.items()
+        if doc_id in existing and existing[doc_id] != doc["metadata"]
+    ]
+    for doc in moved:
+        supabase.table("documents").update({"metadata": doc["metadata"]}).eq(
+            "id", doc["id"]
+        ).execute()
+    return len(stale), len(moved)
+
+
+def run_pipeline(tickers: List[str], fresh: bool = False):
+    """청킹 -> 동시 임베딩 -> 업로드 -> 오래된 청크 정리 파이프라인 실행"""
+    manifest = Manifest(MANIFEST_PATH)
+    already_tracked = manifest.tickers()
+
+    # 1. 청킹 및 미완료 청크 선별
+    pending: List[Dict] = []
+    current: Dict[Tuple[str, str], List[Dict]] = {}  # (ticker, section) -> 현재 청크
+    for ticker in tickers:
+        company_dir = DATA_DIR / ticker
+        if not company_dir.exists():
+            continue
 
         try:
-            # 임베딩 생성
-            embeddings_response = openai_client.embeddings.create(
-                input=[doc["content"] for doc in batch], model="text-embedding-3-small"
-            )
+            documents = load_company_chunks(ticker, company_dir)
+        except Exception as e:
+            print(f"❌ {ticker} 처리 중 치명적 오류: {e}")
+            continue
 
-            # 레코드에 id와 임베딩 추가
-            records = []
-            for j, doc in enumerate(batch):
-                records.append(
-                    {
-                        "id": str(uuid.uuid4()),  # UUID 직접 생성
-                        "content": doc["content"],
-                        "metadata": doc["metadata"],
-                        "embedding": embeddings_response.data[j].embedding,
-                    }
-                )
+        if fresh or ticker not in already_tracked:
+            # 체크포인트 이전에 적재된 데이터(랜덤 UUID)는 삭제 후 다시 적재
+            try:
+                supabase.table("documents").delete().eq("metadata->>ticker", ticker).execute()
+            except Exception:
+                pass  # 기존 데이터 없으면 무시
+            manifest.forget(ticker)
+
+        for doc in documents:
+            current.setdefault((ticker, doc["metadata"]["section"]), []).append(doc)
+        pending.extend(
+            doc
+            for doc in documents
+            if (ticker, doc["metadata"]["section"], doc["hash"]) not in manifest.done
+        )
+
+    stats = {
+        "total": len(pending),
+        "uploaded": 0,
+        "failed": 0,
+        "failed_tickers": set(),
+        "error": None,
+    }
+    if pending:
+        # 2~3. 동시 임베딩 -> 업로드
+        embed_and_upload(pending, manifest, stats)
+    else:
+        print("✅ 새로 임베딩할 청크가 없습니다.")
 
-            # Supabase 저장
-            supabase.table("documents").insert(records).execute()
+    if stats.get("error") is not None:
+        raise RuntimeError(f"업로드 스테이지 중단: {stats['error']}") from stats["error"]
 
-            total_uploaded += len(batch)
-            print(f"      Running... ({total_uploaded}/{len(documents)})", end="\r")
+    # 4. 기존 행을 새 청크 집합에 맞춤 (실패가 있었던 기업은 기존 행 유지)
+    removed = reindexed = 0
+    for (ticker, section), documents in current.items():
+        if ticker in stats["failed_tickers"]:
+            continue
+        try:
+            stale, moved = sync_section_rows(ticker, section, documents)
+            removed += stale
+            reindexed += moved
+            manifest.retain(ticker, section, {doc["hash"] for doc in documents})
+        except Exception as e:
+            print(f"   ⚠️ {ticker}/{section} 기존 청크 정리 실패 (다음 실행 시 재시도): {e}")
+    if removed:
+        print(f"   🧹 수정/삭제된 청크 {removed}개 제거")
+    if reindexed:
+        print(f"   🔢 위치가 바뀐 청크 {reindexed}개 metadata 갱신")
+
+
+def embed_and_upload(pending: List[Dict], manifest: Manifest, stats: Dict):
+    """미완료 청크 동시 임베딩 후 업로드 스레드로 전달"""
+    print(f"\n🚀 업로드 시작 (총 {len(pending)}개 청크, 동시 임베딩 {EMBED_CONCURRENCY}개)")
+    start = time.time()
+
+    # 2. 업로드 스테이지 (별도 스레드, 큐 크기로 메모리 사용량 제한)
+    upload_queue: "queue.Queue" = queue.Queue(maxsize=EMBED_CONCURRENCY * 4)
+    upload_thread = threading.Thread(
+        target=uploader, args=(upload_queue, manifest, stats), daemon=True
+    )
+    upload_thread.start()
 
-            # Rate limit 방지
-            time.sleep(0.5)
+    # 3. 임베딩 스테이지 (동시 요청 수 제한 + rate limit)
+    limiter = TokenBucketLimiter(
+        calls_per_minute=EMBED_REQUESTS_PER_MINUTE,
+        burst=EMBED_CONCURRENCY,
+        batch_reserve=0.0,
+    )
+    in_flight = threading.BoundedSemaphore(EMBED_CONCURRENCY * 2)
 
+    def _put(item) -> bool:
+        """업로드 스레드가 살아 있는 동안만 대기 (스레드가 죽으면 False)"""
+        while upload_thread.is_alive():
+            try:
+                upload_queue.put(item, timeout=1.0)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _on_done(future, batch):
+        in_flight.release()
+        try:
+            embedded = future.result()
         except Exception as e:
-            print(f"\n   ❌ 오류 발생 (Batch {i}): {e}")
-            time.sleep(5)
-
-    print(f"\n   ✅ {ticker} 완료: {total_uploaded}개 청크 저장됨")
+            print(f"\n   ❌ 임베딩 실패 (다음 실행 시 재처리): {e}")
+            count_failed(stats, batch)
+            return
+        if not _put(embedded):
+            count_failed(stats, batch)
+
+    with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as executor:
+        for i in range(0, len(pending), EMBED_BATCH_SIZE):
+            if stats["error"] is not None:
+                count_failed(stats, pending[i:])  # 업로드 스테이지 중단 - 남은 청크는 다음 실행으로
+                break
+            batch = pending[i : i + EMBED_BATCH_SIZE]
+            in_flight.acquire()
+            future = executor.submit(embed_batch, batch, limiter)
+            future.add_done_callback(lambda f, batch=batch: _on_done(f, batch))
+
+    _put(None)
+    upload_thread.join()
+
+    print(
+        f"\n   ✅ 완료: {stats['uploaded']}개 청크 저장, 실패 {stats['failed']}개 "
+        f"({time.time() - start:.1f}s)"
+    )
 
 
 def main():
@@ -152,24 +449,23 @@ def main():
         print(f"❌ 데이터 디렉토리가 없습니다: {DATA_DIR}")
         return
 
-    # 처리된 기업 목록 로드
-    processed_companies_path = DATA_DIR / "processed_companies.csv"
-    if processed_companies_path.exists():
-        companies_df = pd.read_csv(processed_companies_path)
-        tickers = companies_df["ticker"].tolist()
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    fresh = "--fresh" in sys.argv
+
+    if args:
+        tickers = [arg.upper() for arg in args]
     else:
-        # 디렉토리에서 직접 확인
-        tickers = [d.name for d in DATA_DIR.iterdir() if d.is_dir()]
+        # 처리된 기업 목록 로드
+        processed_companies_path = DATA_DIR / "processed_companies.csv"
+        if processed_companies_path.exists():
+            companies_df = pd.read_csv(processed_companies_path)
+            tickers = companies_df["ticker"].tolist()
+        else:
+            # 디렉토리에서 직접 확인
+            tickers = [d.name for d in DATA_DIR.iterdir() if d.is_dir()]
 
     print(f"📋 처리 대상: {len(tickers)}개 기업")
-
-    for ticker in tickers:
-        company_dir = DATA_DIR / ticker
-        if company_dir.exists():
-            try:
-                process_company_documents(ticker, company_dir)
-            except Exception as e:
-                print(f"❌ {ticker} 처리 중 치명적 오류: {e}")
+    run_pipeline(tickers, fresh=fresh)
 
 
 if __name__ == "__main__":
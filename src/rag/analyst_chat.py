@@ -14,8 +14,10 @@ import re
 
 try:
     from rag.rag_base import RAGBase, EXCHANGE_AVAILABLE
+    from rag.embedding_cache import get_embedding_cache
 except ImportError:
     from src.rag.rag_base import RAGBase, EXCHANGE_AVAILABLE
+    from src.rag.embedding_cache import get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +133,13 @@ class AnalystChatbot(RAGBase):
 
     def _generate_english_search_query(self, user_query: str) -> str:
         """Translate Korean query to English optimized search query using LLM"""
+        # 반복 질문은 번역 LLM 호출 생략 (임베딩 캐시와 동일 저장소 공유)
+        cache_model = f"translate:{self.model_name}"
+        cache = get_embedding_cache()
+        cached = cache.get(cache_model, user_query)
+        if cached:
+            return cached
+
         try:
             # Simple keyword extraction & translation
             messages = [
@@ -145,13 +154,20 @@ class AnalystChatbot(RAGBase):
             )
             eng_query = response.choices[0].message.content.strip()
             logger.info(f"🇺🇸 Translated Query: '{user_query}' -> '{eng_query}'")
+            if eng_query:
+                cache.set(cache_model, user_query, eng_query)
             return eng_query
         except Exception as e:
             logger.warning(f"Query translation failed: {e}")
             return user_query  # Fallback to original
 
-    def _build_context(self, query: str, ticker: Optional[str] = None) -> str:
-        """Build context from RAG search, company data, and real-time Finnhub data (Optimized with Parallel Fetch)"""
+    def _build_context(
+        self, query: str, ticker: Optional[str] = None, dataset_context: Optional[Dict] = None
+    ) -> str:
+        """Build context from RAG search, company data, and real-time Finnhub data (Optimized with Parallel Fetch)
+
+        dataset_context: get_companies_context_parallel로 미리 수집한 데이터 (다중 티커)
+        """
 
         # 0. Translate Query for Better Retrieval (Korean -> English)
         search_query = self._generate_english_search_query(query)
@@ -168,15 +184,16 @@ class AnalystChatbot(RAGBase):
             return "\n".join(parts)
 
         # Ticker가 있는 경우 DataRetriever를 통해 모든 데이터를 병렬로 수집
-        if not self.data_retriever:
-            return "데이터 수집 모듈 미작동"
-
-        logger.info(
-            f"Building context for query: {query} (Search: {search_query}), ticker: {ticker}"
-        )
-        dataset_context = self.data_retriever.get_company_context_parallel(
-            ticker, include_finnhub=True, include_rag=True, query=search_query
-        )
+        if dataset_context is None:
+            if not self.data_retriever:
+                return "데이터 수집 모듈 미작동"
+
+            logger.info(
+                f"Building context for query: {query} (Search: {search_query}), ticker: {ticker}"
+            )
+            dataset_context = self.data_retriever.get_company_context_parallel(
+                ticker, include_finnhub=True, include_rag=True, query=search_query
+            )
         all_data = dataset_context
 
         context_parts = []
@@ -614,7 +631,16 @@ class AnalystChatbot(RAGBase):
 
             context = ""
             if use_rag and tickers:
-                context_parts = [self._build_context(message, t) for t in tickers]
+                # 여러 기업이면 한 번에 배치 수집
+                prefetched = {}
+                if len(tickers) > 1 and self.data_retriever:
+                    prefetched = self.data_retriever.get_companies_context_parallel(
+                        tickers, query=self._generate_english_search_query(message)
+                    )
+                context_parts = [
+                    self._build_context(message, t, prefetched.get(t.upper()))
+                    for t in tickers
+                ]
                 context = "\n\n---\n\n".join(context_parts)
 
             user_content = (
@@ -0,0 +1,617 @@
+"""
+Async Data Retriever - asyncio 기반 기업 데이터 수집 엔진
+DataRetriever와 같은 컨텍스트 dict를 반환하지만, 스레드 풀 대신 하나의 이벤트 루프에서
+모든 I/O를 동시에 실행합니다. (대기 중인 요청마다 스레드를 점유하지 않음)
+
+- Supabase: supabase AsyncClient (async postgrest)
+- Finnhub: httpx.AsyncClient (StockAPIClient와 응답 캐시 / 토큰 버킷 / 차단기 공유)
+- RAG 검색: AsyncOpenAI 임베딩 + match_documents(_filtered) RPC
+- CPU 작업(CrossEncoder 재정렬), 임베딩 캐시(SQLite), 드문 yfinance fallback만 asyncio.to_thread로 실행
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+from openai import AsyncOpenAI
+from supabase import AsyncClient, acreate_client
+
+try:
+    from rag.data_retriever import (
+        BATCH_IN_CHUNK,
+        FINANCIAL_TABLES,
+        REPORT_PAGE_SIZE,
+        TICKER_JOIN_SELECT,
+        _financial_key,
+    )
+    from rag.embedding_cache import get_embedding_cache
+    from rag.local_index import matches_filter
+    from rag.postgrest_errors import MISSING_FUNCTION, MISSING_RELATIONSHIP, OptionalFeature
+    from rag.reranker import get_reranker
+    from rag.retrieval_utils import (
+        Deadline,
+        pg_quote,
+        request_source_timeouts,
+        source_timeouts_from_env,
+    )
+except ImportError:
+    from src.rag.data_retriever import (
+        BATCH_IN_CHUNK,
+        FINANCIAL_TABLES,
+        REPORT_PAGE_SIZE,
+        TICKER_JOIN_SELECT,
+        _financial_key,
+    )
+    from src.rag.embedding_cache import get_embedding_cache
+    from src.rag.local_index import matches_filter
+    from src.rag.postgrest_errors import MISSING_FUNCTION, MISSING_RELATIONSHIP, OptionalFeature
+    from src.rag.reranker import get_reranker
+    from src.rag.retrieval_utils import (
+        Deadline,
+        pg_quote,
+        request_source_timeouts,
+        source_timeouts_from_env,
+    )
+
+try:
+    from tools.circuit_breaker import get_breaker
+    from tools.rate_limiter import get_rate_limiter
+    from tools.stock_api_client import (
+        RATE_LIMIT_RETRIES,
+        _retry_after,
+        get_response_cache,
+    )
+except ImportError:
+    from src.tools.circuit_breaker import get_breaker
+    from src.tools.rate_limiter import get_rate_limiter
+    from src.tools.stock_api_client import (
+        RATE_LIMIT_RETRIES,
+        _retry_after,
+        get_response_cache,
+    )
+
+logger = logging.getLogger(__name__)
+
+FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
+
+
+class _AsyncDeadline(Deadline):
+    """Deadline의 asyncio 버전 (asyncio.Task를 남은 시간 안에 기다림)"""
+
+    def _clock(self) -> float:
+        # 마감 시각은 이벤트 루프 시계 기준 (loop.time()은 monotonic)
+        return asyncio.get_running_loop().time()
+
+    async def wait(self, task: asyncio.Future, source: str, default=None):
+        """남은 시간 안에 결과를 기다리고, 초과/실패 시 task를 취소하고 default 반환"""
+        done, _ = await asyncio.wait({task}, timeout=self.remaining(source))
+        if not done:
+            task.cancel()
+            self._record(source, "timeout")
+            logger.warning(f"AsyncDataRetriever source timed out: {source}")
+            return default
+        try:
+            value = task.result()
+        except Exception as e:
+            self._record(source, "error")
+            self.errors.setdefault(source, e)
+            logger.error(f"AsyncDataRetriever source failed: {source}: {e}")
+            return default
+        self._record(source, "ok")
+        return value if value is not None else default
+
+
+class AsyncDataRetriever:
+    """DataRetriever와 같은 결과를 asyncio로 수집하는 클래스"""
+
+    def __init__(
+        self,
+        supabase: AsyncClient,
+        openai_client: Optional[AsyncOpenAI] = None,
+        finnhub_api_key: Optional[str] = None,
+        finnhub=None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        embedding_model: str = "text-embedding-3-small",
+        timeout: Optional[float] = None,
+        source_timeouts: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            supabase: supabase AsyncClient (acreate_client로 생성)
+            openai_client: RAG 검색용 AsyncOpenAI (None이면 RAG 컨텍스트 생략)
+            finnhub_api_key: Finnhub API 키 (None이면 FINNHUB_API_KEY)
+            finnhub: 동기 StockAPIClient (yfinance fallback 위임용, 선택)
+            http_client: 공유할 httpx.AsyncClient (None이면 내부 생성)
+            timeout: 요청당 전체 수집 마감 시간(초) (None이면 DATA_RETRIEVER_TIMEOUT, 기본 8초)
+            source_timeouts: 소스별 마감 시간(초) (None이면 DATA_RETRIEVER_SOURCE_TIMEOUTS,
+                reranker 콜드 스타트 중에는 rag에 DATA_RETRIEVER_WARMUP_TIMEOUT 적용)
+        """
+        self.supabase = supabase
+        self.openai_client = openai_client
+        self.finnhub = finnhub
+        self.embedding_model = embedding_model
+
+        api_key = (finnhub_api_key or os.getenv("FINNHUB_API_KEY") or "").strip()
+        if api_key == "your_finnhub_api_key_here":
+            api_key = ""
+        self.finnhub_api_key = api_key or None
+
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(
+            base_url=FINNHUB_BASE_URL,
+            timeout=float(os.getenv("STOCK_API_TIMEOUT", "3")),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+
+        if timeout is None:
+            timeout = float(os.getenv("DATA_RETRIEVER_TIMEOUT", "8"))
+        self.timeout = timeout
+        if source_timeouts is None:
+            source_timeouts = source_timeouts_from_env()
+        self.source_timeouts = source_timeouts
+        self.warmup_timeout = float(os.getenv("DATA_RETRIEVER_WARMUP_TIMEOUT", "60"))
+        # DataRetriever와 같은 대체 플래그
+        self._ticker_join = OptionalFeature("financial ticker join", MISSING_RELATIONSHIP)
+        self._filtered_rpc = OptionalFeature("match_documents_filtered", MISSING_FUNCTION)
+
+    @classmethod
+    async def create(cls, finnhub=None, **kwargs) -> "AsyncDataRetriever":
+        """환경 변수(SUPABASE_URL/KEY, OPENAI_API_KEY)로 비동기 클라이언트를 만들어 생성"""
+        supabase_url = os.getenv("SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_KEY")
+        if not supabase_url or not supabase_key:
+            raise ValueError("SUPABASE_URL과 SUPABASE_KEY 환경 변수가 필요합니다.")
+        supabase = await acreate_client(supabase_url, supabase_key)
+
+        openai_api_key = os.getenv("OPENAI_API_KEY")
+        openai_client = AsyncOpenAI(api_key=openai_api_key) if openai_api_key else None
+        return cls(supabase, openai_client=openai_client, finnhub=finnhub, **kwargs)
+
+    async def aclose(self):
+        """내부에서 만든 HTTP 연결 풀 정리"""
+        if self._owns_http_client:
+            await self.http_client.aclose()
+
+    async def __aenter__(self) -> "AsyncDataRetriever":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    # ========== 컨텍스트 수집 ==========
+
+    async def get_company_context(
+        self,
+        ticker: str,
+        include_finnhub: bool = True,
+        include_rag: bool = True,
+        query: str = None,
+        timeout: Optional[float] = None,
+    ) -> Dict:
+        """
+        DataRetriever.get_company_context_parallel의 asyncio 버전
+        (마감 시간을 넘긴 소스는 비워 두고 source_status에 "timeout"으로 표시)
+        """
+        contexts = await self.get_companies_context(
+            [ticker], include_finnhub, include_rag, query, timeout
+        )
+        return contexts[ticker.upper()]
+
+    async def get_companies_context(
+        self,
+        tickers: List[str],
+        include_finnhub: bool = True,
+        include_rag: bool = True,
+        query: str = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Dict]:
+        """
+        DataRetriever.get_companies_context_parallel의 asyncio 버전
+
+        Returns:
+            {ticker: get_company_context와 같은 형식의 dict}
+        """
+        tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+        if not tickers:
+            return {}
+
+        deadline = _AsyncDeadline(
+            self.timeout if timeout is None else timeout,
+            source_timeouts=request_source_timeouts(self.source_timeouts, self.warmup_timeout),
+        )
+
+        companies_task = asyncio.create_task(self._fetch_companies(tickers))
+        rels_task = asyncio.create_task(self._fetch_relationships(tickers))
+        ticker_tasks = {
+            ticker: self._create_ticker_tasks(ticker, include_finnhub, include_rag, query)
+            for ticker in tickers
+        }
+        # 재무 데이터 (티커 조인으로 기업 정보 조회와 동시에 시작)
+        join_tasks = None
+        if self._ticker_join.available:
+            join_tasks = self._create_financial_tasks(tickers, by_ticker=True)
+
+        companies = await deadline.wait(companies_task, "company", {})
+        company_ids = {
+            ticker: company["id"]
+            for ticker, company in companies.items()
+            if company and "id" in company
+        }
+
+        financials = None
+        if join_tasks is not None:
+            financials = await self._collect_financials(
+                join_tasks, tickers, deadline, by_ticker=True
+            )
+        if financials is None:
+            # 조인 미지원: 기업 정보 조회 후 company_id로 조회
+            ids = list(company_ids.values())
+            by_id = await self._collect_financials(
+                self._create_financial_tasks(ids, by_ticker=False), ids, deadline
+            )
+            financials = {ticker: by_id[cid] for ticker, cid in company_ids.items()}
+        relationships = await deadline.wait(rels_task, "relationships", {})
+
+        results = {}
+        for ticker in tickers:
+            ticker_deadline = deadline.child()
+            context = {
+                "company": companies.get(ticker),
+                "relationships": relationships.get(ticker, []),
+            }
+            context.update(
+                await self._collect_ticker_tasks(ticker_tasks[ticker], ticker_deadline)
+            )
+            context["financials"] = financials.get(
+                ticker, {"annual": [], "quarterly": [], "prices": []}
+            )
+            context["source_status"] = ticker_deadline.status
+            results[ticker] = context
+
+        return results
+
+    def _create_ticker_tasks(
+        self,
+        ticker: str,
+        include_finnhub: bool,
+        include_rag: bool,
+        query: Optional[str],
+    ) -> Dict[str, asyncio.Task]:
+        """티커별 RAG 검색 / Finnhub 호출 태스크 생성"""
+        tasks = {}
+
+        if include_rag and self.openai_client:
+            search_query = (
+                f"{query} ({ticker})"
+                if query
+                else f"Latest business overview and risks for {ticker}"
+            )
+            tasks["rag"] = asyncio.create_task(
+                self.search_by_company(search_query, company=ticker, k=8)
+            )
+
+        if include_finnhub and self.finnhub_api_key:
+            today = datetime.now()
+            coros = {
+                "quote": self._get_quote(ticker),
+                "recommendations": self._finnhub_list(
+                    "stock/recommendation", {"symbol": ticker}
+                ),
+                "price_target": self._get_price_target(ticker),
+                "news": self._finnhub_list(
+                    "company-news",
+                    {
+                        "symbol": ticker,
+                        "from": (today - timedelta(days=7)).strftime("%Y-%m-%d"),
+                        "to": today.strftime("%Y-%m-%d"),
+                    },
+                ),
+                "metrics": self._get_basic_financials(ticker),
+                "peers": self._finnhub_list("stock/peers", {"symbol": ticker}),
+            }
+            tasks.update(
+                {name: asyncio.create_task(coro) for name, coro in coros.items()}
+            )
+
+        return tasks
+
+    async def _collect_ticker_tasks(
+        self, tasks: Dict[str, asyncio.Task], deadline: _AsyncDeadline
+    ) -> Dict:
+        """_create_ticker_tasks 결과를 rag_context / finnhub 항목으로 수집 (마감 시간 내)"""
+        results = {}
+
+        if "rag" in tasks:
+            final_docs = await deadline.wait(tasks["rag"], "rag", [])
+            results["rag_context"] = (
+                "\n".join([d.get("content", "")[:1000] for d in final_docs])
+                if final_docs
+                else ""
+            )
+
+        if "quote" in tasks:
+            results["finnhub"] = {
+                "quote": await deadline.wait(tasks["quote"], "finnhub.quote", {}),
+                "recommendations": await deadline.wait(
+                    tasks["recommendations"], "finnhub.recommendations", []
+                ),
+                "price_target": await deadline.wait(
+                    tasks["price_target"], "finnhub.price_target", {}
+                ),
+                "news": (await deadline.wait(tasks["news"], "finnhub.news", []))[:5],
+                "metrics": await deadline.wait(tasks["metrics"], "finnhub.metrics", {}),
+                "peers": await deadline.wait(tasks["peers"], "finnhub.peers", []),
+            }
+
+        return results
+
+    # ========== Supabase ==========
+
+    async def _fetch_companies(self, tickers: List[str]) -> Dict[str, Dict]:
+        """기업 기본 정보 in_() 조회 (ticker -> company)"""
+        companies = {}
+        for i in range(0, len(tickers), BATCH_IN_CHUNK):
+            res = (
+                await self.supabase.table("companies")
+                .select("*")
+                .in_("ticker", tickers[i : i + BATCH_IN_CHUNK])
+                .execute()
+            )
+            for row in res.data or []:
+                companies.setdefault(row.get("ticker"), row)
+        return companies
+
+    async def _fetch_relationships(self, tickers: List[str]) -> Dict[str, List[Dict]]:
+        """outgoing/incoming 관계를 or 필터로 조회 (ticker -> rows)"""
+        by_ticker = {ticker: [] for ticker in tickers}
+        for i in range(0, len(tickers), BATCH_IN_CHUNK):
+            values = ",".join(pg_quote(t) for t in tickers[i : i + BATCH_IN_CHUNK])
+            res = (
+                await self.supabase.table("company_relationships")
+                .select("*")
+                .or_(f"source_ticker.in.({values}),target_ticker.in.({values})")
+                .execute()
+            )
+            for row in res.data or []:
+                source = row.get("source_ticker")
+                target = row.get("target_ticker")
+                if source in by_ticker:
+                    by_ticker[source].append(row)
+                if target in by_ticker and target != source:
+                    by_ticker[target].append(row)
+        return by_ticker
+
+    def _create_financial_tasks(self, keys: List, by_ticker: bool) -> List:
+        """재무 테이블 조회 태스크 생성 (DataRetriever._submit_financials와 같은 분할)"""
+        column = "companies.ticker" if by_ticker else "company_id"
+        select = TICKER_JOIN_SELECT if by_ticker else "*"
+
+        def _ordered(q, order_cols):
+            for col in order_cols:
+                q = q.order(col, desc=True)
+            return q
+
+        async def _query(table, order_cols, values):
+            if len(values) == 1:
+                q = self.supabase.table(table).select(select).eq(column, values[0])
+                return (await _ordered(q, order_cols).limit(5).execute()).data
+
+            # in_() 배치는 max-rows에 잘리지 않도록 페이지 단위 조회 (DataRetriever와 동일)
+            rows, counts, start = [], {}, 0
+            while True:
+                q = self.supabase.table(table).select(select).in_(column, values)
+                q = _ordered(q, order_cols).order("id")
+                page = (await q.range(start, start + REPORT_PAGE_SIZE - 1).execute()).data or []
+                rows.extend(page)
+                for row in page:
+                    key = _financial_key(row, by_ticker)
+                    counts[key] = counts.get(key, 0) + 1
+                if len(page) < REPORT_PAGE_SIZE or all(counts.get(v, 0) >= 5 for v in values):
+                    return rows
+                start += REPORT_PAGE_SIZE
+
+        tasks = []
+        for kind, (table, order_cols) in FINANCIAL_TABLES.items():
+            size = 1 if kind == "prices" else BATCH_IN_CHUNK
+            for i in range(0, len(keys), size):
+                tasks.append(
+                    (kind, asyncio.create_task(_query(table, order_cols, keys[i : i + size])))
+                )
+        return tasks
+
+    async def _collect_financials(
+        self, tasks: List, keys: List, deadline: _AsyncDeadline, by_ticker: bool = False
+    ) -> Optional[Dict]:
+        """재무 조회 결과를 기업별로 정리 (티커 조인 실패 시 조인 방식을 끄고 None 반환)"""
+        financials = {key: {"annual": [], "quarterly": [], "prices": []} for key in keys}
+        for kind, task in tasks:
+            for row in await deadline.wait(task, f"financials.{kind}", []):
+                key = _financial_key(row, by_ticker)
+                row.pop("companies", None)
+                rows = financials.get(key, {}).get(kind)
+                if rows is not None and len(rows) < 5:
+                    rows.append(row)
+
+        join_errors = [
+            deadline.errors[f"financials.{kind}"]
+            for kind in FINANCIAL_TABLES
+            if deadline.status.get(f"financials.{kind}") == "error"
+        ]
+        if by_ticker and join_errors:
+            self._ticker_join.failed(join_errors[0])
+            for kind in FINANCIAL_TABLES:
+                deadline.errors.pop(f"financials.{kind}", None)
+                deadline.status.pop(f"financials.{kind}", None)
+            return None
+
+        return financials
+
+    # ========== RAG 검색 ==========
+
+    async def _get_embedding(self, text: str) -> List[float]:
+        """
+        쿼리 임베딩 (VectorStore와 같은 프로세스 공용 캐시 사용)
+        캐시는 SQLite 조회/쓰기와 락을 사용하므로 이벤트 루프 밖(스레드)에서 호출
+        """
+        cache = await asyncio.to_thread(get_embedding_cache)
+        cached = await asyncio.to_thread(cache.get, self.embedding_model, text)
+        if cached is not None:
+            return cached
+        response = await self.openai_client.embeddings.create(
+            model=self.embedding_model, input=text
+        )
+        embedding = response.data[0].embedding
+        await asyncio.to_thread(cache.set, self.embedding_model, text, embedding)
+        return embedding
+
+    async def _match_documents(
+        self, query_embedding: List[float], k: int, filter_dict: Optional[Dict] = None
+    ) -> List[Dict]:
+        """match_documents(_filtered) RPC (threshold 0.3 -> 결과 없으면 0.0으로 재시도)"""
+        rpc_name = "match_documents_filtered" if filter_dict else "match_documents"
+        params = {"query_embedding": query_embedding, "match_count": k}
+        if filter_dict:
+            params["filter"] = filter_dict
+
+        for threshold in (0.3, 0.0):
+            response = await self.supabase.rpc(
+                rpc_name, {**params, "match_threshold": threshold}
+            ).execute()
+            if response.data:
+                return response.data
+        return []
+
+    async def search_by_company(
+        self, query: str, company: str, k: int = 5, initial_k: int = 20
+    ) -> List[Dict]:
+        """VectorStore.search_by_company의 asyncio 버전 (ticker 필터 검색 후 재정렬)"""
+        filter_dict = {"ticker": company}
+        query_embedding = await self._get_embedding(query)
+
+        rows = None
+        if self._filtered_rpc.available:
+            try:
+                rows = await self._match_documents(query_embedding, initial_k, filter_dict)
+            except Exception as e:
+                self._filtered_rpc.failed(e)
+        if rows is None:
+            rows = await self._match_documents(query_embedding, max(initial_k, 100))
+            rows = [
+                item for item in rows if matches_filter(item.get("metadata"), filter_dict)
+            ][:initial_k]
+
+        documents = [
+            {
+                "id": item.get("id"),
+                "content": item.get("content"),
+                "metadata": item.get("metadata"),
+                "similarity": item.get("similarity"),
+            }
+            for item in rows
+        ]
+        if not documents:
+            logger.warning(f"No documents found for company {company}.")
+            return []
+
+        # CrossEncoder 재정렬은 CPU 작업이므로 스레드에서 실행
+        scores = await asyncio.to_thread(get_reranker().score, query, documents, 1000)
+        if scores is None:
+            return documents[:k]
+        ranked = sorted(zip(documents, scores), key=lambda x: x[1], reverse=True)[:k]
+        for doc, score in ranked:
+            doc["rerank_score"] = float(score)
+        return [doc for doc, _ in ranked]
+
+    # ========== Finnhub ==========
+
+    async def _finnhub_request(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """StockAPIClient._request의 asyncio 버전 (같은 응답 캐시 / 토큰 버킷 / 차단기 사용)"""
+        if not self.finnhub_api_key:
+            return {"error": "Finnhub API key not configured"}
+
+        cache = get_response_cache()
+        if cache is not None:
+            cached = cache.peek(endpoint, params)
+            if cached is not None:
+                return cached
+
+        breaker = get_breaker(f"finnhub:{endpoint}")
+        if not breaker.allow():
+            return {"error": f"Finnhub {endpoint} temporarily unavailable (circuit open)"}
+
+        result, failure = await self._finnhub_send(endpoint, params)
+        if failure:
+            breaker.record_failure(failure)
+        else:
+            breaker.record_success()
+        if cache is not None and not (isinstance(result, dict) and "error" in result):
+            cache.put(endpoint, params, result)
+        return result
+
+    async def _finnhub_send(self, endpoint: str, params: Dict):
+        """토큰 버킷 통과 후 호출 (대기는 asyncio.sleep), Returns: (결과, 장애 사유)"""
+        limiter = get_rate_limiter()
+        loop = asyncio.get_running_loop()
+        give_up = loop.time() + float(os.getenv("FINNHUB_INTERACTIVE_WAIT", "5"))
+        try:
+            for _ in range(RATE_LIMIT_RETRIES + 1):
+                wait = limiter.try_acquire("interactive")
+                while wait:
+                    if loop.time() + wait > give_up:
+                        logger.warning(f"Finnhub rate limit budget exhausted: {endpoint}")
+                        return {"error": "Finnhub rate limit budget exhausted"}, None
+                    await asyncio.sleep(wait)
+                    wait = limiter.try_acquire("interactive")
+
+                response = await self.http_client.get(
+                    f"/{endpoint}", params={**params, "token": self.finnhub_api_key}
+                )
+                if response.status_code == 429:
+                    limiter.penalize(_retry_after(response))
+                    continue
+                response.raise_for_status()
+                return response.json(), None
+            error = "Finnhub rate limit exceeded (429)"
+            return {"error": error}, error
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status == 403:
+                return {"error": "Prediction/Premium endpoint not available on this plan"}, None
+            logger.error(f"Finnhub API error: {e}")
+            return {"error": str(e)}, str(e) if status >= 500 or status == 401 else None
+        except httpx.HTTPError as e:
+            logger.error(f"Finnhub API error: {e}")
+            return {"error": str(e)}, str(e)
+
+    async def _finnhub_list(self, endpoint: str, params: Dict) -> List:
+        result = await self._finnhub_request(endpoint, params)
+        return result if isinstance(result, list) else []
+
+    async def _fallback(self, method: str, ticker: str, default: Dict) -> Dict:
+        """Finnhub 결과가 비었을 때 동기 클라이언트의 yfinance fallback 위임"""
+        if self.finnhub is None:
+            return default
+        return await asyncio.to_thread(getattr(self.finnhub, method), ticker)
+
+    async def _get_quote(self, ticker: str) -> Dict:
+        result = await self._finnhub_request("quote", {"symbol": ticker})
+        if result and result.get("c", 0) > 0:
+            return result
+        return await self._fallback("get_quote", ticker, result)
+
+    async def _get_price_target(self, ticker: str) -> Dict:
+        result = await self._finnhub_request("stock/price-target", {"symbol": ticker})
+        if result and "error" not in result:
+            return result
+        return await self._fallback("get_price_target", ticker, result)
+
+    async def _get_basic_financials(self, ticker: str) -> Dict:
+        result = await self._finnhub_request(
+            "stock/metric", {"symbol": ticker, "metric": "all"}
+        )
+        if result and result.get("metric"):
+            return result
+        return await self._fallback("get_basic_financials", ticker, result)
@@ -0,0 +1,381 @@
+"""
+BM25 Keyword Index - documents 테이블 청크에 대한 로컬 역색인(Inverted Index)
+hybrid_search의 키워드 검색(ILIKE '%첫단어%' 테이블 스캔)을 대체합니다.
+
+- 오프라인 빌드 (scripts/build_search_indexes.py) 후 압축 배열(.npz)로 로드
+- posting list는 CSR 형태: term_offsets[t]:term_offsets[t+1] 구간이 term t의 문서/빈도
+- 질의의 모든 토큰을 BM25(Okapi)로 점수화
+- 로컬 벡터 인덱스에서 빌드하면 청크 본문/metadata는 documents_meta.json을 공유
+  (bm25_meta.json에는 vocab/ids와 참조한 벡터 인덱스 버전만 저장)
+- 파일은 임시 파일 + os.replace로 교체하고 마지막에 bm25_version 기록 -
+  실행 중인 프로세스는 버전 변경을 감지해 백그라운드로 다시 로드 (LOCAL_INDEX_RELOAD_SECONDS)
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    from rag.local_index import (
+        DEFAULT_INDEX_DIR,
+        LocalVectorIndex,
+        index_version,
+        matches_filter,
+        write_atomic,
+    )
+except ImportError:
+    from src.rag.local_index import (
+        DEFAULT_INDEX_DIR,
+        LocalVectorIndex,
+        index_version,
+        matches_filter,
+        write_atomic,
+    )
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[0-9a-z가-힣]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was",
+    "were", "will", "with", "we", "our", "us", "which", "may", "such", "these",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """소문자 변환 후 영숫자/한글 토큰 추출 (불용어, 1글자 영문 제외)"""
+    return [
+        tok
+        for tok in _TOKEN.findall((text or "").lower())
+        if tok not in STOPWORDS and (len(tok) > 1 or not tok.isascii())
+    ]
+
+
+class BM25Index:
+    """CSR posting list 기반 BM25 검색 인덱스"""
+
+    ARRAYS_FILE = "bm25.npz"
+    META_FILE = "bm25_meta.json"
+    VERSION_FILE = "bm25_version"
+
+    def __init__(
+        self,
+        table_name: str = "documents",
+        index_dir: Optional[Path] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.table_name = table_name
+        self.index_dir = Path(index_dir) if index_dir else DEFAULT_INDEX_DIR / table_name
+        self.k1 = k1
+        self.b = b
+        self.reload_interval = float(os.getenv("LOCAL_INDEX_RELOAD_SECONDS", "30"))
+
+        # 검색에 사용하는 로드 완료 인덱스 (백그라운드 로드 후 참조 1회 교체)
+        self._active: Optional["BM25Index"] = None
+        self._loaded_version: Optional[str] = None
+        self._loader: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._vocab: Dict[str, int] = {}
+        self._term_offsets: Optional[np.ndarray] = None
+        self._postings_doc: Optional[np.ndarray] = None
+        self._postings_tf: Optional[np.ndarray] = None
+        self._idf: Optional[np.ndarray] = None
+        self._doc_len: Optional[np.ndarray] = None
+        self._avg_len = 0.0
+        self._ids: List = []
+        self._contents: List[str] = []
+        self._metadatas: List[Dict] = []
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._active is not None
+
+    def __len__(self) -> int:
+        active = self._active
+        return len(active._ids) if active is not None else 0
+
+    # ========== 빌드 ==========
+
+    def build(self, documents: Iterable[Dict]) -> int:
+        """
+        문서 목록으로 인덱스를 생성하여 디스크에 저장합니다 (본문/metadata 포함).
+
+        Args:
+            documents: id, content, metadata를 가진 dict iterable
+
+        Returns:
+            인덱싱된 문서 수
+        """
+        ids, contents, metadatas = [], [], []
+        for doc in documents:
+            ids.append(doc.get("id"))
+            contents.append(doc.get("content") or "")
+            metadatas.append(doc.get("metadata") or {})
+        return self._write(ids, contents, {"contents": contents, "metadatas": metadatas})
+
+    def build_from_local_index(self) -> int:
+        """
+        로컬 벡터 인덱스(documents_meta.json)의 청크로 인덱스 생성
+        본문/metadata는 저장하지 않고 로드 시 documents_meta.json에서 읽습니다.
+        """
+        documents_version = index_version(self.index_dir)
+        with open(self.index_dir / LocalVectorIndex.META_FILE, "r", encoding="utf-8") as f:
+            documents = json.load(f)
+        return self._write(
+            documents.get("ids", []),
+            documents.get("contents", []),
+            {"documents_version": documents_version},
+        )
+
+    def build_from_supabase(self, supabase, page_size: int = 1000) -> int:
+        """Supabase 테이블 전체를 페이지 단위로 읽어 인덱스 생성"""
+
+        def _rows():
+            offset = 0
+            while True:
+                rows = (
+                    supabase.table(self.table_name)
+                    .select("id, content, metadata")
+                    .range(offset, offset + page_size - 1)
+                    .execute()
+                    .data
+                    or []
+                )
+                yield from rows
+                if len(rows) < page_size:
+                    break
+                offset += page_size
+
+        return self.build(_rows())
+
+    def _write(self, ids: List, contents: List[str], extra_meta: Dict) -> int:
+        """posting list를 계산해 배열/메타 파일을 교체하고 마지막에 버전 기록"""
+        vocab: Dict[str, int] = {}
+        postings: List[List[tuple]] = []
+        doc_len = []
+
+        for doc_idx, content in enumerate(contents):
+            counts = Counter(tokenize(content))
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                term_id = vocab.setdefault(term, len(vocab))
+                if term_id == len(postings):
+                    postings.append([])
+                postings[term_id].append((doc_idx, tf))
+
+        n_docs = len(ids)
+        term_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        for term_id, plist in enumerate(postings):
+            term_offsets[term_id + 1] = term_offsets[term_id] + len(plist)
+
+        postings_doc = np.empty(term_offsets[-1], dtype=np.int32)
+        postings_tf = np.empty(term_offsets[-1], dtype=np.float32)
+        for term_id, plist in enumerate(postings):
+            start = term_offsets[term_id]
+            for j, (doc_idx, tf) in enumerate(plist):
+                postings_doc[start + j] = doc_idx
+                postings_tf[start + j] = tf
+
+        df = np.diff(term_offsets).astype(np.float32)
+        idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        # 배열/메타 파일에 같은 버전을 기록 - 로드 시 두 파일이 같은 빌드인지 확인
+        version = str(time.time_ns())
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        write_atomic(
+            self.index_dir / self.ARRAYS_FILE,
+            lambda f: np.savez_compressed(
+                f,
+                term_offsets=term_offsets,
+                postings_doc=postings_doc,
+                postings_tf=postings_tf,
+                idf=idf,
+                doc_len=np.asarray(doc_len, dtype=np.float32),
+                version=np.asarray(version),
+            ),
+        )
+        meta = json.dumps(
+            {"version": version, "vocab": vocab, "ids": ids, **extra_meta}, ensure_ascii=False
+        )
+        write_atomic(self.index_dir / self.META_FILE, lambda f: f.write(meta.encode("utf-8")))
+        write_atomic(
+            self.index_dir / self.VERSION_FILE, lambda f: f.write(version.encode("utf-8"))
+        )
+
+        logger.info(f"Built BM25 index: {n_docs} documents, {len(vocab)} terms")
+        return n_docs
+
+    # ========== 로드 ==========
+
+    def _disk_version(self) -> Optional[str]:
+        try:
+            return (self.index_dir / self.VERSION_FILE).read_text().strip()
+        except OSError:
+            return None
+
+    def load(self) -> bool:
+        """디스크의 인덱스 로드 (파일이 없거나 빌드 도중이면 False, 동기 호출)"""
+        arrays_path = self.index_dir / self.ARRAYS_FILE
+        meta_path = self.index_dir / self.META_FILE
+        if not arrays_path.exists() or not meta_path.exists():
+            return False
+
+        version = self._disk_version()
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with np.load(arrays_path) as arrays:
+            arrays_version = str(arrays["version"]) if "version" in arrays.files else None
+            postings_doc = arrays["postings_doc"]
+            postings_tf = arrays["postings_tf"]
+            idf = arrays["idf"]
+            doc_len = arrays["doc_len"]
+            term_offsets = arrays["term_offsets"]
+        if arrays_version != meta.get("version"):
+            # 다른 프로세스가 재빌드 중 - 다음 확인 시 다시 로드
+            logger.warning("BM25 index files are out of sync (rebuild in progress?)")
+            return False
+
+        ids = meta.get("ids", [])
+        if "documents_version" in meta:
+            documents_path = self.index_dir / LocalVectorIndex.META_FILE
+            documents = {}
+            if index_version(self.index_dir) == meta["documents_version"]:
+                with open(documents_path, "r", encoding="utf-8") as f:
+                    documents = json.load(f)
+            if documents.get("ids") != ids:
+                logger.warning(
+                    "BM25 index was built from a different local vector index, "
+                    "rebuild with scripts/build_search_indexes.py"
+                )
+                return False
+            contents = documents.get("contents", [])
+            metadatas = documents.get("metadatas", [])
+        else:
+            contents = meta.get("contents", [])
+            metadatas = meta.get("metadatas", [])
+
+        self._vocab = meta.get("vocab", {})
+        self._ids = ids
+        self._contents = contents
+        self._metadatas = metadatas
+        self._postings_doc = postings_doc
+        self._postings_tf = postings_tf
+        self._idf = idf
+        self._doc_len = doc_len
+        self._avg_len = float(doc_len.mean()) if len(doc_len) else 0.0
+        self._term_offsets = term_offsets
+        self._loaded_version = version
+        self._active = self
+
+        logger.info(f"Loaded BM25 index: {len(self._ids)} documents, {len(self._vocab)} terms")
+        return True
+
+    def ensure_loaded(self) -> bool:
+        """
+        검색 가능 여부 (쿼리 경로에서는 로드하지 않음)
+
+        준비 전이거나 bm25_version이 바뀌었으면 백그라운드 로드를 시작하고, 그동안은
+        기존 인덱스(없으면 False - 호출자가 ILIKE 검색 사용)로 검색합니다.
+        """
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            if self._active is None or self._disk_version() != self._loaded_version:
+                self.start_background_load()
+        return self._active is not None
+
+    def start_background_load(self) -> threading.Thread:
+        """인덱스 로드를 백그라운드에서 시작 (진행 중이면 그 스레드 반환)"""
+        with self._lock:
+            if self._loader is None or not self._loader.is_alive():
+                self._loader = threading.Thread(
+                    target=self._load_staged,
+                    name=f"bm25-index-{self.table_name}",
+                    daemon=True,
+                )
+                self._loader.start()
+            return self._loader
+
+    def _load_staged(self):
+        """새 인스턴스에 로드한 뒤 검색 대상을 교체 (검색 중인 기존 인덱스는 그대로 사용)"""
+        staged = type(self)(
+            table_name=self.table_name, index_dir=self.index_dir, k1=self.k1, b=self.b
+        )
+        try:
+            loaded = staged.load()
+        except Exception as e:
+            logger.warning(f"BM25 index load failed: {e}")
+            return
+        if loaded:
+            self._loaded_version = staged._loaded_version
+            self._active = staged
+
+    # ========== 검색 ==========
+
+    def get_scores(self, query: str) -> np.ndarray:
+        """전체 문서에 대한 BM25 점수 배열 (로드 전이면 빈 배열)"""
+        index = self._active
+        if index is None:
+            return np.zeros(0, dtype=np.float32)
+        scores = np.zeros(len(index._ids), dtype=np.float32)
+        if not index._avg_len:
+            return scores
+
+        norm = self.k1 * (1 - self.b + self.b * index._doc_len / index._avg_len)
+        for term in set(tokenize(query)):
+            term_id = index._vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = index._term_offsets[term_id], index._term_offsets[term_id + 1]
+            docs = index._postings_doc[start:end]
+            tf = index._postings_tf[start:end]
+            scores[docs] += index._idf[term_id] * tf * (self.k1 + 1) / (tf + norm[docs])
+        return scores
+
+    def search(
+        self, query: str, k: int = 10, filter_dict: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        BM25 상위 k개 문서 검색
+
+        Returns:
+            List of documents (id, content, metadata, bm25_score) - 점수 내림차순
+        """
+        if not self.ensure_loaded():
+            return []
+        index = self._active  # 검색 도중 교체되어도 같은 인덱스 사용
+
+        scores = index.get_scores(query)
+        if filter_dict:
+            mask = np.fromiter(
+                (matches_filter(m, filter_dict) for m in index._metadatas),
+                dtype=bool,
+                count=len(index._metadatas),
+            )
+            scores = np.where(mask, scores, 0.0)
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        return [
+            {
+                "id": index._ids[i],
+                "content": index._contents[i],
+                "metadata": index._metadatas[i],
+                "bm25_score": float(scores[i]),
+            }
+            for i in candidates.tolist()
+        ]
@@ -4,24 +4,105 @@ Supabase, VectorStore, GraphRAG, Finnhub 데이터를 병렬로 수집하여 성
 """
 
 import logging
+import threading
 from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from supabase import Client
 import os
 
+try:
+    from rag.postgrest_errors import MISSING_RELATIONSHIP, OptionalFeature
+    from rag.retrieval_utils import (
+        Deadline,
+        pg_quote,
+        request_source_timeouts,
+        source_timeouts_from_env,
+    )
+except ImportError:
+    from src.rag.postgrest_errors import MISSING_RELATIONSHIP, OptionalFeature
+    from src.rag.retrieval_utils import (
+        Deadline,
+        pg_quote,
+        request_source_timeouts,
+        source_timeouts_from_env,
+    )
+
 logger = logging.getLogger(__name__)
 
+# 다중 티커 in_() / or_() 조회 1회당 최대 티커 수 (PostgREST max-rows 1000 고려)
+BATCH_IN_CHUNK = 20
+
+# in_() 배치 재무 조회 페이지 크기 (PostgREST max-rows 기본값)
+REPORT_PAGE_SIZE = 1000
+
+# 재무 테이블 (결과 키 -> (테이블, 최신순 정렬 컬럼))
+FINANCIAL_TABLES = {
+    "annual": ("annual_reports", ["fiscal_year"]),
+    "quarterly": ("quarterly_reports", ["fiscal_year", "fiscal_quarter"]),
+    "prices": ("stock_prices", ["price_date"]),
+}
+# companies를 조인하여 티커로 직접 조회 (SupabaseClient.get_financial_summary와 동일 방식)
+TICKER_JOIN_SELECT = "*, companies!inner(ticker)"
+
+
+# 프로세스 공용 실행기 (요청마다 스레드 풀을 만들지 않음)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _financial_key(row: Dict, by_ticker: bool):
+    """재무 행의 기업 키 (by_ticker: companies 조인 티커, 아니면 company_id)"""
+    if by_ticker:
+        return (row.get("companies") or {}).get("ticker")
+    return row.get("company_id")
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get or create the process-wide bounded executor (DATA_RETRIEVER_WORKERS)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("DATA_RETRIEVER_WORKERS", "32")),
+                    thread_name_prefix="data-retriever",
+                )
+    return _executor
+
 
 class DataRetriever:
     """기업 분석에 필요한 모든 데이터를 병렬로 수집하는 유틸리티 클래스"""
 
     def __init__(
-        self, supabase: Client, vector_store=None, graph_rag=None, finnhub=None
+        self,
+        supabase: Client,
+        vector_store=None,
+        graph_rag=None,
+        finnhub=None,
+        timeout: Optional[float] = None,
+        source_timeouts: Optional[Dict[str, float]] = None,
     ):
+        """
+        Args:
+            timeout: 요청당 전체 수집 마감 시간(초). 초과한 소스는 기본값으로 채우고
+                결과의 source_status에 "timeout"으로 표시 (None이면 DATA_RETRIEVER_TIMEOUT, 기본 8초)
+            source_timeouts: 소스별 마감 시간(초) {"rag": 20, ...}
+                (None이면 DATA_RETRIEVER_SOURCE_TIMEOUTS). reranker 콜드 스타트 중에는
+                rag에 DATA_RETRIEVER_WARMUP_TIMEOUT(기본 60초) 적용
+        """
         self.supabase = supabase
         self.vector_store = vector_store
         self.graph_rag = graph_rag
         self.finnhub = finnhub
+        if timeout is None:
+            timeout = float(os.getenv("DATA_RETRIEVER_TIMEOUT", "8"))
+        self.timeout = timeout
+        if source_timeouts is None:
+            source_timeouts = source_timeouts_from_env()
+        self.source_timeouts = source_timeouts
+        self.warmup_timeout = float(os.getenv("DATA_RETRIEVER_WARMUP_TIMEOUT", "60"))
+        # 재무 테이블 티커 조인 미지원 시 company_id 조회 방식으로 대체 (일시 오류는 cooldown 후 재시도)
+        self._ticker_join = OptionalFeature("financial ticker join", MISSING_RELATIONSHIP)
 
     def get_company_context_parallel(
         self,
@@ -29,92 +110,252 @@ class DataRetriever:
         include_finnhub: bool = True,
         include_rag: bool = True,
         query: str = None,
+        timeout: Optional[float] = None,
     ) -> Dict:
         """
         여러 소스에서 기업 데이터를 병렬로 수집합니다.
         query가 제공되면 해당 질문에 대한 RAG 검색을 수행합니다.
+        마감 시간(timeout, 기본 self.timeout)을 넘긴 소스는 비워 두고 부분 결과를 반환하며,
+        소스별 상태는 results["source_status"]에 기록됩니다.
         """
         ticker = ticker.upper()
         results = {}
+        deadline = self._new_deadline(timeout)
 
-        # 병렬 실행을 위한 작업 정의
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            # 1. 기본 기업 정보 및 관계 (GraphRAG 또는 DB)
-            info_future = executor.submit(self._fetch_company_info, ticker)
-            rel_future = executor.submit(self._fetch_relationships, ticker)
-
-            # 2. RAG 컨텍스트 (VectorStore - Hybrid Search + Client-side Filtering)
-            rag_future = None
-            if include_rag and self.vector_store:
-                # 쿼리가 있으면 사용, 없으면 기본값
-                search_query = (
-                    f"{query} ({ticker})"
-                    if query
-                    else f"Latest business overview and risks for {ticker}"
-                )
+        # 병렬 실행을 위한 작업 정의 (프로세스 공용 실행기)
+        executor = get_executor()
 
-                # Filtering을 위해 더 많이 검색 (k=3 -> k=20)
-                rag_future = executor.submit(
-                    self.vector_store.search_by_company,
-                    search_query,
-                    company=ticker,
-                    k=8,  # Final reranked count (Increased from 5 to 8 for better Recall)
-                )
+        # 1. 기본 기업 정보 및 관계 (GraphRAG 또는 DB)
+        info_future = executor.submit(self._fetch_company_info, ticker)
+        rel_future = executor.submit(self._fetch_relationships, ticker)
 
-            # 3. 실시간 시세 및 지표 (Finnhub)
-            quote_future = None
-            rec_future = None
-            target_future = None
-            news_future = None
-            metrics_future = None
-            peers_future = None
-
-            if include_finnhub and self.finnhub:
-                quote_future = executor.submit(self.finnhub.get_quote, ticker)
-                rec_future = executor.submit(
-                    self.finnhub.get_recommendation_trends, ticker
-                )
-                target_future = executor.submit(self.finnhub.get_price_target, ticker)
-                news_future = executor.submit(self.finnhub.get_company_news, ticker)
-                metrics_future = executor.submit(
-                    self.finnhub.get_basic_financials, ticker
-                )
-                peers_future = executor.submit(self.finnhub.get_company_peers, ticker)
-
-            # 결과 수집
-            results["company"] = info_future.result()
-            results["relationships"] = rel_future.result()
-
-            if rag_future:
-                try:
-                    final_docs = rag_future.result() or []
-
-                    results["rag_context"] = (
-                        "\n".join([d.get("content", "")[:1000] for d in final_docs])
-                        if final_docs
-                        else ""
-                    )
-                except Exception as e:
-                    logger.error(f"RAG context processing failed: {e}")
-                    results["rag_context"] = ""
-
-            if include_finnhub and self.finnhub:
-                results["finnhub"] = {
-                    "quote": quote_future.result() if quote_future else {},
-                    "recommendations": rec_future.result() if rec_future else [],
-                    "price_target": target_future.result() if target_future else {},
-                    "news": news_future.result()[:5] if news_future else [],
-                    "metrics": metrics_future.result() if metrics_future else {},
-                    "peers": peers_future.result() if peers_future else [],
-                }
-
-            # 재무 데이터 (ID가 필요하므로 info 결과 대기 후 필요시 호출)
-            if results["company"] and "id" in results["company"]:
-                company_id = results["company"]["id"]
-                # 재무 데이터도 병렬 수집
-                results["financials"] = self._fetch_financial_data_parallel(company_id)
-            else:
-                results["financials"] = {"annual": [], "quarterly": [], "prices": []}
+        # 2. RAG 컨텍스트 + 3. 실시간 시세 및 지표 (Finnhub)
+        futures = self._submit_ticker_tasks(
+            executor, ticker, include_finnhub, include_rag, query
+        )
+
+        # 4. 재무 데이터 (티커 조인으로 기업 정보 조회와 동시에 시작)
+        join_futures = None
+        if self._ticker_join.available:
+            join_futures = self._submit_financials(executor, [ticker], by_ticker=True)
+
+        # 결과 수집
+        results["company"] = deadline.wait(info_future, "company")
+        results["relationships"] = deadline.wait(rel_future, "relationships", [])
+        results.update(self._collect_ticker_tasks(futures, deadline))
+
+        financials = None
+        if join_futures is not None:
+            financials = self._collect_financials(
+                join_futures, [ticker], deadline, by_ticker=True
+            )
+        if financials is not None:
+            results["financials"] = financials[ticker]
+        elif results["company"] and "id" in results["company"]:
+            # 조인 미지원: company_id로 재무 데이터 병렬 수집
+            company_id = results["company"]["id"]
+            results["financials"] = self._fetch_financial_data_parallel(
+                company_id, deadline
+            )
+        else:
+            results["financials"] = {"annual": [], "quarterly": [], "prices": []}
+
+        results["source_status"] = deadline.status
+        return results
+
+    def get_companies_context_parallel(
+        self,
+        tickers: List[str],
+        include_finnhub: bool = True,
+        include_rag: bool = True,
+        query: str = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Dict]:
+        """
+        여러 기업의 데이터를 한 번에 수집합니다. (비교 분석용)
+        - companies / company_relationships / 재무 보고서는 in_() 배치 조회
+        - RAG 검색과 Finnhub 호출은 프로세스 공용 실행기에서 동시 실행
+        - 전체 수집이 하나의 마감 시간(timeout)을 공유
+
+        Returns:
+            {ticker: get_company_context_parallel과 같은 형식의 dict}
+        """
+        tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+        if not tickers:
+            return {}
+
+        deadline = self._new_deadline(timeout)
+        executor = get_executor()
+
+        companies_future = executor.submit(self._fetch_companies_batch, tickers)
+        rels_future = executor.submit(self._fetch_relationships_batch, tickers)
+
+        # 시세는 get_quotes 1회로 일괄 조회 (yfinance fallback도 1회로 묶임)
+        quote_futures = {}
+        if include_finnhub and hasattr(self.finnhub, "get_quotes") and len(tickers) > 1:
+            quote_futures = self._split_quotes(
+                executor.submit(self.finnhub.get_quotes, tickers), tickers
+            )
+        ticker_futures = {
+            ticker: self._submit_ticker_tasks(
+                executor,
+                ticker,
+                include_finnhub,
+                include_rag,
+                query,
+                quote_future=quote_futures.get(ticker),
+            )
+            for ticker in tickers
+        }
+
+        # 재무 데이터 (티커 조인으로 기업 정보 조회와 동시에 시작)
+        join_futures = None
+        if self._ticker_join.available:
+            join_futures = self._submit_financials(executor, tickers, by_ticker=True)
+
+        companies = deadline.wait(companies_future, "company", {})
+        company_ids = {
+            ticker: company["id"]
+            for ticker, company in companies.items()
+            if company and "id" in company
+        }
+
+        financials = None
+        if join_futures is not None:
+            financials = self._collect_financials(
+                join_futures, tickers, deadline, by_ticker=True
+            )
+        if financials is None:
+            # 조인 미지원: 기업 정보 조회 후 company_id로 배치 조회
+            ids = list(company_ids.values())
+            by_id = self._collect_financials(
+                self._submit_financials(executor, ids, by_ticker=False), ids, deadline
+            )
+            financials = {ticker: by_id[cid] for ticker, cid in company_ids.items()}
+        relationships = deadline.wait(rels_future, "relationships", {})
+
+        results = {}
+        for ticker in tickers:
+            ticker_deadline = deadline.child()
+            context = {
+                "company": companies.get(ticker),
+                "relationships": relationships.get(ticker, []),
+            }
+            context.update(
+                self._collect_ticker_tasks(ticker_futures[ticker], ticker_deadline)
+            )
+            context["financials"] = financials.get(
+                ticker, {"annual": [], "quarterly": [], "prices": []}
+            )
+            context["source_status"] = ticker_deadline.status
+            results[ticker] = context
+
+        return results
+
+    def _new_deadline(self, timeout: Optional[float] = None) -> Deadline:
+        """요청 마감 시간 (timeout 미지정 시 self.timeout, 소스별 마감 시간 포함)"""
+        return Deadline(
+            self.timeout if timeout is None else timeout,
+            source_timeouts=request_source_timeouts(self.source_timeouts, self.warmup_timeout),
+        )
+
+    def _submit_ticker_tasks(
+        self,
+        executor: ThreadPoolExecutor,
+        ticker: str,
+        include_finnhub: bool,
+        include_rag: bool,
+        query: Optional[str],
+        quote_future: Optional[Future] = None,
+    ) -> Dict[str, Future]:
+        """티커별 RAG 검색 / Finnhub 호출 제출 (quote_future: 일괄 조회된 시세)"""
+        futures = {}
+
+        # RAG 컨텍스트 (VectorStore - Hybrid Search + Client-side Filtering)
+        if include_rag and self.vector_store:
+            # 쿼리가 있으면 사용, 없으면 기본값
+            search_query = (
+                f"{query} ({ticker})"
+                if query
+                else f"Latest business overview and risks for {ticker}"
+            )
+
+            # Filtering을 위해 더 많이 검색 (k=3 -> k=20)
+            futures["rag"] = executor.submit(
+                self.vector_store.search_by_company,
+                search_query,
+                company=ticker,
+                k=8,  # Final reranked count (Increased from 5 to 8 for better Recall)
+            )
+
+        # 실시간 시세 및 지표 (Finnhub)
+        if include_finnhub and self.finnhub:
+            futures["quote"] = quote_future or executor.submit(
+                self.finnhub.get_quote, ticker
+            )
+            futures["recommendations"] = executor.submit(
+                self.finnhub.get_recommendation_trends, ticker
+            )
+            futures["price_target"] = executor.submit(
+                self.finnhub.get_price_target, ticker
+            )
+            futures["news"] = executor.submit(self.finnhub.get_company_news, ticker)
+            futures["metrics"] = executor.submit(
+                self.finnhub.get_basic_financials, ticker
+            )
+            futures["peers"] = executor.submit(self.finnhub.get_company_peers, ticker)
+
+        return futures
+
+    @staticmethod
+    def _split_quotes(frame_future: Future, tickers: List[str]) -> Dict[str, Future]:
+        """get_quotes 결과 프레임을 티커별 quote dict Future로 분배 (대기 스레드 없이 콜백으로)"""
+        futures = {ticker: Future() for ticker in tickers}
+
+        def _distribute(done: Future):
+            try:
+                frame, error = done.result(), None
+            except Exception as e:
+                frame, error = None, e
+            for ticker, future in futures.items():
+                # 마감 시간 초과로 이미 취소된 Future는 건너뜀
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(frame.loc[ticker].dropna().to_dict())
+
+        frame_future.add_done_callback(_distribute)
+        return futures
+
+    def _collect_ticker_tasks(
+        self, futures: Dict[str, Future], deadline: Deadline
+    ) -> Dict:
+        """_submit_ticker_tasks 결과를 rag_context / finnhub 항목으로 수집 (마감 시간 내)"""
+        results = {}
+
+        if "rag" in futures:
+            final_docs = deadline.wait(futures["rag"], "rag", [])
+            results["rag_context"] = (
+                "\n".join([d.get("content", "")[:1000] for d in final_docs])
+                if final_docs
+                else ""
+            )
+
+        if "quote" in futures:
+            results["finnhub"] = {
+                "quote": deadline.wait(futures["quote"], "finnhub.quote", {}),
+                "recommendations": deadline.wait(
+                    futures["recommendations"], "finnhub.recommendations", []
+                ),
+                "price_target": deadline.wait(
+                    futures["price_target"], "finnhub.price_target", {}
+                ),
+                "news": deadline.wait(futures["news"], "finnhub.news", [])[:5],
+                "metrics": deadline.wait(futures["metrics"], "finnhub.metrics", {}),
+                "peers": deadline.wait(futures["peers"], "finnhub.peers", []),
+            }
 
         return results
 
@@ -151,47 +392,145 @@ class DataRetriever:
                 pass
 
         try:
-            out = (
-                self.supabase.table("company_relationships")
-                .select("*")
-                .eq("source_ticker", ticker)
-                .execute()
-            )
-            inc = (
+            # outgoing/incoming을 or 필터 1회로 조회
+            value = pg_quote(ticker)
+            res = (
                 self.supabase.table("company_relationships")
                 .select("*")
-                .eq("target_ticker", ticker)
+                .or_(f"source_ticker.eq.{value},target_ticker.eq.{value}")
                 .execute()
             )
-            return (out.data or []) + (inc.data or [])
+            return res.data or []
         except Exception:
             return []
 
-    def _fetch_financial_data_parallel(self, company_id: str) -> Dict:
-        """재무 데이터를 병렬로 수집"""
+    def _fetch_financial_data_parallel(
+        self, company_id: str, deadline: Optional[Deadline] = None
+    ) -> Dict:
+        """재무 데이터를 병렬로 수집 (실패/마감 초과 테이블은 빈 리스트)"""
+        deadline = deadline or self._new_deadline()
+        futures = self._submit_financials(get_executor(), [company_id], by_ticker=False)
+        return self._collect_financials(futures, [company_id], deadline)[company_id]
 
-        def _safe_query(table, order_cols):
-            try:
-                q = self.supabase.table(table).select("*").eq("company_id", company_id)
-                for col in order_cols:
-                    q = q.order(col, desc=True)
-                return q.limit(5).execute().data
-            except Exception:
-                return []
+    def _submit_financials(
+        self, executor: ThreadPoolExecutor, keys: List, by_ticker: bool
+    ) -> List:
+        """
+        재무 테이블 조회 제출 (by_ticker: companies 조인 티커 기준, 아니면 company_id 기준)
+        - annual/quarterly_reports: in_() 배치를 페이지 단위로 조회 후 기업별 최신 5건
+          (max-rows에 잘려 일부 기업이 빠지지 않도록 id로 순서를 고정하고,
+          최신순이므로 모든 기업이 5건을 채우면 이후 페이지는 생략)
+        - stock_prices: 기업당 행 수가 많아 기업별 limit 조회를 병렬 실행
+        """
+        column = "companies.ticker" if by_ticker else "company_id"
+        select = TICKER_JOIN_SELECT if by_ticker else "*"
 
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            ann_f = executor.submit(
-                lambda: _safe_query("annual_reports", ["fiscal_year"])
-            )
-            qrt_f = executor.submit(
-                lambda: _safe_query(
-                    "quarterly_reports", ["fiscal_year", "fiscal_quarter"]
+        def _ordered(q, order_cols):
+            for col in order_cols:
+                q = q.order(col, desc=True)
+            return q
+
+        def _query(table, order_cols, values):
+            if len(values) == 1:
+                q = self.supabase.table(table).select(select).eq(column, values[0])
+                return _ordered(q, order_cols).limit(5).execute().data
+
+            rows, counts, start = [], {}, 0
+            while True:
+                q = self.supabase.table(table).select(select).in_(column, values)
+                page = (
+                    _ordered(q, order_cols)
+                    .order("id")
+                    .range(start, start + REPORT_PAGE_SIZE - 1)
+                    .execute()
+                    .data
+                    or []
                 )
-            )
-            prc_f = executor.submit(lambda: _safe_query("stock_prices", ["price_date"]))
+                rows.extend(page)
+                for row in page:
+                    key = _financial_key(row, by_ticker)
+                    counts[key] = counts.get(key, 0) + 1
+                if len(page) < REPORT_PAGE_SIZE or all(counts.get(v, 0) >= 5 for v in values):
+                    return rows
+                start += REPORT_PAGE_SIZE
 
-            return {
-                "annual": ann_f.result() or [],
-                "quarterly": qrt_f.result() or [],
-                "prices": prc_f.result() or [],
-            }
+        futures = []
+        for kind, (table, order_cols) in FINANCIAL_TABLES.items():
+            size = 1 if kind == "prices" else BATCH_IN_CHUNK
+            for i in range(0, len(keys), size):
+                futures.append(
+                    (kind, executor.submit(_query, table, order_cols, keys[i : i + size]))
+                )
+        return futures
+
+    def _collect_financials(
+        self, futures: List, keys: List, deadline: Deadline, by_ticker: bool = False
+    ) -> Optional[Dict]:
+        """
+        _submit_financials 결과를 기업별 {"annual", "quarterly", "prices"}로 정리
+        (티커 조인 쿼리가 실패하면 조인 방식을 끄고 None 반환)
+        """
+        financials = {key: {"annual": [], "quarterly": [], "prices": []} for key in keys}
+        for kind, future in futures:
+            for row in deadline.wait(future, f"financials.{kind}", []):
+                key = _financial_key(row, by_ticker)
+                row.pop("companies", None)
+                rows = financials.get(key, {}).get(kind)
+                if rows is not None and len(rows) < 5:
+                    rows.append(row)
+
+        join_errors = [
+            deadline.errors[f"financials.{kind}"]
+            for kind in FINANCIAL_TABLES
+            if deadline.status.get(f"financials.{kind}") == "error"
+        ]
+        if by_ticker and join_errors:
+            # 이번 요청은 company_id 조회로 대체, 조인 미지원(PGRST200)일 때만 계속 대체
+            self._ticker_join.failed(join_errors[0])
+            for kind in FINANCIAL_TABLES:
+                deadline.errors.pop(f"financials.{kind}", None)
+                deadline.status.pop(f"financials.{kind}", None)
+            return None
+
+        return financials
+
+    def _fetch_companies_batch(self, tickers: List[str]) -> Dict[str, Dict]:
+        """여러 기업 기본 정보를 in_() 배치 조회 (ticker -> company)"""
+        companies = {}
+        for i in range(0, len(tickers), BATCH_IN_CHUNK):
+            try:
+                res = (
+                    self.supabase.table("companies")
+                    .select("*")
+                    .in_("ticker", tickers[i : i + BATCH_IN_CHUNK])
+                    .execute()
+                )
+                for row in res.data or []:
+                    companies.setdefault(row.get("ticker"), row)
+            except Exception as e:
+                logger.error(f"Batch company fetch failed: {e}")
+        return companies
+
+    def _fetch_relationships_batch(self, tickers: List[str]) -> Dict[str, List[Dict]]:
+        """여러 기업의 outgoing/incoming 관계를 or 필터로 배치 조회 (ticker -> rows)"""
+        by_ticker = {ticker: [] for ticker in tickers}
+        for i in range(0, len(tickers), BATCH_IN_CHUNK):
+            values = ",".join(pg_quote(t) for t in tickers[i : i + BATCH_IN_CHUNK])
+            try:
+                res = (
+                    self.supabase.table("company_relationships")
+                    .select("*")
+                    .or_(f"source_ticker.in.({values}),target_ticker.in.({values})")
+                    .execute()
+                )
+            except Exception as e:
+                logger.error(f"Batch relationship fetch failed: {e}")
+                continue
+            for row in res.data or []:
+                source = row.get("source_ticker")
+                target = row.get("target_ticker")
+                if source in by_ticker:
+                    by_ticker[source].append(row)
+                if target in by_ticker and target != source:
+                    by_ticker[target].append(row)
+        return by_ticker
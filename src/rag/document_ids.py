@@ -0,0 +1,30 @@
+"""
+Document IDs - documents 테이블 청크의 콘텐츠 해시와 결정적 ID
+임베딩 스크립트(scripts/embed_10k_documents.py)와 VectorStore.add_documents(dedup=True)가
+같은 규칙을 사용하므로, 어느 경로로 적재해도 같은 청크는 같은 행으로 upsert됩니다.
+
+- 해시: 청크 텍스트 SHA-256 앞 32자리 (metadata.content_hash에 저장)
+- ID: uuid5(DOCUMENT_NAMESPACE, "ticker:section:hash") - 기업/섹션 범위의 콘텐츠 주소
+"""
+
+import hashlib
+import uuid
+from typing import Dict, Optional, Tuple
+
+DOCUMENT_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "10k-documents")
+
+
+def content_hash(text: str) -> str:
+    """청크 텍스트 해시 (SHA-256 앞 32자리)"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:32]
+
+
+def document_id(ticker: Optional[str], section: Optional[str], chunk_hash: str) -> str:
+    """(ticker, section, 콘텐츠 해시)로부터 결정적 문서 ID 생성"""
+    return str(uuid.uuid5(DOCUMENT_NAMESPACE, f"{ticker or ''}:{section or ''}:{chunk_hash}"))
+
+
+def document_key(metadata: Optional[Dict], chunk_hash: str) -> Tuple[str, str, str]:
+    """중복 판정 키 (ticker, section, 콘텐츠 해시)"""
+    metadata = metadata or {}
+    return (metadata.get("ticker") or "", metadata.get("section") or "", chunk_hash)
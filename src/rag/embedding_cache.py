@@ -0,0 +1,179 @@
+"""
+Embedding Cache - 질의 임베딩/검색어 번역 결과 캐시
+(model, 정규화된 텍스트) 해시를 키로 사용하며 VectorStore, GraphRAG, AnalystChatbot이 공유합니다.
+
+- 1차: 프로세스 메모리 LRU
+- 2차(선택): SQLite 디스크 캐시 (EMBEDDING_CACHE_PATH 환경 변수로 활성화)
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CacheValue = Union[List[float], str]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (유니코드 NFKC, 공백 축약, 대소문자 무시)"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def make_key(model: str, text: str) -> str:
+    """(model, 정규화된 텍스트)의 SHA-256 해시"""
+    payload = f"{model}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """메모리 LRU + 선택적 SQLite 2단계 캐시"""
+
+    def __init__(self, max_entries: int = 4096, db_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: 메모리 캐시 최대 항목 수 (초과 시 LRU 제거)
+            db_path: SQLite 파일 경로 (None이면 메모리 캐시만 사용)
+        """
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, CacheValue]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            try:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache "
+                    "(key TEXT PRIMARY KEY, kind TEXT NOT NULL, value BLOB NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding disk cache disabled: {e}")
+                self._db = None
+
+    # ========== 직렬화 ==========
+
+    @staticmethod
+    def _encode(value: CacheValue):
+        if isinstance(value, str):
+            return "text", value.encode("utf-8")
+        return "vec", array("f", value).tobytes()
+
+    @staticmethod
+    def _decode(kind: str, blob: bytes) -> CacheValue:
+        if kind == "text":
+            return blob.decode("utf-8")
+        vec = array("f")
+        vec.frombytes(blob)
+        return vec.tolist()
+
+    # ========== 조회 / 저장 ==========
+
+    def _remember(self, key: str, value: CacheValue):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, model: str, text: str) -> Optional[CacheValue]:
+        """캐시 조회 (없으면 None)"""
+        key = make_key(model, text)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT kind, value FROM cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding disk cache read failed: {e}")
+                    row = None
+                if row:
+                    value = self._decode(row[0], row[1])
+                    self._remember(key, value)
+                    self.hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, model: str, text: str, value: CacheValue):
+        """캐시 저장 (메모리 + 디스크)"""
+        key = make_key(model, text)
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                try:
+                    kind, blob = self._encode(value)
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache (key, kind, value) VALUES (?, ?, ?)",
+                        (key, kind, blob),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding disk cache write failed: {e}")
+
+    def get_or_create(
+        self, model: str, text: str, factory: Callable[[], CacheValue]
+    ) -> CacheValue:
+        """캐시에 있으면 반환, 없으면 factory()로 생성 후 저장"""
+        cached = self.get(model, text)
+        if cached is not None:
+            return cached
+        value = factory()
+        if value:
+            self.set(model, text, value)
+        return value
+
+    def clear(self):
+        """메모리 캐시 비우기 (디스크 캐시는 유지)"""
+        with self._lock:
+            self._memory.clear()
+
+    def get_stats(self) -> dict:
+        """캐시 적중률 통계"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "disk": self._db is not None,
+        }
+
+
+# 싱글톤 인스턴스
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+                    db_path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+                )
+    return _cache
@@ -0,0 +1,89 @@
+"""
+Extraction Cache - 관계 추출 결과 디스크 캐시
+GraphRAG.extract_relationships_batch가 같은 청크를 다시 LLM에 보내지 않도록 합니다.
+
+- 키: (모델, source ticker, 청크 텍스트) SHA-256 (텍스트는 정규화하지 않음 - 대소문자/공백도 결과에 영향)
+- 값: 추출된 관계 목록 JSON
+- SQLite 파일은 첫 조회 시 연결 (캐시를 사용하지 않는 호출은 파일을 열지 않음)
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# RELATIONSHIP_CACHE_PATH 미설정 시 기본 위치
+DEFAULT_EXTRACTION_CACHE_PATH = (
+    Path(__file__).parent.parent.parent / "data" / "cache" / "relationship_extraction.sqlite"
+)
+
+
+class ExtractionCache:
+    """관계 추출 결과 SQLite 캐시 (thread-safe)"""
+
+    def __init__(self, db_path: Path = DEFAULT_EXTRACTION_CACHE_PATH):
+        self.db_path = Path(db_path)
+        self._db: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, source_ticker: Optional[str], text: str) -> str:
+        payload = f"{model}\x00{source_ticker or ''}\x00{text}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """SQLite 연결 (1회, 실패 시 캐시 없이 동작)"""
+        if self._db is None and not self._disabled:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS extractions "
+                    "(key TEXT PRIMARY KEY, relationships TEXT NOT NULL)"
+                )
+                self._db.commit()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Relationship extraction cache disabled: {e}")
+                self._db = None
+                self._disabled = True
+        return self._db
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """캐시된 추출 결과 (없으면 None)"""
+        with self._lock:
+            db = self._connect()
+            row = None
+            if db is not None:
+                try:
+                    row = db.execute(
+                        "SELECT relationships FROM extractions WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"Relationship extraction cache read failed: {e}")
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, relationships: List[Dict]):
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO extractions (key, relationships) VALUES (?, ?)",
+                    (key, json.dumps(relationships, ensure_ascii=False)),
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Relationship extraction cache write failed: {e}")
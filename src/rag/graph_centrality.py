@@ -0,0 +1,151 @@
+"""
+Centrality Store - 그래프 버전별 중심성 사전 계산
+GraphRAG.get_centrality가 매 호출마다 중심성을 다시 계산하지 않도록 합니다.
+
+- 그래프 구조당 1회 계산 후 스냅샷 디렉토리에 centrality.npz로 저장 (다른 프로세스 재사용)
+  (GraphSnapshot.fingerprint로 검증 - 버전 번호가 재사용되어도 다른 그래프의 점수를 쓰지 않음)
+- 연결 중심성은 CSR 차수 배열에서 바로 계산
+- 노드 수가 많으면 매개 중심성을 샘플링 근사 (GRAPH_BETWEENNESS_SAMPLES)
+- 지표별 내림차순 정렬 인덱스를 저장하여 top_n 조회는 O(top_n)
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+
+try:
+    from rag.graph_snapshot import GraphSnapshot
+except ImportError:
+    from src.rag.graph_snapshot import GraphSnapshot
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("degree_centrality", "betweenness_centrality", "closeness_centrality")
+CENTRALITY_FILE = "centrality.npz"
+# 이 노드 수를 넘으면 매개 중심성을 샘플링 근사 (GRAPH_BETWEENNESS_SAMPLES 미설정 시)
+EXACT_BETWEENNESS_MAX_NODES = 2000
+DEFAULT_BETWEENNESS_SAMPLES = 256
+
+
+def _betweenness_samples(num_nodes: int) -> Optional[int]:
+    """샘플 수 결정 (None이면 정확 계산, GRAPH_BETWEENNESS_SAMPLES=0이면 항상 정확 계산)"""
+    env_value = os.getenv("GRAPH_BETWEENNESS_SAMPLES")
+    if env_value is not None:
+        samples = int(env_value)
+    elif num_nodes > EXACT_BETWEENNESS_MAX_NODES:
+        samples = DEFAULT_BETWEENNESS_SAMPLES
+    else:
+        samples = 0
+    return samples if 0 < samples < num_nodes else None
+
+
+class CentralityStore:
+    """그래프 구조 하나(fingerprint)의 중심성 점수와 정렬 인덱스"""
+
+    def __init__(
+        self,
+        version: int,
+        tickers: List[str],
+        scores: Dict[str, np.ndarray],
+        betweenness_samples: int = 0,
+        fingerprint: str = "",
+    ):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.tickers = tickers
+        self.scores = scores
+        self.betweenness_samples = betweenness_samples
+        # 지표별 내림차순 노드 순서 (동점은 티커 순)
+        self.order = {
+            metric: np.argsort(-values, kind="stable") for metric, values in scores.items()
+        }
+
+    @classmethod
+    def compute(
+        cls, snapshot: GraphSnapshot, graph: Optional[nx.DiGraph] = None
+    ) -> "CentralityStore":
+        """스냅샷으로 중심성 계산 (graph: 이미 만들어진 NetworkX 그래프 재사용)"""
+        n = snapshot.num_nodes
+        graph = graph if graph is not None else snapshot.to_networkx()
+        index = snapshot.ticker_index
+
+        def _to_array(values: Dict[str, float]) -> np.ndarray:
+            array = np.zeros(n, dtype=np.float64)
+            for ticker, value in values.items():
+                array[index[ticker]] = value
+            return array
+
+        # 연결 중심성: (in + out degree) / (n - 1)
+        degree = (np.diff(snapshot.indptr) + np.diff(snapshot.rev_indptr)).astype(np.float64)
+        degree = degree / (n - 1) if n > 1 else np.ones(n, dtype=np.float64)
+
+        samples = _betweenness_samples(n)
+        betweenness = _to_array(nx.betweenness_centrality(graph, k=samples, seed=42))
+
+        # DiGraph에서는 연결되지 않은 노드가 있을 수 있어 예외 처리
+        try:
+            closeness = _to_array(nx.closeness_centrality(graph))
+        except Exception as e:
+            logger.warning(f"Closeness centrality failed: {e}")
+            closeness = np.zeros(n, dtype=np.float64)
+
+        logger.info(
+            f"Computed centrality for graph v{snapshot.version} "
+            f"({n} nodes, betweenness {'sampled k=' + str(samples) if samples else 'exact'})"
+        )
+        return cls(
+            version=snapshot.version,
+            tickers=snapshot.tickers,
+            scores={
+                "degree_centrality": degree,
+                "betweenness_centrality": betweenness,
+                "closeness_centrality": closeness,
+            },
+            betweenness_samples=samples or 0,
+            fingerprint=snapshot.fingerprint,
+        )
+
+    def save(self, path: Path):
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                version=np.int64(self.version),
+                fingerprint=np.array(self.fingerprint),
+                betweenness_samples=np.int64(self.betweenness_samples),
+                **self.scores,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, snapshot: GraphSnapshot) -> Optional["CentralityStore"]:
+        """저장된 점수 로드 (그래프 fingerprint가 스냅샷과 다르면 None)"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                # fingerprint가 없는 이전 포맷은 다시 계산
+                if "fingerprint" not in data.files or str(data["fingerprint"]) != snapshot.fingerprint:
+                    return None
+                scores = {metric: data[metric] for metric in METRICS}
+                samples = int(data["betweenness_samples"])
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Centrality load failed: {e}")
+            return None
+        if any(len(values) != snapshot.num_nodes for values in scores.values()):
+            return None
+        return cls(snapshot.version, snapshot.tickers, scores, samples, snapshot.fingerprint)
+
+    def top(self, metric: str, top_n: int = 10) -> List[Dict]:
+        """지표 상위 top_n 기업"""
+        values = self.scores[metric]
+        return [
+            {"ticker": self.tickers[i], "score": round(float(values[i]), 4)}
+            for i in self.order[metric][:top_n].tolist()
+        ]
@@ -0,0 +1,265 @@
+"""
+Path Engine - 관계 그래프 경로 탐색
+GraphRAG.find_shortest_path가 요청마다 to_undirected()로 그래프를 복사하지 않도록 합니다.
+
+- 그래프 내용(fingerprint)당 1회 방향 무시 인접 CSR 생성 (쌍별 대표 엣지, 최소 가중치)
+- 양방향 BFS (홉 수 기준) / Dijkstra (weight = 1 - confidence 기준)
+- Yen 알고리즘으로 k-최단 경로
+- 자주 조회되는 (source, target) 결과 LRU 메모이제이션
+"""
+
+import heapq
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    from rag.graph_snapshot import GraphSnapshot
+except ImportError:
+    from src.rag.graph_snapshot import GraphSnapshot
+
+PATH_CACHE_SIZE = 2048
+
+Path = List[int]
+
+
+class PathEngine:
+    """GraphSnapshot 하나에 대한 방향 무시 경로 탐색기"""
+
+    def __init__(self, snapshot: GraphSnapshot, cache_size: int = PATH_CACHE_SIZE):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.fingerprint = snapshot.fingerprint
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, List[Tuple[Path, float]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._build_adjacency()
+
+    def _build_adjacency(self):
+        """정/역방향 엣지를 합쳐 (u, v) 쌍당 하나의 항목을 갖는 CSR 생성"""
+        snapshot = self.snapshot
+        n, m = snapshot.num_nodes, snapshot.num_edges
+        sources = np.repeat(np.arange(n, dtype=np.int32), np.diff(snapshot.indptr))
+        targets = np.asarray(snapshot.indices, dtype=np.int32)
+        edge_ids = np.arange(m, dtype=np.int32)
+        weights = 1.0 - np.asarray(snapshot.confidence, dtype=np.float64)
+
+        u = np.concatenate([sources, targets])
+        v = np.concatenate([targets, sources])
+        edges = np.concatenate([edge_ids, edge_ids])
+        forward = np.concatenate([np.ones(m, dtype=bool), np.zeros(m, dtype=bool)])
+        w = np.concatenate([weights, weights])
+
+        # (u, v) 정렬, 같은 쌍에서는 정방향 엣지 우선 (u -> v 관계를 대표로 표시)
+        order = np.lexsort((~forward, v, u))
+        u, v, edges, forward, w = u[order], v[order], edges[order], forward[order], w[order]
+
+        first = np.ones(len(u), dtype=bool)
+        first[1:] = (u[1:] != u[:-1]) | (v[1:] != v[:-1])
+        starts = np.flatnonzero(first)
+
+        self.adj_indices = v[starts]
+        self.adj_edges = edges[starts]
+        self.adj_forward = forward[starts]
+        self.adj_weight = np.minimum.reduceat(w, starts) if len(starts) else w
+        self.adj_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(u[starts], minlength=n), out=self.adj_indptr[1:])
+
+        # 탐색 루프용 파이썬 리스트 (numpy 스칼라 접근 비용 제거)
+        self._neighbors = [
+            self.adj_indices[self.adj_indptr[i] : self.adj_indptr[i + 1]].tolist()
+            for i in range(n)
+        ]
+        self._weights = [
+            self.adj_weight[self.adj_indptr[i] : self.adj_indptr[i + 1]].tolist()
+            for i in range(n)
+        ]
+
+    # ========== 인접 정보 ==========
+
+    def _pair_index(self, a: int, b: int) -> int:
+        start, end = int(self.adj_indptr[a]), int(self.adj_indptr[a + 1])
+        return start + int(np.searchsorted(self.adj_indices[start:end], b))
+
+    def path_cost(self, path: Path, weighted: bool) -> float:
+        if not weighted:
+            return float(len(path) - 1)
+        return float(
+            sum(self.adj_weight[self._pair_index(a, b)] for a, b in zip(path, path[1:]))
+        )
+
+    def path_details(self, path: Path) -> List[Dict]:
+        """경로의 각 구간 관계 (원래 방향 기준 →/←)"""
+        snapshot = self.snapshot
+        details = []
+        for a, b in zip(path, path[1:]):
+            pos = self._pair_index(a, b)
+            edge = int(self.adj_edges[pos])
+            details.append(
+                {
+                    "from": snapshot.tickers[a],
+                    "to": snapshot.tickers[b],
+                    "direction": "→" if self.adj_forward[pos] else "←",
+                    "relationship": snapshot.edge_attrs(edge)["relationship_type"],
+                }
+            )
+        return details
+
+    # ========== 탐색 ==========
+
+    @staticmethod
+    def _allowed(
+        a: int, b: int, banned_nodes: Set[int], banned_edges: Set[Tuple[int, int]]
+    ) -> bool:
+        if b in banned_nodes:
+            return False
+        return not banned_edges or (min(a, b), max(a, b)) not in banned_edges
+
+    def _bfs(
+        self,
+        source: int,
+        target: int,
+        banned_nodes: Set[int] = frozenset(),
+        banned_edges: Set[Tuple[int, int]] = frozenset(),
+    ) -> Optional[Path]:
+        """양방향 BFS (작은 쪽 frontier부터 확장)"""
+        if source == target:
+            return [source]
+        neighbors = self._neighbors
+        pred = {source: None}
+        succ = {target: None}
+        forward_fringe, reverse_fringe = [source], [target]
+
+        while forward_fringe and reverse_fringe:
+            if len(forward_fringe) <= len(reverse_fringe):
+                level, forward_fringe = forward_fringe, []
+                visited, other, fringe = pred, succ, forward_fringe
+            else:
+                level, reverse_fringe = reverse_fringe, []
+                visited, other, fringe = succ, pred, reverse_fringe
+
+            for node in level:
+                for nbr in neighbors[node]:
+                    if not self._allowed(node, nbr, banned_nodes, banned_edges):
+                        continue
+                    if nbr not in visited:
+                        visited[nbr] = node
+                        fringe.append(nbr)
+                    if nbr in other:
+                        return self._join(pred, succ, nbr)
+        return None
+
+    @staticmethod
+    def _join(pred: Dict, succ: Dict, meet: int) -> Path:
+        path = []
+        node = meet
+        while node is not None:
+            path.append(node)
+            node = pred[node]
+        path.reverse()
+        node = succ[meet]
+        while node is not None:
+            path.append(node)
+            node = succ[node]
+        return path
+
+    def _dijkstra(
+        self,
+        source: int,
+        target: int,
+        banned_nodes: Set[int] = frozenset(),
+        banned_edges: Set[Tuple[int, int]] = frozenset(),
+    ) -> Optional[Path]:
+        """신뢰도 가중치(1 - confidence) 최단 경로"""
+        dist = {source: 0.0}
+        prev = {source: None}
+        heap = [(0.0, source)]
+        done = set()
+
+        while heap:
+            d, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            if node == target:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = prev[node]
+                return path[::-1]
+            done.add(node)
+            for nbr, w in zip(self._neighbors[node], self._weights[node]):
+                if nbr in done or not self._allowed(node, nbr, banned_nodes, banned_edges):
+                    continue
+                nd = d + w
+                if nbr not in dist or nd < dist[nbr]:
+                    dist[nbr] = nd
+                    prev[nbr] = node
+                    heapq.heappush(heap, (nd, nbr))
+        return None
+
+    def _k_shortest(self, source: int, target: int, k: int, weighted: bool) -> List[Path]:
+        """Yen 알고리즘 (단순 경로 k개, 비용 오름차순)"""
+        search = self._dijkstra if weighted else self._bfs
+        first = search(source, target)
+        if first is None:
+            return []
+
+        paths = [first]
+        seen = {tuple(first)}
+        candidates: List[Tuple[float, int, Path]] = []
+        counter = 0
+
+        while len(paths) < k:
+            last = paths[-1]
+            for j in range(len(last) - 1):
+                spur, root = last[j], last[: j + 1]
+                banned_edges = {
+                    (min(p[j], p[j + 1]), max(p[j], p[j + 1]))
+                    for p in paths
+                    if len(p) > j + 1 and p[: j + 1] == root
+                }
+                spur_path = search(spur, target, set(root[:-1]), banned_edges)
+                if spur_path is None:
+                    continue
+                candidate = root[:-1] + spur_path
+                if tuple(candidate) in seen:
+                    continue
+                seen.add(tuple(candidate))
+                counter += 1
+                heapq.heappush(
+                    candidates, (self.path_cost(candidate, weighted), counter, candidate)
+                )
+
+            if not candidates:
+                break
+            paths.append(heapq.heappop(candidates)[2])
+
+        return paths
+
+    def find_paths(
+        self, source: int, target: int, k: int = 1, weighted: bool = False
+    ) -> List[Tuple[Path, float]]:
+        """
+        source -> target 경로 최대 k개 (방향 무시)
+
+        Returns:
+            [(노드 ID 경로, 비용)] - weighted=False면 비용은 홉 수
+        """
+        key = (source, target, k, weighted)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        paths = [
+            (path, self.path_cost(path, weighted))
+            for path in self._k_shortest(source, target, k, weighted)
+        ]
+
+        with self._cache_lock:
+            self._cache[key] = paths
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return paths
@@ -6,16 +6,108 @@ Uses: companies, company_relationships, documents tables
 import os
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 import networkx as nx
 from openai import OpenAI
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+try:
+    from rag.embedding_cache import get_embedding_cache
+    from rag.extraction_cache import DEFAULT_EXTRACTION_CACHE_PATH, ExtractionCache
+    from rag.graph_centrality import CENTRALITY_FILE, METRICS, CentralityStore
+    from rag.graph_paths import PathEngine
+    from rag.graph_snapshot import DEFAULT_SNAPSHOT_DIR, GraphSnapshot
+    from rag.postgrest_errors import (
+        MISSING_COLUMN,
+        MISSING_CONFLICT_TARGET,
+        OptionalFeature,
+        error_code,
+    )
+    from rag.retrieval_utils import pg_in_list
+except ImportError:
+    from src.rag.embedding_cache import get_embedding_cache
+    from src.rag.extraction_cache import DEFAULT_EXTRACTION_CACHE_PATH, ExtractionCache
+    from src.rag.graph_centrality import CENTRALITY_FILE, METRICS, CentralityStore
+    from src.rag.graph_paths import PathEngine
+    from src.rag.graph_snapshot import DEFAULT_SNAPSHOT_DIR, GraphSnapshot
+    from src.rag.postgrest_errors import (
+        MISSING_COLUMN,
+        MISSING_CONFLICT_TARGET,
+        OptionalFeature,
+        error_code,
+    )
+    from src.rag.retrieval_utils import pg_in_list
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# in_() / or_() 필터 1회당 최대 값 개수 (URL 길이 제한 고려)
+IN_FILTER_CHUNK = 100
+# company_relationships 페이지 크기 (PostgREST 기본 max-rows)
+RELATIONSHIP_PAGE_SIZE = 1000
+# company_relationships 자연 키 (unique index 필요, 01_data_preprocessing/README.md 참고)
+RELATIONSHIP_KEY = ("source_ticker", "target_ticker", "relationship_type")
+
+RELATIONSHIP_TYPES = [
+    "partnership",
+    "acquisition",
+    "supplier",
+    "customer",
+    "competitor",
+    "subsidiary",
+    "investment",
+]
+
+_RELATIONSHIP_PROPERTIES = {
+    "source_company": {"type": "string"},
+    "source_ticker": {"type": "string"},
+    "target_company": {"type": "string"},
+    "target_ticker": {"type": "string"},
+    "relationship_type": {"type": "string", "enum": RELATIONSHIP_TYPES},
+    "confidence": {"type": "number"},
+}
+
+# Structured Outputs 스키마: 요청에 포함된 청크별 관계 목록
+RELATIONSHIP_BATCH_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "relationship_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "chunk_id": {"type": "integer"},
+                            "relationships": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": _RELATIONSHIP_PROPERTIES,
+                                    "required": list(_RELATIONSHIP_PROPERTIES),
+                                    "additionalProperties": False,
+                                },
+                            },
+                        },
+                        "required": ["chunk_id", "relationships"],
+                        "additionalProperties": False,
+                    },
+                }
+            },
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+    },
+}
+
 
 class GraphRAG:
     """
@@ -48,15 +140,46 @@ class GraphRAG:
 
         self.supabase: Client = create_client(supabase_url, supabase_key)
 
-        # Local graph for analysis
-        self.local_graph = nx.DiGraph()
+        # NetworkX 그래프 (local_graph 접근 시 스냅샷에서 지연 생성)
+        self._local_graph: Optional[nx.DiGraph] = None
+        self._local_graph_fingerprint: Optional[str] = None
+        # CSR 스냅샷 (build_local_graph에서 디스크 로드 + 증분 갱신)
+        self.graph_snapshot: Optional[GraphSnapshot] = None
+        self.snapshot_dir = DEFAULT_SNAPSHOT_DIR
+        self.snapshot_max_age = float(os.getenv("GRAPH_SNAPSHOT_MAX_AGE_HOURS", "24")) * 3600
+        # 증분 동기화 시 synced_at 이전부터 다시 확인할 시간 (늦게 커밋된 행 포함)
+        self.sync_lookback = float(os.getenv("GRAPH_SYNC_LOOKBACK_SECONDS", "300"))
+        # 그래프 내용(fingerprint)별 중심성 (get_centrality)
+        self.centrality: Optional[CentralityStore] = None
+        # 그래프 내용(fingerprint)별 경로 탐색기 (find_shortest_path)
+        self.path_engine: Optional[PathEngine] = None
+        # 관계 추출 결과 캐시 (use_cache=True인 extract_relationships_batch에서 지연 생성)
+        self._extraction_cache: Optional[ExtractionCache] = None
+        # 자연 키 unique index 미배포(42P10) 시 insert로 대체
+        self._relationship_upsert = OptionalFeature("relationship upsert", MISSING_CONFLICT_TARGET)
+        # source_documents 컬럼 미배포(PGRST204/42703) 시 extracted_from만 기록
+        self._source_documents = OptionalFeature(
+            "company_relationships.source_documents", MISSING_COLUMN
+        )
+        # 저장하지 않은 추출 관계 수 (티커 없음 / 자기 자신 참조)
+        self.skipped_relationships = {"missing_ticker": 0, "self_loop": 0}
+        # 티커별 관계 조회 캐시 {ticker: (조회 시각, rows)} - find_relationships
+        self._relationship_cache: Dict[str, tuple] = {}
+        self._relationship_cache_ttl = float(os.getenv("RELATIONSHIP_CACHE_TTL", "60"))
+        self._relationship_cache_lock = threading.Lock()
+        # save_relationships 무효화 횟수 (조회 중 무효화된 결과는 캐시하지 않음)
+        self._relationship_generation = 0
 
         logger.info("GraphRAG initialized with Supabase")
 
     def _get_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text"""
-        response = self.openai_client.embeddings.create(model=self.embedding_model, input=text)
-        return response.data[0].embedding
+        """Generate embedding for text (cached by model + normalized text)"""
+
+        def _create() -> List[float]:
+            response = self.openai_client.embeddings.create(model=self.embedding_model, input=text)
+            return response.data[0].embedding
+
+        return get_embedding_cache().get_or_create(self.embedding_model, text, _create)
 
     def _chat_completion(self, system_prompt: str, user_prompt: str) -> str:
         """Get chat completion from OpenAI"""
@@ -71,81 +194,375 @@ class GraphRAG:
         return response.choices[0].message.content
 
     def extract_relationships(self, text: str, source_ticker: Optional[str] = None) -> List[Dict]:
-        """Extract company relationships from text using LLM"""
-
-        system_prompt = """You are a financial analyst. Extract company relationships from text.
-
-Relationship types: partnership, acquisition, supplier, customer, competitor, subsidiary, investment
+        """Extract company relationships from text using LLM (단건 호출은 캐시 미사용)"""
+        return self.extract_relationships_batch(
+            [{"text": text, "source_ticker": source_ticker}], chunks_per_request=1, use_cache=False
+        )[0]
+
+    def _get_extraction_cache(self) -> Optional[ExtractionCache]:
+        """추출 캐시 (RELATIONSHIP_CACHE_PATH를 빈 값으로 설정하면 None)"""
+        if self._extraction_cache is None:
+            path = os.getenv("RELATIONSHIP_CACHE_PATH", str(DEFAULT_EXTRACTION_CACHE_PATH))
+            if not path:
+                return None
+            self._extraction_cache = ExtractionCache(path)
+        return self._extraction_cache
+
+    def _extract_batch_request(self, chunks: List[Dict], max_chars: int) -> List[List[Dict]]:
+        """여러 청크를 한 번의 Structured Outputs 요청으로 추출 (chunks 순서대로 반환)"""
+        system_prompt = f"""You are a financial analyst. Extract company relationships from each numbered text chunk.
+
+Relationship types: {", ".join(RELATIONSHIP_TYPES)}
+
+Return one result per chunk_id. Use an empty string for unknown tickers and an empty list when a chunk has no relationships."""
+
+        user_prompt = "\n\n".join(
+            f"[chunk_id: {i}] Source Company Ticker: {chunk.get('source_ticker') or 'Unknown'}\n"
+            f"{(chunk.get('text') or '')[:max_chars]}"
+            for i, chunk in enumerate(chunks)
+        )
 
-Return JSON only:
-[{"source_company": "...", "source_ticker": "...", "target_company": "...", "target_ticker": "...", 
-  "relationship_type": "...", "confidence": 0.8}]"""
+        response = self.openai_client.chat.completions.create(
+            model=self.llm_model,
+            temperature=0.1,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            response_format=RELATIONSHIP_BATCH_FORMAT,
+        )
+        parsed = json.loads(response.choices[0].message.content)
+
+        results: List[List[Dict]] = [[] for _ in chunks]
+        for item in parsed.get("results", []):
+            chunk_id = item.get("chunk_id")
+            if isinstance(chunk_id, int) and 0 <= chunk_id < len(chunks):
+                results[chunk_id].extend(item.get("relationships", []))
+        return results
+
+    def extract_relationships_batch(
+        self,
+        chunks: List[Dict],
+        chunks_per_request: int = 8,
+        max_concurrency: int = 4,
+        max_chars: int = 3000,
+        use_cache: bool = True,
+    ) -> List[List[Dict]]:
+        """
+        여러 텍스트 청크의 관계를 일괄 추출
 
-        user_prompt = f"Source Company Ticker: {source_ticker or 'Unknown'}\n\nText:\n{text[:3000]}"
+        - chunks_per_request개 청크를 하나의 Structured Outputs 요청으로 묶어 프롬프트 중복 제거
+        - 최대 max_concurrency개 요청을 동시에 실행
+        - (모델, 티커, 청크 텍스트) 해시로 결과를 캐시하여 재실행 시 LLM 호출 생략
 
+        Args:
+            chunks: [{"text": ..., "source_ticker": ...}]
+            use_cache: 추출 캐시 사용 여부 (False면 캐시 파일을 열지 않음)
+        Returns:
+            chunks와 같은 순서의 관계 리스트
+        """
+        cache = self._get_extraction_cache() if use_cache else None
+        cache_keys = [
+            ExtractionCache.make_key(
+                self.llm_model, chunk.get("source_ticker"), (chunk.get("text") or "")[:max_chars]
+            )
+            for chunk in chunks
+        ]
+
+        results: List[List[Dict]] = [[] for _ in chunks]
+        missing = []
+        for i, key in enumerate(cache_keys):
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.append(i)
+
+        if not missing:
+            return results
+
+        groups = [
+            missing[i : i + chunks_per_request]
+            for i in range(0, len(missing), chunks_per_request)
+        ]
+
+        def _run(group: List[int]):
+            try:
+                return group, self._extract_batch_request([chunks[i] for i in group], max_chars)
+            except Exception as e:
+                logger.error(f"Extraction error: {e}")
+                return group, None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(groups)))) as pool:
+            for group, extracted in pool.map(_run, groups):
+                if extracted is None:
+                    continue  # 실패한 청크는 캐시하지 않음 (다음 실행에서 재시도)
+                for i, relationships in zip(group, extracted):
+                    results[i] = relationships
+                    if cache is not None:
+                        cache.set(cache_keys[i], relationships)
+
+        return results
+
+    def _normalize_relationship(self, rel: Dict) -> Optional[Dict]:
+        """
+        관계 키 정규화 (티커 대문자, 유형 소문자, 공백 제거)
+        그래프 노드 키인 티커가 없거나 자기 자신을 가리키면 None (skipped_relationships에 집계)
+        """
+        source_ticker = (rel.get("source_ticker") or "").strip().upper()
+        target_ticker = (rel.get("target_ticker") or "").strip().upper()
+        if not source_ticker or not target_ticker:
+            self.skipped_relationships["missing_ticker"] += 1
+            return None
+        if source_ticker == target_ticker:
+            self.skipped_relationships["self_loop"] += 1
+            return None
         try:
-            response = self._chat_completion(system_prompt, user_prompt)
-
-            # Clean JSON
-            response = response.strip()
-            if response.startswith("```"):
-                response = response.split("```")[1]
-                if response.startswith("json"):
-                    response = response[4:]
-
-            return json.loads(response.strip())
-
-        except Exception as e:
-            logger.error(f"Extraction error: {e}")
-            return []
+            confidence = float(rel.get("confidence", 0.5))
+        except (TypeError, ValueError):
+            confidence = 0.5
+        return {
+            "source_company": (rel.get("source_company") or "").strip(),
+            "source_ticker": source_ticker,
+            "target_company": (rel.get("target_company") or "").strip(),
+            "target_ticker": target_ticker,
+            "relationship_type": (rel.get("relationship_type") or "related").strip().lower(),
+            "confidence": min(max(confidence, 0.0), 1.0),
+        }
 
     def save_relationships(
-        self, relationships: List[Dict], extracted_from: str = None, filing_date: str = None
+        self,
+        relationships: List[Dict],
+        extracted_from: str = None,
+        filing_date: str = None,
+        confidence_merge: str = "max",
+        batch_size: int = 500,
     ) -> int:
-        """Save relationships to company_relationships table"""
+        """
+        Save relationships to company_relationships table
+
+        (source_ticker, target_ticker, relationship_type) 자연 키로 정규화/중복 제거 후
+        batch_size 단위로 upsert하여 추출을 재실행해도 중복 엣지가 쌓이지 않습니다.
+        출처 문서는 덮어쓰지 않고 병합합니다 (extracted_from은 최초 출처 유지,
+        source_documents에 모든 출처 문서 ID 누적).
+
+        Args:
+            relationships: 관계 목록. 각 항목의 extracted_from/filing_date가 있으면
+                인자 값보다 우선 (여러 문서의 관계를 한 번에 저장할 때)
+            extracted_from: 출처 문서 ID 기본값
+            filing_date: 공시일 기본값
+            confidence_merge: 중복 관계의 신뢰도 병합 방식 ("max" 또는 "mean")
+        Returns: 저장된 (중복 제거 후) 관계 수
+        """
         if not relationships:
             return 0
 
-        records = []
+        skipped_before = sum(self.skipped_relationships.values())
+        merged: Dict[tuple, Dict] = {}
+        confidences: Dict[tuple, List[float]] = {}
+        sources: Dict[tuple, List[str]] = {}
         for rel in relationships:
-            records.append(
-                {
-                    "source_company": rel.get("source_company", ""),
-                    "source_ticker": rel.get("source_ticker", ""),
-                    "target_company": rel.get("target_company", ""),
-                    "target_ticker": rel.get("target_ticker", ""),
-                    "relationship_type": rel.get("relationship_type", "related"),
-                    "confidence": rel.get("confidence", 0.5),
-                    "extracted_from": extracted_from,
-                    "filing_date": filing_date,
-                }
+            record = self._normalize_relationship(rel)
+            if record is None:
+                continue
+            key = tuple(record[col] for col in RELATIONSHIP_KEY)
+            confidences.setdefault(key, []).append(record["confidence"])
+            source = rel.get("extracted_from") or extracted_from
+            if source and str(source) not in sources.setdefault(key, []):
+                sources[key].append(str(source))
+            record["filing_date"] = rel.get("filing_date") or filing_date
+            existing = merged.get(key)
+            if existing:
+                # 회사명은 비어 있지 않은 값, 공시일은 최신 값 우선
+                record["source_company"] = record["source_company"] or existing["source_company"]
+                record["target_company"] = record["target_company"] or existing["target_company"]
+                record["filing_date"] = max(
+                    filter(None, (record["filing_date"], existing["filing_date"])), default=None
+                )
+            merged[key] = record
+
+        skipped = sum(self.skipped_relationships.values()) - skipped_before
+        if skipped:
+            logger.info(
+                f"Skipped {skipped} relationships without two distinct tickers "
+                f"(total: {self.skipped_relationships})"
             )
 
+        stored = self._fetch_stored_sources(list(merged))
+        records = []
+        for key, record in merged.items():
+            values = confidences[key]
+            previous_first, previous_sources, previous_confidence = stored.get(key, (None, [], None))
+            if confidence_merge == "mean":
+                confidence = sum(values) / len(values)
+            else:
+                # 다른 실행/배치에서 저장된 신뢰도보다 낮아지지 않도록 병합
+                confidence = max(values + ([previous_confidence] if previous_confidence is not None else []))
+            record["confidence"] = round(confidence, 4)
+            merged_sources = list(dict.fromkeys(previous_sources + sources.get(key, [])))
+            record["extracted_from"] = previous_first or (merged_sources[0] if merged_sources else None)
+            if not self._source_documents.missing:
+                record["source_documents"] = merged_sources
+            records.append(record)
+
+        saved = 0
+        table = self.supabase.table("company_relationships")
+        for i in range(0, len(records), batch_size):
+            batch = records[i : i + batch_size]
+            try:
+                self._write_relationships(table, batch)
+                saved += len(batch)
+            except Exception as e:
+                logger.error(f"Error saving relationships: {e}")
+
+        # 쓰기 후 무효화 (쓰기 전에 비우면 동시 조회가 이전 행을 다시 캐시함)
+        self._invalidate_relationship_cache(
+            {record["source_ticker"] for record in records}
+            | {record["target_ticker"] for record in records}
+        )
+        return saved
+
+    def _invalidate_relationship_cache(self, tickers):
+        """
+        find_relationships 캐시에서 티커 제거
+        이 인스턴스의 캐시만 비우므로 다른 인스턴스/프로세스는 RELATIONSHIP_CACHE_TTL
+        (기본 60초) 동안 이전 행을 반환할 수 있습니다.
+        """
+        with self._relationship_cache_lock:
+            self._relationship_generation += 1
+            for ticker in tickers:
+                self._relationship_cache.pop(ticker, None)
+
+    def _write_relationships(self, table, batch: List[Dict]):
+        """
+        자연 키로 upsert (unique index가 없다고 확정되면 insert)
+        source_documents 컬럼이 없다고 확정되면 제외하고 다시 저장, 그 외 오류는 호출자에게 전달
+        """
+        if self._source_documents.missing:
+            for record in batch:
+                record.pop("source_documents", None)
         try:
-            self.supabase.table("company_relationships").insert(records).execute()
-            return len(records)
+            if not self._relationship_upsert.missing:
+                try:
+                    table.upsert(batch, on_conflict=",".join(RELATIONSHIP_KEY)).execute()
+                    return
+                except Exception as e:
+                    # 일시 오류에 insert로 대체하면 중복 엣지가 생기므로 확정 오류만 대체
+                    if error_code(e) not in MISSING_CONFLICT_TARGET:
+                        raise
+                    self._relationship_upsert.failed(e)
+            table.insert(batch).execute()
         except Exception as e:
-            logger.error(f"Error saving relationships: {e}")
-            return 0
+            if (
+                self._source_documents.missing
+                or error_code(e) not in MISSING_COLUMN
+                or "source_documents" not in str(e)
+            ):
+                raise
+            self._source_documents.failed(e)
+            self._write_relationships(table, batch)
+
+    def _fetch_stored_sources(self, keys: List[tuple]) -> Dict[tuple, tuple]:
+        """
+        저장된 관계의 출처/신뢰도 조회 {자연 키: (extracted_from, source_documents, confidence)}
+        조회 실패 시 빈 dict (새 출처만 기록)
+        """
+        wanted = set(keys)
+        stored: Dict[tuple, tuple] = {}
+        sources = sorted({key[0] for key in wanted})
+        for i in range(0, len(sources), 100):
+            columns = list(RELATIONSHIP_KEY) + ["extracted_from", "confidence"]
+            if not self._source_documents.missing:
+                columns.append("source_documents")
+            try:
+                rows = self._fetch_source_ticker_rows(columns, sources[i : i + 100])
+            except Exception as e:
+                if (
+                    not self._source_documents.missing
+                    and error_code(e) in MISSING_COLUMN
+                    and "source_documents" in str(e)
+                ):
+                    self._source_documents.failed(e)
+                    return self._fetch_stored_sources(keys)
+                logger.warning(f"Stored relationship lookup failed: {e}")
+                return stored
+            for row in rows:
+                key = tuple(row.get(col) for col in RELATIONSHIP_KEY)
+                if key not in wanted:
+                    continue
+                first = row.get("extracted_from")
+                previous = [str(doc) for doc in row.get("source_documents") or []]
+                if first and str(first) not in previous:
+                    previous.insert(0, str(first))
+                confidence = row.get("confidence")
+                stored[key] = (
+                    str(first) if first else None,
+                    previous,
+                    float(confidence) if confidence is not None else None,
+                )
+        return stored
+
+    def _fetch_source_ticker_rows(self, columns: List[str], sources: List[str]) -> List[Dict]:
+        """source_ticker가 sources인 관계 행을 페이지 단위로 조회 (max-rows에 잘리지 않도록)"""
+        rows = []
+        start = 0
+        while True:
+            result = (
+                self.supabase.table("company_relationships")
+                .select(",".join(columns))
+                .in_("source_ticker", sources)
+                .order("id")
+                .range(start, start + RELATIONSHIP_PAGE_SIZE - 1)
+                .execute()
+            )
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < RELATIONSHIP_PAGE_SIZE:
+                return rows
+            start += RELATIONSHIP_PAGE_SIZE
+
+    def _fetch_ticker_relationships(self, ticker: str) -> List[Dict]:
+        """티커의 outgoing/incoming 관계를 or 필터 1회로 조회 (짧은 TTL 캐시)"""
+        now = time.monotonic()
+        with self._relationship_cache_lock:
+            cached = self._relationship_cache.get(ticker)
+            if cached and now - cached[0] < self._relationship_cache_ttl:
+                return cached[1]
+            generation = self._relationship_generation
+
+        value = pg_in_list([ticker])
+        rows = (
+            self.supabase.table("company_relationships")
+            .select("*")
+            .or_(f"source_ticker.eq.{value},target_ticker.eq.{value}")
+            .execute()
+            .data
+            or []
+        )
+
+        with self._relationship_cache_lock:
+            if generation != self._relationship_generation:
+                # 조회 도중 저장/무효화됨 - 이전 행일 수 있으므로 캐시하지 않음
+                return rows
+            if len(self._relationship_cache) >= 1024:
+                self._relationship_cache = {
+                    key: entry
+                    for key, entry in self._relationship_cache.items()
+                    if now - entry[0] < self._relationship_cache_ttl
+                }
+            self._relationship_cache[ticker] = (now, rows)
+        return rows
 
     def find_relationships(self, ticker: str, relationship_type: Optional[str] = None) -> Dict:
         """Find relationships for a company by ticker"""
         try:
-            # Outgoing relationships (source)
-            query = (
-                self.supabase.table("company_relationships").select("*").eq("source_ticker", ticker)
-            )
+            rows = self._fetch_ticker_relationships(ticker)
             if relationship_type:
-                query = query.eq("relationship_type", relationship_type)
-            outgoing = query.execute().data
+                rows = [r for r in rows if r.get("relationship_type") == relationship_type]
 
-            # Incoming relationships (target)
-            query = (
-                self.supabase.table("company_relationships").select("*").eq("target_ticker", ticker)
-            )
-            if relationship_type:
-                query = query.eq("relationship_type", relationship_type)
-            incoming = query.execute().data
+            # Outgoing (source) / Incoming (target)
+            outgoing = [r for r in rows if r.get("source_ticker") == ticker]
+            incoming = [r for r in rows if r.get("target_ticker") == ticker]
 
             return {
                 "ticker": ticker,
@@ -182,55 +599,92 @@ Return JSON only:
             logger.error(f"Error searching companies: {e}")
             return []
 
-    def get_company_network(self, ticker: str, depth: int = 1) -> Dict:
-        """Get company relationship network"""
-        visited = set()
-        network = {"nodes": [], "edges": []}
-
-        def traverse(current_ticker: str, current_depth: int):
-            if current_depth > depth or current_ticker in visited:
-                return
-            visited.add(current_ticker)
-
-            # Add node
-            company = self.get_company(current_ticker)
-            if company:
-                network["nodes"].append(
-                    {
-                        "id": current_ticker,
-                        "name": company.get("company_name", current_ticker),
-                        "sector": company.get("sector", ""),
-                    }
+    def _fetch_companies(self, tickers: List[str]) -> Dict[str, Dict]:
+        """여러 기업 정보를 in_() 배치 조회 (ticker -> company)"""
+        companies = {}
+        for i in range(0, len(tickers), IN_FILTER_CHUNK):
+            chunk = tickers[i : i + IN_FILTER_CHUNK]
+            try:
+                result = self.supabase.table("companies").select("*").in_("ticker", chunk).execute()
+                for row in result.data or []:
+                    companies.setdefault(row.get("ticker"), row)
+            except Exception as e:
+                logger.error(f"Error getting companies: {e}")
+        return companies
+
+    def _fetch_relationships_batch(self, tickers: List[str]) -> List[Dict]:
+        """여러 기업의 outgoing/incoming 관계를 한 번에 조회"""
+        rows = []
+        for i in range(0, len(tickers), IN_FILTER_CHUNK):
+            values = pg_in_list(tickers[i : i + IN_FILTER_CHUNK])
+            try:
+                result = (
+                    self.supabase.table("company_relationships")
+                    .select("*")
+                    .or_(f"source_ticker.in.({values}),target_ticker.in.({values})")
+                    .execute()
                 )
+                rows.extend(result.data or [])
+            except Exception as e:
+                logger.error(f"Error finding relationships: {e}")
+        return rows
 
-            # Get relationships
-            rels = self.find_relationships(current_ticker)
+    def get_company_network(self, ticker: str, depth: int = 1) -> Dict:
+        """
+        Get company relationship network
 
-            for rel in rels.get("outgoing", []):
-                target = rel.get("target_ticker")
-                if target:
-                    network["edges"].append(
+        BFS 레벨 단위로 frontier 전체의 기업 정보/관계를 배치 조회하여
+        Supabase 왕복 횟수를 노드 수가 아닌 depth에 비례하도록 합니다.
+        """
+        visited = set()
+        network = {"nodes": [], "edges": []}
+        seen_edges = set()
+
+        frontier = [ticker]
+        for _ in range(depth + 1):
+            frontier = [t for t in dict.fromkeys(frontier) if t not in visited]
+            if not frontier:
+                break
+            visited.update(frontier)
+
+            companies = self._fetch_companies(frontier)
+            rels = self._fetch_relationships_batch(frontier)
+
+            # Add nodes
+            for current_ticker in frontier:
+                company = companies.get(current_ticker)
+                if company:
+                    network["nodes"].append(
                         {
-                            "source": current_ticker,
-                            "target": target,
-                            "type": rel.get("relationship_type", "related"),
+                            "id": current_ticker,
+                            "name": company.get("company_name", current_ticker),
+                            "sector": company.get("sector", ""),
                         }
                     )
-                    traverse(target, current_depth + 1)
 
-            for rel in rels.get("incoming", []):
+            # Add edges and collect next level
+            frontier_set = set(frontier)
+            next_frontier = []
+            for rel in rels:
                 source = rel.get("source_ticker")
-                if source:
+                target = rel.get("target_ticker")
+                if not source or not target:
+                    continue
+
+                edge_key = (source, target, rel.get("relationship_type", "related"))
+                if edge_key not in seen_edges:
+                    seen_edges.add(edge_key)
                     network["edges"].append(
-                        {
-                            "source": source,
-                            "target": current_ticker,
-                            "type": rel.get("relationship_type", "related"),
-                        }
+                        {"source": source, "target": target, "type": edge_key[2]}
                     )
-                    traverse(source, current_depth + 1)
 
-        traverse(ticker, 0)
+                if source in frontier_set:
+                    next_frontier.append(target)
+                if target in frontier_set:
+                    next_frontier.append(source)
+
+            frontier = next_frontier
+
         return network
 
     def query_with_context(self, query: str, ticker: Optional[str] = None) -> Dict:
@@ -274,138 +728,181 @@ Be specific and cite relationships when relevant. Answer in Korean."""
 
         return {"query": query, "ticker": ticker, "response": response, "context": context_str}
 
-    def build_local_graph(self) -> int:
+    def _fetch_relationship_rows(self, since: Optional[str] = None) -> List[Dict]:
         """
-        Supabase의 관계 데이터를 NetworkX 그래프로 로드합니다.
+        company_relationships 행을 페이지 단위로 조회
+        (since 지정 시 created_at >= since인 행만 - 이미 반영한 행은 merge_rows가 id로 제외)
+        """
+        rows = []
+        start = 0
+        while True:
+            query = self.supabase.table("company_relationships").select("*")
+            if since:
+                query = query.gte("created_at", since)
+            result = (
+                query.order("created_at")
+                .order("id")
+                .range(start, start + RELATIONSHIP_PAGE_SIZE - 1)
+                .execute()
+            )
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < RELATIONSHIP_PAGE_SIZE:
+                return rows
+            start += RELATIONSHIP_PAGE_SIZE
+
+    def build_local_graph(self, full_refresh: bool = False) -> int:
+        """
+        Supabase의 관계 데이터를 그래프로 로드합니다.
+        - 디스크 CSR 스냅샷을 mmap으로 로드한 뒤 마지막 동기화 이후 추가된 행만 반영
+          (synced_at - GRAPH_SYNC_LOOKBACK_SECONDS부터 조회해 같은 시각/늦게 커밋된 행 포함)
+        - 스냅샷이 없거나 GRAPH_SNAPSHOT_MAX_AGE_HOURS보다 오래되면 전체 재구축
+          (삭제/수정된 행은 전체 재구축 시 반영됨)
         Returns: 로드된 엣지 수
         """
         try:
-            # 모든 관계 가져오기
-            result = self.supabase.table("company_relationships").select("*").execute()
-            relationships = result.data or []
-            
-            # 그래프 초기화
-            self.local_graph.clear()
-            
-            for rel in relationships:
-                source = rel.get("source_ticker")
-                target = rel.get("target_ticker")
-                rel_type = rel.get("relationship_type", "related")
-                confidence = rel.get("confidence", 0.5)
-                
-                if source and target:
-                    # 노드 추가 (자동으로 중복 방지)
-                    self.local_graph.add_node(source, name=rel.get("source_company", source))
-                    self.local_graph.add_node(target, name=rel.get("target_company", target))
-                    
-                    # 엣지 추가 (관계 유형과 신뢰도를 속성으로)
-                    self.local_graph.add_edge(
-                        source, target,
-                        relationship_type=rel_type,
-                        confidence=confidence,
-                        weight=1 - confidence  # 신뢰도가 높을수록 거리가 짧음
-                    )
-            
-            logger.info(f"Built local graph: {self.local_graph.number_of_nodes()} nodes, {self.local_graph.number_of_edges()} edges")
-            return self.local_graph.number_of_edges()
-            
+            snapshot = None
+            if not full_refresh:
+                snapshot = self.graph_snapshot or GraphSnapshot.load(self.snapshot_dir)
+            if snapshot is not None and (
+                snapshot.synced_at is None
+                or time.time() - snapshot.built_at > self.snapshot_max_age
+            ):
+                snapshot = None
+
+            if snapshot is None:
+                snapshot = GraphSnapshot.from_rows(
+                    self._fetch_relationship_rows(), lookback=self.sync_lookback
+                )
+                self._save_snapshot(snapshot)
+            else:
+                changed = self._fetch_relationship_rows(
+                    since=snapshot.sync_start(self.sync_lookback)
+                )
+                merged = snapshot.merge_rows(changed, lookback=self.sync_lookback)
+                if merged is not snapshot:
+                    snapshot = merged
+                    self._save_snapshot(snapshot)
+
+            # 이웃/경로/중심성은 CSR 배열로 처리 (NetworkX는 local_graph 접근 시 생성)
+            self.graph_snapshot = snapshot
+
+            logger.info(
+                f"Built local graph: {snapshot.num_nodes} nodes, {snapshot.num_edges} edges "
+                f"(snapshot v{snapshot.version})"
+            )
+            return snapshot.num_edges
+
         except Exception as e:
             logger.error(f"Error building local graph: {e}")
             return 0
 
+    @property
+    def local_graph(self) -> nx.DiGraph:
+        """스냅샷의 NetworkX 표현 (NetworkX 알고리즘이 필요한 경우에만 그래프 내용당 1회 생성)"""
+        snapshot = self.graph_snapshot
+        if snapshot is None:
+            return nx.DiGraph()
+        if self._local_graph is None or self._local_graph_fingerprint != snapshot.fingerprint:
+            self._local_graph = snapshot.to_networkx()
+            self._local_graph_fingerprint = snapshot.fingerprint
+        return self._local_graph
+
+    def _save_snapshot(self, snapshot: GraphSnapshot):
+        try:
+            snapshot.save(self.snapshot_dir)
+        except OSError as e:
+            logger.warning(f"Graph snapshot save failed: {e}")
+
+    def _get_centrality_store(self) -> CentralityStore:
+        """현재 스냅샷 그래프의 중심성 (메모리 -> 디스크 -> 계산 순, fingerprint로 검증)"""
+        snapshot = self.graph_snapshot
+        if self.centrality is not None and self.centrality.fingerprint == snapshot.fingerprint:
+            return self.centrality
+
+        path = snapshot.version_dir(self.snapshot_dir) / CENTRALITY_FILE
+        store = CentralityStore.load(path, snapshot)
+        if store is None:
+            store = CentralityStore.compute(snapshot)
+            try:
+                store.save(path)
+            except OSError as e:
+                logger.warning(f"Centrality save failed: {e}")
+
+        self.centrality = store
+        return store
+
     def get_centrality(self, top_n: int = 10) -> Dict:
         """
         중심성 분석 - 가장 영향력 있는 기업 찾기
+        (그래프 버전당 1회 계산된 정렬 배열에서 상위 N개 조회)
         Returns: 다양한 중심성 지표별 상위 기업
         """
-        if self.local_graph.number_of_nodes() == 0:
+        if self.graph_snapshot is None:
             self.build_local_graph()
-        
-        if self.local_graph.number_of_nodes() == 0:
+
+        snapshot = self.graph_snapshot
+        if snapshot is None or snapshot.num_nodes == 0:
             return {"error": "그래프에 데이터가 없습니다."}
-        
+
         try:
-            # 연결 중심성 (Degree Centrality) - 직접 연결된 관계 수
-            degree_cent = nx.degree_centrality(self.local_graph)
-            
-            # 매개 중심성 (Betweenness Centrality) - 다리 역할
-            betweenness_cent = nx.betweenness_centrality(self.local_graph)
-            
-            # 근접 중심성 (Closeness Centrality) - 다른 노드와의 평균 거리
-            # DiGraph에서는 연결되지 않은 노드가 있을 수 있어 예외 처리
-            try:
-                closeness_cent = nx.closeness_centrality(self.local_graph)
-            except:
-                closeness_cent = {}
-            
-            # 상위 N개 추출
-            top_degree = sorted(degree_cent.items(), key=lambda x: x[1], reverse=True)[:top_n]
-            top_betweenness = sorted(betweenness_cent.items(), key=lambda x: x[1], reverse=True)[:top_n]
-            top_closeness = sorted(closeness_cent.items(), key=lambda x: x[1], reverse=True)[:top_n]
-            
-            return {
-                "degree_centrality": [{"ticker": k, "score": round(v, 4)} for k, v in top_degree],
-                "betweenness_centrality": [{"ticker": k, "score": round(v, 4)} for k, v in top_betweenness],
-                "closeness_centrality": [{"ticker": k, "score": round(v, 4)} for k, v in top_closeness],
-                "total_nodes": self.local_graph.number_of_nodes(),
-                "total_edges": self.local_graph.number_of_edges(),
-            }
-            
+            store = self._get_centrality_store()
+            result = {metric: store.top(metric, top_n) for metric in METRICS}
+            result["total_nodes"] = snapshot.num_nodes
+            result["total_edges"] = snapshot.num_edges
+            return result
+
         except Exception as e:
             logger.error(f"Error calculating centrality: {e}")
             return {"error": str(e)}
 
-    def find_shortest_path(self, source_ticker: str, target_ticker: str) -> Dict:
+    def find_shortest_path(
+        self, source_ticker: str, target_ticker: str, k: int = 1, weighted: bool = False
+    ) -> Dict:
         """
-        두 기업 간의 최단 경로 찾기
+        두 기업 간의 최단 경로 찾기 (방향 무시)
+
+        Args:
+            k: 반환할 경로 수 (k > 1이면 "paths"에 비용 순 k-최단 경로 포함)
+            weighted: True면 홉 수 대신 신뢰도 가중치(1 - confidence) 기준
         Returns: 경로와 관계 유형
         """
-        if self.local_graph.number_of_nodes() == 0:
+        if self.graph_snapshot is None:
             self.build_local_graph()
-        
+
+        snapshot = self.graph_snapshot
+        if snapshot is None or source_ticker not in snapshot or target_ticker not in snapshot:
+            return {"error": f"'{source_ticker}' 또는 '{target_ticker}'가 그래프에 없습니다."}
+
         try:
-            # 방향 무시하고 경로 찾기 (undirected view)
-            undirected = self.local_graph.to_undirected()
-            
-            if source_ticker not in undirected or target_ticker not in undirected:
-                return {"error": f"'{source_ticker}' 또는 '{target_ticker}'가 그래프에 없습니다."}
-            
-            # 최단 경로 찾기
-            path = nx.shortest_path(undirected, source=source_ticker, target=target_ticker)
-            
-            # 경로의 각 엣지 관계 유형 추출
-            path_details = []
-            for i in range(len(path) - 1):
-                node1, node2 = path[i], path[i + 1]
-                
-                # 원래 방향 그래프에서 관계 찾기
-                if self.local_graph.has_edge(node1, node2):
-                    edge_data = self.local_graph.get_edge_data(node1, node2)
-                    direction = "→"
-                elif self.local_graph.has_edge(node2, node1):
-                    edge_data = self.local_graph.get_edge_data(node2, node1)
-                    direction = "←"
-                else:
-                    edge_data = {}
-                    direction = "—"
-                
-                path_details.append({
-                    "from": node1,
-                    "to": node2,
-                    "direction": direction,
-                    "relationship": edge_data.get("relationship_type", "related"),
-                })
-            
-            return {
-                "source": source_ticker,
-                "target": target_ticker,
-                "path": path,
-                "path_length": len(path) - 1,
-                "details": path_details,
-            }
-            
-        except nx.NetworkXNoPath:
-            return {"error": f"'{source_ticker}'와 '{target_ticker}' 사이에 경로가 없습니다."}
+            if self.path_engine is None or self.path_engine.fingerprint != snapshot.fingerprint:
+                self.path_engine = PathEngine(snapshot)
+            engine = self.path_engine
+
+            paths = engine.find_paths(
+                snapshot.ticker_index[source_ticker],
+                snapshot.ticker_index[target_ticker],
+                k=k,
+                weighted=weighted,
+            )
+            if not paths:
+                return {"error": f"'{source_ticker}'와 '{target_ticker}' 사이에 경로가 없습니다."}
+
+            results = [
+                {
+                    "path": [snapshot.tickers[node] for node in path],
+                    "path_length": len(path) - 1,
+                    "cost": round(cost, 4),
+                    "details": engine.path_details(path),
+                }
+                for path, cost in paths
+            ]
+
+            response = {"source": source_ticker, "target": target_ticker, **results[0]}
+            if k > 1:
+                response["paths"] = results
+            return response
+
         except Exception as e:
             logger.error(f"Error finding shortest path: {e}")
             return {"error": str(e)}
@@ -415,37 +912,39 @@ Be specific and cite relationships when relevant. Answer in Korean."""
         특정 기업과 연결된 모든 기업 찾기 (BFS)
         Returns: depth별 연결된 기업 목록
         """
-        if self.local_graph.number_of_nodes() == 0:
+        if self.graph_snapshot is None:
             self.build_local_graph()
-        
-        if ticker not in self.local_graph:
+
+        snapshot = self.graph_snapshot
+        if snapshot is None or ticker not in snapshot:
             return {"error": f"'{ticker}'가 그래프에 없습니다."}
-        
+
         try:
-            undirected = self.local_graph.to_undirected()
-            
-            # BFS로 depth별 노드 찾기
+            # CSR 배열에서 방향 무시 BFS
             connected_by_depth = {}
-            visited = {ticker}
-            current_level = {ticker}
-            
+            start = snapshot.ticker_index[ticker]
+            visited = {start}
+            current_level = {start}
+
             for depth in range(1, max_depth + 1):
                 next_level = set()
                 for node in current_level:
-                    neighbors = set(undirected.neighbors(node)) - visited
+                    neighbors = set(snapshot.neighbors(node).tolist()) - visited
                     next_level.update(neighbors)
                     visited.update(neighbors)
-                
+
                 if next_level:
-                    connected_by_depth[f"depth_{depth}"] = list(next_level)
+                    connected_by_depth[f"depth_{depth}"] = [
+                        snapshot.tickers[node] for node in next_level
+                    ]
                 current_level = next_level
-            
+
             return {
                 "ticker": ticker,
                 "connected": connected_by_depth,
                 "total_connected": len(visited) - 1,  # 자기 자신 제외
             }
-            
+
         except Exception as e:
             logger.error(f"Error finding connected companies: {e}")
             return {"error": str(e)}
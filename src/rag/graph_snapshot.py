@@ -0,0 +1,423 @@
+"""
+Graph Snapshot - company_relationships 그래프의 압축 디스크 스냅샷
+GraphRAG.build_local_graph가 매번 전체 테이블을 읽어 NetworkX 그래프를 다시 만들지 않도록 합니다.
+
+포맷 (data/graph_snapshot/vNNNNNN/, CURRENT 파일이 최신 버전을 가리킴):
+- meta.json: format_version, version, tickers(정수 ID -> 티커), names, type_names,
+  synced_at(반영된 마지막 created_at), built_at(마지막 전체 재구축 시각),
+  recent_ids(synced_at - lookback 이후 반영한 행 id -> created_at, 증분 동기화 중복 제거용)
+- indptr/indices: 정방향 CSR (source ID -> target ID, 각 행 내 target 오름차순)
+- edge_type/confidence: 엣지별 병렬 배열 (관계 유형 코드, 신뢰도)
+- rev_indptr/rev_indices/rev_edges: 역방향 CSR (target ID -> source ID, 원본 엣지 번호)
+배열은 .npy로 저장되어 mmap으로 즉시 로드됩니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+DEFAULT_SNAPSHOT_DIR = Path(__file__).parent.parent.parent / "data" / "graph_snapshot"
+# 유지할 이전 버전 수 (로드 중인 다른 프로세스 보호)
+KEEP_VERSIONS = 2
+
+EdgeMap = Dict[Tuple[str, str], Tuple[str, float]]
+
+_VERSION_DIR = re.compile(r"^v(\d+)$")
+
+
+def _version_dirs(root: Path) -> List[Tuple[int, Path]]:
+    """root 아래 버전 디렉토리 (버전 번호 오름차순)"""
+    dirs = []
+    for path in root.glob("v*"):
+        match = _VERSION_DIR.match(path.name)
+        if match and path.is_dir():
+            dirs.append((int(match.group(1)), path))
+    return sorted(dirs)
+
+
+def _current_name(root: Path) -> Optional[str]:
+    current = root / "CURRENT"
+    if not current.exists():
+        return None
+    return current.read_text(encoding="utf-8").strip() or None
+
+
+def _row_key(rel: Dict) -> str:
+    """증분 동기화 중복 제거 키 (행 id, 없으면 자연 키 + created_at)"""
+    if rel.get("id") is not None:
+        return str(rel["id"])
+    return "|".join(
+        str(rel.get(col) or "")
+        for col in ("source_ticker", "target_ticker", "relationship_type", "created_at")
+    )
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """created_at(ISO 8601) 파싱 (시간대 없으면 UTC, 실패 시 None)"""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _confidence(value) -> float:
+    try:
+        return float(value) if value is not None else 0.5
+    except (TypeError, ValueError):
+        return 0.5
+
+
+class GraphSnapshot:
+    """정수 인코딩된 티커와 CSR 배열로 표현한 방향 그래프 (불변)"""
+
+    ARRAYS = (
+        "indptr",
+        "indices",
+        "edge_type",
+        "confidence",
+        "rev_indptr",
+        "rev_indices",
+        "rev_edges",
+    )
+
+    def __init__(
+        self,
+        tickers: List[str],
+        names: List[str],
+        type_names: List[str],
+        arrays: Dict[str, np.ndarray],
+        version: int = 0,
+        synced_at: Optional[str] = None,
+        built_at: Optional[float] = None,
+        recent_ids: Optional[Dict[str, str]] = None,
+    ):
+        self.tickers = tickers
+        self.names = names
+        self.type_names = type_names
+        self.version = version
+        self.synced_at = synced_at
+        self.built_at = built_at or time.time()
+        self.recent_ids = recent_ids or {}
+        self.ticker_index = {ticker: i for i, ticker in enumerate(tickers)}
+
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.edge_type = arrays["edge_type"]
+        self.confidence = arrays["confidence"]
+        self.rev_indptr = arrays["rev_indptr"]
+        self.rev_indices = arrays["rev_indices"]
+        self.rev_edges = arrays["rev_edges"]
+        self._fingerprint: Optional[str] = None
+
+    # ========== 생성 ==========
+
+    @classmethod
+    def from_edges(
+        cls,
+        edges: EdgeMap,
+        names: Dict[str, str],
+        synced_at: Optional[str] = None,
+        version: int = 0,
+    ) -> "GraphSnapshot":
+        """{(source, target): (type, confidence)} 엣지 맵으로 스냅샷 생성"""
+        tickers = sorted({t for edge in edges for t in edge})
+        index = {ticker: i for i, ticker in enumerate(tickers)}
+        type_names = sorted({rel_type for rel_type, _ in edges.values()})
+        type_index = {name: i for i, name in enumerate(type_names)}
+
+        ordered = sorted(edges.items(), key=lambda kv: (index[kv[0][0]], index[kv[0][1]]))
+        n, m = len(tickers), len(ordered)
+        src = np.fromiter((index[s] for (s, _), _ in ordered), dtype=np.int32, count=m)
+        dst = np.fromiter((index[t] for (_, t), _ in ordered), dtype=np.int32, count=m)
+        edge_type = np.fromiter(
+            (type_index[rel_type] for _, (rel_type, _) in ordered), dtype=np.uint8, count=m
+        )
+        confidence = np.fromiter((conf for _, (_, conf) in ordered), dtype=np.float32, count=m)
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+
+        rev_edges = np.lexsort((src, dst)).astype(np.int32)
+        rev_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dst, minlength=n), out=rev_indptr[1:])
+
+        return cls(
+            tickers=tickers,
+            names=[names.get(t, t) for t in tickers],
+            type_names=type_names,
+            arrays={
+                "indptr": indptr,
+                "indices": dst,
+                "edge_type": edge_type,
+                "confidence": confidence,
+                "rev_indptr": rev_indptr,
+                "rev_indices": src[rev_edges],
+                "rev_edges": rev_edges,
+            },
+            version=version,
+            synced_at=synced_at,
+        )
+
+    @staticmethod
+    def _apply_rows(
+        rows: Iterable[Dict], edges: EdgeMap, names: Dict[str, str], synced_at: Optional[str]
+    ) -> Optional[str]:
+        """company_relationships 행을 엣지 맵에 반영 (같은 source/target은 마지막 행 우선)"""
+        for rel in rows:
+            source = rel.get("source_ticker")
+            target = rel.get("target_ticker")
+            created_at = rel.get("created_at")
+            if created_at and (synced_at is None or created_at > synced_at):
+                synced_at = created_at
+            if not source or not target:
+                continue
+            names[source] = rel.get("source_company") or source
+            names[target] = rel.get("target_company") or target
+            edges[(source, target)] = (
+                rel.get("relationship_type") or "related",
+                _confidence(rel.get("confidence")),
+            )
+        return synced_at
+
+    @staticmethod
+    def _recent_ids(
+        recent: Dict[str, str], rows: List[Dict], synced_at: Optional[str], lookback: float
+    ) -> Dict[str, str]:
+        """synced_at - lookback 이후 created_at을 가진 반영 행 id (다음 증분 조회 범위)"""
+        recent = dict(recent)
+        recent.update(
+            (_row_key(rel), rel["created_at"]) for rel in rows if rel.get("created_at")
+        )
+        synced = _parse_timestamp(synced_at)
+        if synced is None:
+            return recent
+        cutoff = synced - timedelta(seconds=lookback)
+        return {
+            key: created_at
+            for key, created_at in recent.items()
+            if (_parse_timestamp(created_at) or synced) >= cutoff
+        }
+
+    def sync_start(self, lookback: float = 0.0) -> Optional[str]:
+        """
+        증분 조회 하한 (created_at >= 이 값)
+        synced_at보다 lookback초 앞에서 시작해 같은 시각의 행과 늦게 커밋된 행도 다시 확인
+        """
+        synced = _parse_timestamp(self.synced_at)
+        if synced is None:
+            return self.synced_at
+        return (synced - timedelta(seconds=lookback)).isoformat()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict], lookback: float = 0.0) -> "GraphSnapshot":
+        """company_relationships 전체 행으로 스냅샷 생성"""
+        rows = list(rows)
+        edges: EdgeMap = {}
+        names: Dict[str, str] = {}
+        synced_at = cls._apply_rows(rows, edges, names, None)
+        snapshot = cls.from_edges(edges, names, synced_at=synced_at)
+        snapshot.recent_ids = cls._recent_ids({}, rows, synced_at, lookback)
+        return snapshot
+
+    def merge_rows(self, rows: Iterable[Dict], lookback: float = 0.0) -> "GraphSnapshot":
+        """
+        변경된 행을 반영한 새 스냅샷 반환 (증분 갱신)
+        이미 반영한 행(recent_ids)은 건너뛰며, 새 행이 없으면 self를 그대로 반환
+        """
+        rows = [rel for rel in rows if _row_key(rel) not in self.recent_ids]
+        if not rows:
+            return self
+        edges = self.edge_map()
+        names = dict(zip(self.tickers, self.names))
+        synced_at = self._apply_rows(rows, edges, names, self.synced_at)
+        merged = self.from_edges(edges, names, synced_at=synced_at, version=self.version)
+        merged.built_at = self.built_at  # 전체 재구축 시각 유지
+        merged.recent_ids = self._recent_ids(self.recent_ids, rows, synced_at, lookback)
+        return merged
+
+    def edge_map(self) -> EdgeMap:
+        sources = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        return {
+            (self.tickers[s], self.tickers[t]): (self.type_names[c], float(conf))
+            for s, t, c, conf in zip(
+                sources.tolist(),
+                self.indices.tolist(),
+                self.edge_type.tolist(),
+                self.confidence.tolist(),
+            )
+        }
+
+    # ========== 저장 / 로드 ==========
+
+    def save(self, root: Path = DEFAULT_SNAPSHOT_DIR) -> int:
+        """
+        새 버전 디렉토리에 저장 후 CURRENT 포인터 교체. Returns: 저장된 버전
+        버전은 디스크에 있는 가장 큰 버전 다음 번호 (전체 재구축도 단조 증가,
+        다른 프로세스가 mmap 중인 기존 디렉토리를 덮어쓰지 않음)
+        self.version은 CURRENT 교체까지 성공한 뒤에만 바뀝니다 (실패 시 디렉토리 제거).
+        """
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        version = self.version
+        while True:
+            existing = [v for v, _ in _version_dirs(root)]
+            version = max(existing + [version]) + 1
+            version_dir = root / f"v{version:06d}"
+            try:
+                version_dir.mkdir(parents=True, exist_ok=False)
+                break
+            except FileExistsError:
+                continue  # 다른 프로세스가 같은 번호로 저장 중
+
+        try:
+            for name in self.ARRAYS:
+                np.save(version_dir / f"{name}.npy", getattr(self, name))
+            with open(version_dir / "meta.json", "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "format_version": SNAPSHOT_FORMAT_VERSION,
+                        "version": version,
+                        "tickers": self.tickers,
+                        "names": self.names,
+                        "type_names": self.type_names,
+                        "synced_at": self.synced_at,
+                        "built_at": self.built_at,
+                        "recent_ids": self.recent_ids,
+                    },
+                    f,
+                    ensure_ascii=False,
+                )
+
+            # CURRENT 포인터 원자적 교체
+            tmp_path = root / f"CURRENT.{version}.tmp"
+            tmp_path.write_text(version_dir.name, encoding="utf-8")
+            os.replace(tmp_path, root / "CURRENT")
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+        self.version = version
+
+        # 오래된 버전 정리 (버전 번호 기준, CURRENT 대상은 절대 삭제하지 않음)
+        current_name = _current_name(root)
+        for _, old_dir in _version_dirs(root)[:-KEEP_VERSIONS]:
+            if old_dir.name != current_name:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+        return self.version
+
+    def version_dir(self, root: Path = DEFAULT_SNAPSHOT_DIR) -> Path:
+        """이 버전의 저장 디렉토리 (중심성 등 버전별 파생 데이터도 함께 저장)"""
+        return Path(root) / f"v{self.version:06d}"
+
+    @classmethod
+    def load(cls, root: Path = DEFAULT_SNAPSHOT_DIR) -> Optional["GraphSnapshot"]:
+        """CURRENT가 가리키는 스냅샷을 mmap으로 로드 (없거나 포맷이 다르면 None)"""
+        root = Path(root)
+        current_name = _current_name(root)
+        if current_name is None:
+            return None
+
+        version_dir = root / current_name
+        try:
+            with open(version_dir / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+                logger.info("Graph snapshot format changed, rebuilding")
+                return None
+            arrays = {
+                name: np.load(version_dir / f"{name}.npy", mmap_mode="r")
+                for name in cls.ARRAYS
+            }
+        except (OSError, ValueError) as e:
+            logger.warning(f"Graph snapshot load failed: {e}")
+            return None
+
+        return cls(
+            tickers=meta["tickers"],
+            names=meta["names"],
+            type_names=meta["type_names"],
+            arrays=arrays,
+            version=meta.get("version", 0),
+            synced_at=meta.get("synced_at"),
+            built_at=meta.get("built_at"),
+            recent_ids=meta.get("recent_ids"),
+        )
+
+    # ========== 조회 ==========
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.tickers)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        그래프 내용(tickers/type_names/CSR/엣지 속성)의 해시
+        버전 번호와 무관한 파생 데이터(중심성/경로 탐색기/NetworkX 그래프) 캐시 키
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update("\n".join(self.tickers).encode("utf-8"))
+            digest.update(b"\0" + "\n".join(self.type_names).encode("utf-8"))
+            for array in (self.indptr, self.indices, self.edge_type):
+                digest.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+            digest.update(np.ascontiguousarray(self.confidence, dtype=np.float32).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.ticker_index
+
+    def successors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def predecessors(self, node: int) -> np.ndarray:
+        return self.rev_indices[self.rev_indptr[node] : self.rev_indptr[node + 1]]
+
+    def neighbors(self, node: int) -> np.ndarray:
+        """방향 무시 이웃 (중복 제거)"""
+        return np.union1d(self.successors(node), self.predecessors(node))
+
+    def find_edge(self, source: int, target: int) -> Optional[int]:
+        """source -> target 엣지 번호 (없으면 None, 행 내 이진 탐색)"""
+        start, end = int(self.indptr[source]), int(self.indptr[source + 1])
+        pos = start + int(np.searchsorted(self.indices[start:end], target))
+        if pos < end and self.indices[pos] == target:
+            return pos
+        return None
+
+    def edge_attrs(self, edge: int) -> Dict:
+        confidence = round(float(self.confidence[edge]), 6)
+        return {
+            "relationship_type": self.type_names[int(self.edge_type[edge])],
+            "confidence": confidence,
+            "weight": 1 - confidence,  # 신뢰도가 높을수록 거리가 짧음
+        }
+
+    def to_networkx(self) -> nx.DiGraph:
+        """NetworkX DiGraph로 변환 (NetworkX 알고리즘이 필요한 경우)"""
+        graph = nx.DiGraph()
+        for ticker, name in zip(self.tickers, self.names):
+            graph.add_node(ticker, name=name)
+        sources = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        for edge, (s, t) in enumerate(zip(sources.tolist(), self.indices.tolist())):
+            graph.add_edge(self.tickers[s], self.tickers[t], **self.edge_attrs(edge))
+        return graph
@@ -0,0 +1,544 @@
+"""
+Local Vector Index - documents 테이블 임베딩을 프로세스 내부에서 검색
+Supabase match_documents RPC 왕복 없이 top-k 유사도 검색을 수행합니다.
+
+- 임베딩은 float32 .npy 파일로 저장 후 mmap으로 로드 (워커 간 페이지 캐시 공유)
+- hnswlib 설치 시 HNSW 인덱스 사용, 미설치 시 numpy exact scan
+- quantization="int8"/"binary" 설정 시 압축 코드(4x/32x)로 전체 스캔 후
+  shortlist만 float32 원본으로 재점수화 (원본 행렬은 mmap으로 필요한 행만 접근)
+- 결과 형식은 VectorStore.similarity_search와 동일 (id, content, metadata, similarity)
+- 로드/빌드는 백그라운드 스레드에서 수행 (준비 전 검색은 호출자가 pgvector RPC 사용)
+- build가 마지막에 쓰는 index_version이 바뀌면 (LOCAL_INDEX_RELOAD_SECONDS 간격 확인)
+  새 인덱스를 백그라운드로 로드한 뒤 교체 - scripts/build_search_indexes.py로 재빌드
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# config.settings.VECTOR_STORE_DIR와 동일한 위치
+DEFAULT_INDEX_DIR = Path(__file__).parent.parent.parent / "data" / "vector_store"
+
+# 이 크기 미만이면 HNSW보다 exact scan이 더 빠르고 정확함
+HNSW_MIN_ROWS = 5000
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+# 양자화 코드 스캔 시 블록 단위 (float32 임시 배열 크기 제한)
+SCAN_BLOCK_ROWS = 4096
+# 바이트별 set bit 수 (binary 코드 hamming distance 계산용)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def matches_filter(metadata: Optional[Dict], filter_dict: Optional[Dict]) -> bool:
+    """metadata가 filter_dict의 모든 key/value와 일치하는지 확인 (jsonb @> 와 동일)"""
+    if not filter_dict:
+        return True
+    metadata = metadata or {}
+    return all(metadata.get(key) == value for key, value in filter_dict.items())
+
+
+def write_atomic(path: Path, write):
+    """
+    임시 파일에 쓴 뒤 os.replace로 교체 (읽는 쪽은 이전 파일 또는 완성된 새 파일만 봄)
+    임시 파일 이름은 호출마다 달라 여러 프로세스가 동시에 써도 서로 덮어쓰지 않음
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def index_version(index_dir: Path) -> Optional[str]:
+    """디스크 벡터 인덱스 버전 (index_version 파일, 없으면 메타 파일 수정 시각)"""
+    try:
+        return (index_dir / LocalVectorIndex.VERSION_FILE).read_text().strip()
+    except OSError:
+        pass
+    try:
+        return str((index_dir / LocalVectorIndex.META_FILE).stat().st_mtime_ns)
+    except OSError:
+        return None
+
+
+def _parse_embedding(value) -> Optional[List[float]]:
+    """pgvector 컬럼 값(문자열 '[...]' 또는 리스트)을 float 리스트로 변환"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return list(value)
+
+
+class LocalVectorIndex:
+    """documents 테이블의 로컬 복제본에 대한 ANN(HNSW) / exact 검색 인덱스"""
+
+    EMBEDDINGS_FILE = "embeddings.npy"
+    META_FILE = "documents_meta.json"
+    HNSW_FILE = "hnsw.bin"
+    # 양자화 코드 (.npz에 codes/scale과 원본 인덱스 버전을 함께 저장)
+    INT8_FILE = "embeddings_int8.npz"
+    BINARY_FILE = "embeddings_binary.npz"
+    VERSION_FILE = "index_version"
+
+    def __init__(
+        self,
+        supabase=None,
+        table_name: str = "documents",
+        dimension: int = 1536,
+        index_dir: Optional[Path] = None,
+        quantization: Optional[str] = None,
+        oversample: int = 10,
+        auto_build: Optional[bool] = None,
+    ):
+        """
+        Args:
+            supabase: Supabase Client (build 시에만 필요)
+            table_name: 임베딩을 가져올 테이블
+            dimension: 임베딩 차원
+            index_dir: 인덱스 파일 저장 경로
+            quantization: "none", "int8", "binary"
+                (None이면 LOCAL_INDEX_QUANTIZATION 환경 변수, 기본 none)
+            oversample: 양자화 검색 시 float 재점수화할 후보 배수 (k * oversample)
+            auto_build: 인덱스 파일이 없을 때 백그라운드 로드에서 1회 빌드할지 여부
+                (None이면 LOCAL_INDEX_AUTO_BUILD 환경 변수, 기본 true)
+        """
+        quantization = (
+            quantization or os.getenv("LOCAL_INDEX_QUANTIZATION", "none")
+        ).lower()
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"지원하지 않는 quantization: {quantization}")
+
+        self.quantization = quantization
+        self.oversample = oversample
+        self.supabase = supabase
+        self.table_name = table_name
+        self.dimension = dimension
+        self.index_dir = Path(index_dir) if index_dir else DEFAULT_INDEX_DIR / table_name
+        if auto_build is None:
+            auto_build = os.getenv("LOCAL_INDEX_AUTO_BUILD", "true").lower() == "true"
+        self.auto_build = auto_build
+        self.reload_interval = float(os.getenv("LOCAL_INDEX_RELOAD_SECONDS", "30"))
+
+        # 검색에 사용하는 로드 완료 인덱스 (백그라운드 로드 후 참조 1회 교체)
+        self._active: Optional["LocalVectorIndex"] = None
+        self._loaded_version: Optional[str] = None
+        self._loader: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._build_attempted = False
+        self._embeddings: Optional[np.ndarray] = None
+        self._ids: List = []
+        self._contents: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._hnsw = None
+        # 양자화 코드 (int8: (N, dim) int8 / binary: (N, dim/8) uint8)
+        self._codes: Optional[np.ndarray] = None
+        self._int8_scale: Optional[np.ndarray] = None
+        # ticker별 행 번호 파티션 (ticker 필터 검색 시 해당 기업 청크만 스캔)
+        self._ticker_rows: Dict[str, np.ndarray] = {}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._active is not None
+
+    def __len__(self) -> int:
+        active = self._active
+        return len(active._ids) if active is not None else 0
+
+    # ========== 빌드 / 로드 ==========
+
+    def build(self, page_size: int = 1000) -> int:
+        """
+        Supabase에서 전체 문서를 페이지 단위로 읽어 인덱스 파일을 생성합니다.
+
+        Returns:
+            인덱싱된 문서 수
+        """
+        if self.supabase is None:
+            raise ValueError("인덱스 빌드에는 Supabase 클라이언트가 필요합니다.")
+
+        ids, contents, metadatas, vectors = [], [], [], []
+        offset = 0
+        while True:
+            rows = (
+                self.supabase.table(self.table_name)
+                .select("id, content, metadata, embedding")
+                .range(offset, offset + page_size - 1)
+                .execute()
+                .data
+                or []
+            )
+            for row in rows:
+                embedding = _parse_embedding(row.get("embedding"))
+                if not embedding or len(embedding) != self.dimension:
+                    continue
+                ids.append(row.get("id"))
+                contents.append(row.get("content") or "")
+                metadatas.append(row.get("metadata") or {})
+                vectors.append(embedding)
+
+            if len(rows) < page_size:
+                break
+            offset += page_size
+
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        # 코사인 유사도를 내적으로 계산하기 위해 L2 정규화
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(norms, 1e-12)
+
+        # 임시 파일에 쓴 뒤 교체 (다른 프로세스가 mmap 중인 기존 파일은 그대로 유지)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(self.EMBEDDINGS_FILE, lambda f: np.save(f, matrix))
+        meta = json.dumps(
+            {"ids": ids, "contents": contents, "metadatas": metadatas}, ensure_ascii=False
+        )
+        self._write_atomic(self.META_FILE, lambda f: f.write(meta.encode("utf-8")))
+
+        # 기존 HNSW/양자화 파일은 새 행렬과 맞지 않으므로 제거
+        for name in (self.HNSW_FILE, self.INT8_FILE, self.BINARY_FILE):
+            path = self.index_dir / name
+            if path.exists():
+                path.unlink()
+
+        # 마지막에 버전 기록 - 실행 중인 프로세스가 이 값의 변경으로 재로드
+        version = str(time.time_ns())
+        self._write_atomic(self.VERSION_FILE, lambda f: f.write(version.encode("utf-8")))
+
+        logger.info(f"Built local vector index: {len(ids)} documents -> {self.index_dir}")
+        return len(ids)
+
+    def _write_atomic(self, name: str, write):
+        write_atomic(self.index_dir / name, write)
+
+    def _disk_version(self) -> Optional[str]:
+        return index_version(self.index_dir)
+
+    def load(self) -> bool:
+        """디스크의 인덱스 파일을 mmap으로 로드 (파일이 없으면 False, 동기 호출)"""
+        emb_path = self.index_dir / self.EMBEDDINGS_FILE
+        meta_path = self.index_dir / self.META_FILE
+        if not emb_path.exists() or not meta_path.exists():
+            return False
+
+        version = self._disk_version()
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        embeddings = np.load(emb_path, mmap_mode="r")
+        if len(embeddings) != len(meta.get("ids", [])):
+            # 다른 프로세스가 재빌드 중 - 다음 확인 시 다시 로드
+            logger.warning("Local vector index files are out of sync (rebuild in progress?)")
+            return False
+
+        self._embeddings = embeddings
+        self._ids = meta.get("ids", [])
+        self._contents = meta.get("contents", [])
+        self._metadatas = meta.get("metadatas", [])
+        self._ticker_rows = self._build_partitions()
+        self._loaded_version = version  # 파생 파일(양자화 코드/HNSW) 검증용
+        if self.quantization == "none":
+            self._hnsw = self._load_hnsw()
+            mode = "HNSW" if self._hnsw is not None else "exact scan"
+        else:
+            self._load_codes()
+            mode = f"{self.quantization} scan + float re-score"
+
+        self._active = self
+        logger.info(f"Loaded local vector index: {len(self._ids)} documents ({mode})")
+        return True
+
+    def _load_codes(self):
+        """
+        양자화 코드 로드
+        파일이 없거나 다른 빌드의 코드면 float32 행렬에서 생성 후 원자적으로 저장
+        (여러 워커가 동시에 로드해도 완성된 파일만 교체됨)
+        """
+        name = self.INT8_FILE if self.quantization == "int8" else self.BINARY_FILE
+        path = self.index_dir / name
+        try:
+            with np.load(path) as data:
+                if str(data["version"]) == self._loaded_version:
+                    self._codes = data["codes"]
+                    self._int8_scale = data["scale"] if "scale" in data.files else None
+                    return
+        except (OSError, KeyError, ValueError):
+            pass
+
+        arrays = self._encode()
+        self._codes = arrays["codes"]
+        self._int8_scale = arrays.get("scale")
+        try:
+            write_atomic(
+                path,
+                lambda f: np.savez(f, version=np.asarray(str(self._loaded_version)), **arrays),
+            )
+        except OSError as e:
+            logger.warning(f"Quantized codes not saved (recomputed on next load): {e}")
+
+    def _encode(self) -> Dict[str, np.ndarray]:
+        """float32 행렬을 양자화 코드로 변환"""
+        if self.quantization == "binary":
+            return {"codes": np.packbits(np.asarray(self._embeddings) > 0, axis=1)}
+
+        # 차원별 최대 절대값 기준 대칭 스칼라 양자화
+        max_abs = np.zeros(self.dimension, dtype=np.float32)
+        for start in range(0, len(self._embeddings), SCAN_BLOCK_ROWS):
+            block = np.abs(self._embeddings[start : start + SCAN_BLOCK_ROWS])
+            max_abs = np.maximum(max_abs, block.max(axis=0))
+        scale = (np.maximum(max_abs, 1e-12) / 127.0).astype(np.float32)
+        codes = np.empty(self._embeddings.shape, dtype=np.int8)
+        for start in range(0, len(self._embeddings), SCAN_BLOCK_ROWS):
+            block = self._embeddings[start : start + SCAN_BLOCK_ROWS] / scale
+            codes[start : start + len(block)] = np.clip(np.rint(block), -127, 127)
+        return {"codes": codes, "scale": scale}
+
+    def ensure_loaded(self) -> bool:
+        """
+        검색 가능 여부 (쿼리 경로에서는 로드/빌드하지 않음)
+
+        준비 전이거나 디스크 버전이 바뀌었으면 백그라운드 로드를 시작하고, 그동안은
+        기존 인덱스(없으면 False - 호출자가 pgvector RPC 사용)로 검색합니다.
+        """
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            if self._active is None or self._disk_version() != self._loaded_version:
+                self.start_background_load()
+        return self._active is not None
+
+    def start_background_load(self) -> threading.Thread:
+        """인덱스 로드(파일이 없으면 1회 빌드)를 백그라운드에서 시작 (진행 중이면 그 스레드 반환)"""
+        with self._lock:
+            if self._loader is None or not self._loader.is_alive():
+                self._loader = threading.Thread(
+                    target=self._load_or_build,
+                    name=f"local-index-{self.table_name}",
+                    daemon=True,
+                )
+                self._loader.start()
+            return self._loader
+
+    def _load_or_build(self):
+        """새 인스턴스에 로드한 뒤 검색 대상을 교체 (검색 중인 기존 인덱스는 그대로 사용)"""
+        staged = type(self)(
+            supabase=self.supabase,
+            table_name=self.table_name,
+            dimension=self.dimension,
+            index_dir=self.index_dir,
+            quantization=self.quantization,
+            oversample=self.oversample,
+            auto_build=False,
+        )
+        try:
+            loaded = staged.load()
+            if not loaded and self.auto_build and self.supabase is not None:
+                if not self._build_attempted:
+                    self._build_attempted = True
+                    staged.build()
+                    loaded = staged.load()
+        except Exception as e:
+            logger.warning(f"Local vector index load failed, using RPC: {e}")
+            return
+        if loaded:
+            self._loaded_version = staged._loaded_version
+            self._active = staged
+
+    def _build_partitions(self) -> Dict[str, np.ndarray]:
+        """metadata.ticker 기준 행 번호 파티션 생성"""
+        rows_by_ticker: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(self._metadatas):
+            ticker = (metadata or {}).get("ticker")
+            if ticker:
+                rows_by_ticker.setdefault(ticker, []).append(i)
+        return {
+            ticker: np.asarray(rows, dtype=np.int64)
+            for ticker, rows in rows_by_ticker.items()
+        }
+
+    def _load_hnsw(self):
+        """hnswlib이 설치되어 있으면 HNSW 인덱스를 로드/생성"""
+        if self._embeddings is None or len(self._embeddings) < HNSW_MIN_ROWS:
+            return None
+        try:
+            import hnswlib
+        except ImportError:
+            return None
+
+        count = len(self._embeddings)
+        index = hnswlib.Index(space="ip", dim=self.dimension)
+        hnsw_path = self.index_dir / self.HNSW_FILE
+        loaded = False
+        if hnsw_path.exists():
+            try:
+                index.load_index(str(hnsw_path), max_elements=count)
+                loaded = index.get_current_count() == count
+            except Exception:
+                loaded = False
+        try:
+            if not loaded:
+                # 파일이 없거나 다른 빌드의 인덱스 - 생성 후 원본 버전이 그대로일 때만 교체 저장
+                index = hnswlib.Index(space="ip", dim=self.dimension)
+                index.init_index(max_elements=count, ef_construction=200, M=16)
+                index.add_items(np.asarray(self._embeddings), np.arange(count))
+                fd, tmp_name = tempfile.mkstemp(
+                    dir=str(self.index_dir), prefix=self.HNSW_FILE + ".", suffix=".tmp"
+                )
+                os.close(fd)
+                try:
+                    index.save_index(tmp_name)
+                    if self._disk_version() == self._loaded_version:
+                        os.replace(tmp_name, hnsw_path)
+                finally:
+                    if os.path.exists(tmp_name):
+                        os.unlink(tmp_name)
+            index.set_ef(128)
+            return index
+        except Exception as e:
+            logger.warning(f"HNSW index unavailable, using exact scan: {e}")
+            return None
+
+    # ========== 검색 ==========
+
+    def _candidate_rows(self, filter_dict: Optional[Dict]) -> Optional[np.ndarray]:
+        """필터에 해당하는 행 번호 (필터가 없으면 None = 전체)"""
+        if not filter_dict:
+            return None
+
+        rest = dict(filter_dict)
+        ticker = rest.pop("ticker", None)
+        if ticker is not None:
+            rows = self._ticker_rows.get(ticker, np.empty(0, dtype=np.int64))
+        else:
+            rows = np.arange(len(self._ids), dtype=np.int64)
+
+        if rest:
+            rows = np.asarray(
+                [i for i in rows.tolist() if matches_filter(self._metadatas[i], rest)],
+                dtype=np.int64,
+            )
+        return rows
+
+    def _top_k(self, query: np.ndarray, k: int, rows: Optional[np.ndarray] = None):
+        """(row indices, similarities) 상위 k개 반환 - 유사도 내림차순"""
+        total = len(self._ids) if rows is None else len(rows)
+        k = min(k, total)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if rows is None and self._hnsw is not None:
+            labels, distances = self._hnsw.knn_query(query, k=k)
+            # space="ip"의 distance = 1 - 내적
+            return labels[0].astype(np.int64), 1.0 - distances[0]
+
+        # 양자화 코드로 후보를 줄인 뒤 아래 exact scan으로 float 재점수화
+        if self._codes is not None and total > k * self.oversample:
+            rows = self._quantized_shortlist(query, k * self.oversample, rows)
+
+        # 필터 검색은 파티션 크기가 작으므로 exact scan
+        matrix = self._embeddings if rows is None else self._embeddings[rows]
+        scores = matrix @ query
+        if k < len(scores):
+            idx = np.argpartition(-scores, k - 1)[:k]
+        else:
+            idx = np.arange(len(scores))
+        idx = idx[np.argsort(-scores[idx])]
+        row_idx = idx if rows is None else rows[idx]
+        return row_idx, scores[idx]
+
+    def _quantized_shortlist(
+        self, query: np.ndarray, n: int, rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """양자화 코드 전체 스캔으로 상위 n개 후보 행 번호 반환 (행 번호 오름차순)"""
+        if self.quantization == "int8":
+            weights = query * self._int8_scale
+
+            def _score(block):
+                return block.astype(np.float32) @ weights
+
+        else:
+            query_bits = np.packbits(query > 0)
+
+            def _score(block):
+                # hamming distance가 작을수록 유사 -> 음수로 변환
+                return -_POPCOUNT[np.bitwise_xor(block, query_bits)].sum(
+                    axis=1, dtype=np.int32
+                )
+
+        total = len(self._codes) if rows is None else len(rows)
+        scores = np.empty(total, dtype=np.float32)
+        for start in range(0, total, SCAN_BLOCK_ROWS):
+            if rows is None:
+                block = self._codes[start : start + SCAN_BLOCK_ROWS]
+            else:
+                block = self._codes[rows[start : start + SCAN_BLOCK_ROWS]]
+            scores[start : start + len(block)] = _score(block)
+
+        top = np.argpartition(-scores, n - 1)[:n]
+        candidates = top if rows is None else rows[top]
+        # 행 번호 순으로 정렬하여 mmap 원본 접근의 지역성 확보
+        return np.sort(candidates)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        k: int = 5,
+        threshold: float = 0.0,
+        filter_dict: Optional[Dict] = None,
+        fallback_top_k: bool = False,
+    ) -> List[Dict]:
+        """
+        top-k 유사 문서 검색
+
+        Args:
+            query_embedding: 질의 임베딩
+            k: 반환할 문서 수
+            threshold: 최소 코사인 유사도 (이하인 문서는 제외)
+            filter_dict: metadata 일치 조건 (예: {"ticker": "AAPL", "section": "mda"})
+            fallback_top_k: True면 threshold를 넘는 문서가 없을 때 threshold 없이 top-k 반환
+                (match_documents RPC의 threshold 제거 재시도와 같은 동작을 1회 계산으로 처리)
+
+        Returns:
+            List of documents with similarity scores
+        """
+        if not self.ensure_loaded():
+            return []
+        index = self._active  # 검색 도중 교체되어도 같은 인덱스 사용
+
+        query = np.array(query_embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        idx, sims = index._top_k(query, k, index._candidate_rows(filter_dict))
+        hits = [
+            {
+                "id": index._ids[i],
+                "content": index._contents[i],
+                "metadata": index._metadatas[i],
+                "similarity": float(s),
+            }
+            for i, s in zip(idx.tolist(), sims.tolist())
+        ]
+
+        above = [doc for doc in hits if doc["similarity"] > threshold]
+        if not above and hits and fallback_top_k:
+            logger.warning(f"No local index results above threshold {threshold}, returning top-{k}")
+            return hits
+        return above
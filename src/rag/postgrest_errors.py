@@ -0,0 +1,79 @@
+"""
+PostgREST Errors - 배포되지 않았을 수 있는 Supabase 기능의 가용성 판단
+(match_documents_filtered RPC, companies 임베딩 조인, 자연 키 unique index 등)
+
+- 기능이 없음을 뜻하는 오류 코드(PGRST202 / 42883 / PGRST200 등)면 프로세스 동안 대체 경로 사용
+- 그 외 오류(네트워크/타임아웃/일시 장애)는 cooldown 동안만 대체 경로 사용 후 다시 시도
+  (SUPABASE_FEATURE_RETRY_SECONDS, 기본 60초)
+"""
+
+import logging
+import os
+import re
+import time
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# RPC 함수 없음 (스키마 캐시에 없음 / 시그니처 불일치)
+MISSING_FUNCTION = frozenset({"PGRST202", "42883"})
+# 테이블 간 관계(외래 키) 없음 - 임베딩 조인 불가
+MISSING_RELATIONSHIP = frozenset({"PGRST200"})
+# ON CONFLICT 대상 unique index 없음
+MISSING_CONFLICT_TARGET = frozenset({"42P10"})
+# 컬럼 없음
+MISSING_COLUMN = frozenset({"PGRST204", "42703"})
+
+_CODE_PATTERN = re.compile(r"['\"]code['\"]:\s*['\"]([0-9A-Z]+)['\"]")
+
+
+def error_code(error: Exception) -> Optional[str]:
+    """postgrest APIError(또는 그 문자열 표현)에서 오류 코드 추출"""
+    code = getattr(error, "code", None)
+    if code:
+        return str(code)
+    if error.args and isinstance(error.args[0], dict):
+        return error.args[0].get("code")
+    match = _CODE_PATTERN.search(str(error))
+    return match.group(1) if match else None
+
+
+class OptionalFeature:
+    """배포 여부가 환경마다 다른 DB 기능의 사용 여부 (인스턴스별)"""
+
+    def __init__(self, name: str, missing_codes: Iterable[str], cooldown: Optional[float] = None):
+        """
+        Args:
+            name: 로그용 기능 이름
+            missing_codes: 기능이 없음을 확정하는 오류 코드
+            cooldown: 그 외 오류 후 대체 경로를 사용할 시간(초)
+        """
+        self.name = name
+        self.missing_codes = frozenset(missing_codes)
+        if cooldown is None:
+            cooldown = float(os.getenv("SUPABASE_FEATURE_RETRY_SECONDS", "60"))
+        self.cooldown = cooldown
+        self.missing = False
+        self._retry_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        return not self.missing and time.monotonic() >= self._retry_at
+
+    def failed(self, error: Exception) -> bool:
+        """
+        실패 기록
+
+        Returns:
+            기능이 없다고 확정되었으면 True (일시 오류면 False)
+        """
+        if error_code(error) in self.missing_codes:
+            if not self.missing:
+                logger.warning(f"{self.name} is not deployed, using fallback: {error}")
+            self.missing = True
+            return True
+        self._retry_at = time.monotonic() + self.cooldown
+        logger.warning(
+            f"{self.name} failed, using fallback for {self.cooldown:.0f}s: {error}"
+        )
+        return False
@@ -20,6 +20,7 @@ try:
     from rag.vector_store import VectorStore
     from rag.graph_rag import GraphRAG
     from rag.data_retriever import DataRetriever
+    from rag.reranker import warm_up_reranker
 
     RAG_AVAILABLE = True
 except ImportError:
@@ -27,22 +28,21 @@ except ImportError:
         from src.rag.vector_store import VectorStore
         from src.rag.graph_rag import GraphRAG
         from src.rag.data_retriever import DataRetriever
+        from src.rag.reranker import warm_up_reranker
 
         RAG_AVAILABLE = True
     except ImportError:
         RAG_AVAILABLE = False
         logger.warning("RAG core modules not found. Some features may be disabled.")
 
-# Stock API 클라이언트 임포트 (tools 우선 사용)
+# Stock API 클라이언트 임포트 (프로세스 공용 단일 클라이언트)
 try:
-    from src.tools.stock_api_client import get_stock_api_client
+    from tools.stock_api_client import get_stock_api_client
 
     STOCK_API_AVAILABLE = True
 except ImportError:
     try:
-        from data.stock_api_client import get_stock_api_client
-
-        STOCK_API_AVAILABLE = True
+        from src.tools.stock_api_client import get_stock_api_client
 
         STOCK_API_AVAILABLE = True
     except ImportError:
@@ -99,6 +99,8 @@ class RAGBase:
         if RAG_AVAILABLE:
             try:
                 self.vector_store = VectorStore()
+                # Reranker 백그라운드 로드 (첫 검색 콜드 스타트 제거, 프로세스당 1회)
+                warm_up_reranker()
                 self.graph_rag = GraphRAG()
                 self.data_retriever = DataRetriever(
                     supabase=self.supabase,
@@ -45,8 +45,11 @@ class ReportGenerator(RAGBase):
         raw_data = self.data_retriever.get_company_context_parallel(
             ticker, include_finnhub=False, include_rag=True
         )
+        return self._to_report_data(raw_data)
 
-        # 레포트 포맷에 맞게 데이터 재구성
+    @staticmethod
+    def _to_report_data(raw_data: Dict) -> Dict:
+        """DataRetriever 결과를 레포트 포맷에 맞게 재구성"""
         return {
             "company": raw_data.get("company"),
             "annual_reports": raw_data.get("financials", {}).get("annual", []),
@@ -421,11 +424,23 @@ class ReportGenerator(RAGBase):
         try:
             context_parts = []
 
+            # 모든 기업 데이터를 한 번에 수집 (in_() 배치 조회 + 공유 풀)
+            all_data = (
+                self.data_retriever.get_companies_context_parallel(tickers)
+                if self.data_retriever
+                else {}
+            )
+
             for ticker in tickers:
                 context_parts.append(f"\n# {ticker.upper()}")
+                raw_data = all_data.get(ticker.upper())
 
                 # Get Supabase data
-                supabase_data = self._get_company_data(ticker)
+                supabase_data = (
+                    self._to_report_data(raw_data)
+                    if raw_data is not None
+                    else self._get_company_data(ticker)
+                )
                 supabase_context = (
                     self._format_data_context(supabase_data)
                     if supabase_data.get("company")
@@ -433,7 +448,9 @@ class ReportGenerator(RAGBase):
                 )
 
                 # Get Finnhub data
-                finnhub_context = self._get_finnhub_data(ticker)
+                finnhub_context = self._get_finnhub_data(
+                    ticker, raw_finnhub=raw_data.get("finnhub") if raw_data else None
+                )
 
                 # Combine
                 if supabase_context and finnhub_context:
@@ -0,0 +1,450 @@
+"""
+Reranker Engine - CrossEncoder 재정렬 엔진
+VectorStore.rerank_results에서 사용하는 CPU 추론을 최적화합니다.
+
+- 동시 요청의 (query, passage) 쌍을 마이크로 배치로 묶어 한 번에 추론
+- RERANKER_BACKEND=onnx 설정 시 동일 모델의 int8 양자화 ONNX export 사용
+- (query hash, chunk id) 기준 점수 메모이제이션 (LRU)
+- warm_up_reranker(): 앱 시작 시 백그라운드 모델 로드 (첫 검색 대기 제거)
+- RERANKER_SERVER 설정 시 로컬 소켓의 공유 rerank 서버 사용 (워커별 모델 중복 로드 방지)
+    서버에 연결할 수 없으면 프로세스 내 모델로 대체하고 RERANKER_SERVER_RETRY_SECONDS 후 재연결
+    서버 실행: python src/rag/reranker.py --serve 127.0.0.1:6010
+    인증 키: RERANKER_AUTHKEY 환경 변수, 없으면 서버가 생성한 키 파일(권한 0600)
+        (RERANKER_AUTHKEY_FILE, 기본 data/cache/reranker_authkey)을 서버와 클라이언트가 공유
+"""
+
+import hashlib
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+# Hugging Face 모델 저장소에 포함된 int8 양자화 ONNX 파일
+DEFAULT_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+DEFAULT_AUTHKEY_PATH = Path(__file__).parent.parent.parent / "data" / "cache" / "reranker_authkey"
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+def _parse_address(address: str) -> Tuple[str, int]:
+    """'host:port' 문자열을 (host, port)로 변환"""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _authkey(create: bool = False) -> bytes:
+    """
+    서버/클라이언트 공용 인증 키
+
+    RERANKER_AUTHKEY가 없으면 키 파일을 읽고, 파일이 없으면 서버(create=True)만
+    임의 키를 생성해 0600 권한으로 저장합니다. 빈 키나 다른 사용자가
+    읽을 수 있는 키 파일은 거부합니다 (RuntimeError).
+    """
+    key = os.getenv("RERANKER_AUTHKEY")
+    if key is not None:
+        if not key.strip():
+            raise RuntimeError("RERANKER_AUTHKEY must not be empty")
+        return key.encode("utf-8")
+
+    path = Path(os.getenv("RERANKER_AUTHKEY_FILE") or DEFAULT_AUTHKEY_PATH)
+    if not path.exists():
+        if not create:
+            raise RuntimeError(
+                f"Reranker auth key not found: set RERANKER_AUTHKEY or start the server to create {path}"
+            )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass  # 다른 서버 프로세스가 먼저 생성
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+            logger.info(f"Generated reranker auth key: {path}")
+
+    if path.stat().st_mode & 0o077:
+        raise RuntimeError(f"Reranker auth key file {path} must not be accessible by other users (chmod 600)")
+    key = path.read_text().strip()
+    if not key:
+        raise RuntimeError(f"Reranker auth key file {path} is empty")
+    return key.encode("utf-8")
+
+
+class RerankerEngine:
+    """마이크로 배칭 + 점수 캐시를 갖춘 CrossEncoder 래퍼"""
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        backend: Optional[str] = None,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        cache_size: int = 20000,
+        server_address: Optional[str] = None,
+    ):
+        """
+        Args:
+            model_name: CrossEncoder 모델명
+            backend: "torch" 또는 "onnx" (None이면 RERANKER_BACKEND 환경 변수, 기본 torch)
+            max_batch_size: 한 번에 추론할 최대 쌍 수
+            max_wait_ms: 다른 요청을 모으기 위해 대기하는 최대 시간
+            cache_size: 점수 캐시 최대 항목 수
+            server_address: 공유 rerank 서버 주소 "host:port"
+                (None이면 RERANKER_SERVER 환경 변수, 미설정 시 프로세스 내 모델 사용)
+        """
+        self.model_name = model_name
+        self.backend = (backend or os.getenv("RERANKER_BACKEND", "torch")).lower()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.cache_size = cache_size
+
+        self._model = None
+        self._load_failed = False
+        self._load_lock = threading.Lock()
+
+        if server_address is None:
+            server_address = os.getenv("RERANKER_SERVER")
+        self.server_address = server_address or None
+        self.remote_retry = float(os.getenv("RERANKER_SERVER_RETRY_SECONDS", "30"))
+        self._remote_ok = False
+        self._remote_retry_at = 0.0
+        self._local = threading.local()  # 스레드별 서버 연결
+
+        self._queue: "queue.Queue[Tuple[List[Tuple[str, str]], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # ========== 모델 로드 ==========
+
+    def _load_model(self):
+        from sentence_transformers import CrossEncoder
+
+        if self.backend == "onnx":
+            try:
+                return CrossEncoder(
+                    self.model_name,
+                    backend="onnx",
+                    model_kwargs={
+                        "file_name": os.getenv("RERANKER_ONNX_FILE", DEFAULT_ONNX_FILE)
+                    },
+                )
+            except Exception as e:
+                logger.warning(f"ONNX reranker unavailable, using torch backend: {e}")
+                self.backend = "torch"
+        return CrossEncoder(self.model_name)
+
+    def load(self) -> bool:
+        """공유 서버 연결 또는 모델 로드 (모델 로드는 1회, 실패 시 재시도하지 않음)"""
+        if self.is_loaded:
+            return True
+        with self._load_lock:
+            if self.is_loaded:
+                return True
+            # 공유 서버가 있으면 모델을 로드하지 않고 서버에 위임
+            if self._remote_due() and self._connect_remote():
+                return True
+        return self._load_local()
+
+    def _load_local(self) -> bool:
+        """프로세스 내 CrossEncoder 로드 (서버를 사용할 수 없을 때)"""
+        if self._model is not None:
+            return True
+        with self._load_lock:
+            if self._model is not None:
+                return True
+            if self._load_failed:
+                return False
+            try:
+                self._model = self._load_model()
+                logger.info(
+                    f"CrossEncoder reranker loaded successfully ({self.backend})"
+                )
+                return True
+            except ImportError:
+                logger.warning(
+                    "sentence-transformers not installed. Reranking will be disabled."
+                )
+            except Exception as e:
+                logger.error(f"CrossEncoder load failed: {e}")
+            self._load_failed = True
+            return False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None or self._remote_ok
+
+    @property
+    def is_cold(self) -> bool:
+        """아직 모델 로드(또는 서버 연결) 전 - 다음 점수 계산에 로드 시간이 포함됨"""
+        return not self.is_loaded and not self._load_failed
+
+    # ========== 공유 서버 클라이언트 ==========
+
+    def _remote_due(self) -> bool:
+        """서버 연결을 (다시) 시도할 시점인지"""
+        return (
+            bool(self.server_address)
+            and not self._remote_ok
+            and time.monotonic() >= self._remote_retry_at
+        )
+
+    def _connect_remote(self) -> bool:
+        """공유 서버 연결 확인 (실패 시 remote_retry초 동안 프로세스 내 모델 사용)"""
+        try:
+            self._remote_predict([])
+        except Exception as e:
+            self._remote_retry_at = time.monotonic() + self.remote_retry
+            logger.warning(
+                f"Reranker server {self.server_address} unreachable, using local model: {e}"
+            )
+            return False
+        self._remote_ok = True
+        logger.info(f"Using shared reranker server: {self.server_address}")
+        return True
+
+    def _remote_predict(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """공유 rerank 서버에 점수 계산 요청 (연결 끊김 시 1회 재연결)"""
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            try:
+                if conn is None:
+                    conn = Client(_parse_address(self.server_address), authkey=_authkey())
+                    self._local.conn = conn
+                conn.send(pairs)
+                result = conn.recv()
+                if isinstance(result, Exception):
+                    raise result
+                return result
+            except (EOFError, OSError):
+                self._local.conn = None
+                if attempt:
+                    raise
+
+    # ========== 마이크로 배칭 ==========
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._batch_loop, name="reranker-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            total = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+
+            # 대기 시간 내에 들어온 다른 요청을 같은 배치로 묶음
+            while total < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                total += len(item[0])
+
+            pairs = [pair for item_pairs, _ in batch for pair in item_pairs]
+            try:
+                scores = self._model.predict(pairs, batch_size=self.max_batch_size)
+                offset = 0
+                for item_pairs, future in batch:
+                    future.set_result(
+                        [float(s) for s in scores[offset : offset + len(item_pairs)]]
+                    )
+                    offset += len(item_pairs)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+    def predict(self, pairs: Sequence[Tuple[str, str]]) -> List[float]:
+        """(query, passage) 쌍 점수 계산 - 동시 요청과 함께 배치 처리"""
+        if not pairs:
+            return []
+        if not self.load():
+            raise RuntimeError("Reranker model is not available")
+        if self._remote_due():
+            with self._load_lock:
+                if self._remote_due():
+                    self._connect_remote()
+        if self._remote_ok:
+            try:
+                return self._remote_predict(list(pairs))
+            except Exception as e:
+                # 서버 종료/재시작 - 재연결 시점까지 프로세스 내 모델로 대체
+                self._remote_ok = False
+                self._remote_retry_at = time.monotonic() + self.remote_retry
+                logger.warning(
+                    f"Reranker server {self.server_address} failed, using local model: {e}"
+                )
+                if not self._load_local():
+                    raise RuntimeError("Reranker model is not available") from e
+
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((list(pairs), future))
+        return future.result()
+
+    # ========== 점수 캐시 ==========
+
+    def score(
+        self, query: str, documents: List[Dict], max_chars: int = 1000
+    ) -> Optional[List[float]]:
+        """
+        문서별 rerank 점수 (캐시된 점수는 재사용)
+
+        Returns:
+            documents와 같은 순서의 점수 리스트 (모델을 사용할 수 없으면 None)
+        """
+        if not self.load():
+            return None
+
+        query_hash = _hash(query)
+        keys = [
+            (query_hash, str(doc.get("id") or _hash(doc.get("content", "")[:max_chars])))
+            for doc in documents
+        ]
+
+        scores: List[Optional[float]] = [None] * len(documents)
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                if key in self._scores:
+                    self._scores.move_to_end(key)
+                    scores[i] = self._scores[key]
+
+        missing = [i for i, s in enumerate(scores) if s is None]
+        if missing:
+            computed = self.predict(
+                [(query, documents[i].get("content", "")[:max_chars]) for i in missing]
+            )
+            with self._cache_lock:
+                for i, value in zip(missing, computed):
+                    scores[i] = value
+                    self._scores[keys[i]] = value
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+
+        return scores
+
+    def get_stats(self) -> Dict:
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "loaded": self.is_loaded,
+            "server": self.server_address if self._remote_ok else None,
+            "cached_scores": len(self._scores),
+            "pending_requests": self._queue.qsize(),
+        }
+
+
+# 싱글톤 인스턴스
+_engine = None
+_engine_lock = threading.Lock()
+_warmup_thread = None
+
+
+def get_reranker() -> RerankerEngine:
+    """Get or create the process-wide reranker engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RerankerEngine()
+    return _engine
+
+
+def warm_up_reranker(background: bool = True) -> Optional[threading.Thread]:
+    """
+    Reranker 모델을 미리 로드하고 1회 추론하여 첫 검색의 콜드 스타트 제거
+    (RAGBase 초기화 또는 앱 시작 시 호출, 중복 호출 시 무시)
+    """
+    global _warmup_thread
+
+    def _warm_up():
+        engine = get_reranker()
+        try:
+            if engine.load():
+                engine.predict([("warm up", "warm up")])
+                logger.info("Reranker warm-up completed")
+        except Exception as e:
+            logger.warning(f"Reranker warm-up failed: {e}")
+
+    if not background:
+        _warm_up()
+        return None
+
+    with _engine_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=_warm_up, name="reranker-warmup", daemon=True
+            )
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+# ========== 공유 Rerank 서버 ==========
+
+
+def serve(address: str = "127.0.0.1:6010"):
+    """
+    로컬 소켓 rerank 서버 실행 (모든 Streamlit 워커가 하나의 모델을 공유)
+    각 연결은 스레드에서 처리되며, 요청은 엔진의 마이크로 배처로 합쳐집니다.
+    """
+    authkey = _authkey(create=True)  # 기본 키로는 시작하지 않음
+    engine = RerankerEngine(server_address="")
+    if not engine.load():
+        raise RuntimeError("Reranker model could not be loaded")
+    engine.predict([("warm up", "warm up")])
+
+    def _handle(conn):
+        with conn:
+            while True:
+                try:
+                    pairs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(engine.predict(pairs))
+                except Exception as e:
+                    conn.send(RuntimeError(str(e)))
+
+    with Listener(_parse_address(address), authkey=authkey) as listener:
+        logger.info(f"Reranker server listening on {address} ({engine.backend})")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                logger.warning(f"Reranker server accept failed: {e}")
+                continue
+            threading.Thread(target=_handle, args=(conn,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve(sys.argv[2] if len(sys.argv) > 2 else "127.0.0.1:6010")
+    else:
+        print("usage: python src/rag/reranker.py --serve [host:port]")
@@ -0,0 +1,124 @@
+"""
+Retrieval Utils - DataRetriever / AsyncDataRetriever / GraphRAG 공용 조회 도우미
+
+- Deadline: 요청 단위 마감 시간과 소스별 수집 상태 (부분 결과 반환용)
+  소스별 마감 시간은 DATA_RETRIEVER_SOURCE_TIMEOUTS ("rag=20,finnhub.news=3")로 조정하고,
+  reranker 모델 로드 전(콜드 스타트)에는 rag에 DATA_RETRIEVER_WARMUP_TIMEOUT(기본 60초) 적용
+- pg_quote / pg_in_list: PostgREST or/in 필터 값 따옴표 처리
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Iterable, Optional
+
+try:
+    from rag.reranker import get_reranker
+except ImportError:
+    from src.rag.reranker import get_reranker
+
+logger = logging.getLogger(__name__)
+
+
+def pg_quote(value: str) -> str:
+    """PostgREST or/in 필터 값 (BRK.B처럼 '.'이 포함된 티커를 위해 따옴표 처리)"""
+    return '"{}"'.format(str(value).replace('"', ""))
+
+
+def pg_in_list(values: Iterable[str]) -> str:
+    """PostgREST in.() 필터용 값 목록"""
+    return ",".join(pg_quote(value) for value in values)
+
+
+def source_timeouts_from_env() -> Dict[str, float]:
+    """DATA_RETRIEVER_SOURCE_TIMEOUTS ("rag=20,finnhub.news=3") 파싱 {소스: 초}"""
+    timeouts = {}
+    for item in os.getenv("DATA_RETRIEVER_SOURCE_TIMEOUTS", "").split(","):
+        source, _, value = item.partition("=")
+        if not source.strip():
+            continue
+        try:
+            timeouts[source.strip()] = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid DATA_RETRIEVER_SOURCE_TIMEOUTS entry: {item}")
+    return timeouts
+
+
+def request_source_timeouts(
+    source_timeouts: Dict[str, float], warmup_timeout: Optional[float]
+) -> Dict[str, float]:
+    """
+    요청별 소스 마감 시간
+    reranker가 아직 로드되지 않았으면 모델 로드가 rag 검색에 포함되므로 rag에 warmup_timeout 적용
+    """
+    if warmup_timeout and get_reranker().is_cold:
+        return {**source_timeouts, "rag": max(source_timeouts.get("rag", 0.0), warmup_timeout)}
+    return source_timeouts
+
+
+class Deadline:
+    """요청 단위 마감 시간과 소스별 수집 상태 (ok / timeout / error, error는 예외도 보관)"""
+
+    def __init__(
+        self,
+        timeout: Optional[float],
+        expires: Optional[float] = None,
+        source_timeouts: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            timeout: 요청 전체 마감 시간(초)
+            expires: 마감 시각 (_clock 기준, 지정 시 timeout 무시)
+            source_timeouts: 소스별 마감 시간(초, 요청 시작 기준) - 전체 마감보다 길거나 짧게 지정
+        """
+        self.started = self._clock()
+        if expires is None and timeout:
+            expires = self.started + timeout
+        self.expires = expires
+        self.source_timeouts = dict(source_timeouts or {})
+        self.status: Dict[str, str] = {}
+        self.errors: Dict[str, Exception] = {}
+
+    def _clock(self) -> float:
+        return time.monotonic()
+
+    def remaining(self, source: str) -> Optional[float]:
+        """source의 남은 시간 (마감 없으면 None)"""
+        expires = self.expires
+        if source in self.source_timeouts:
+            expires = self.started + self.source_timeouts[source]
+        if expires is None:
+            return None
+        return max(0.0, expires - self._clock())
+
+    def child(self) -> "Deadline":
+        """같은 마감 시간을 공유하고 현재 상태를 이어받는 하위 예산 (티커별 상태용)"""
+        deadline = type(self)(None, self.expires, self.source_timeouts)
+        deadline.started = self.started
+        deadline.status = dict(self.status)
+        deadline.errors = dict(self.errors)
+        return deadline
+
+    def _record(self, source: str, state: str):
+        # 같은 소스를 여러 번 기다리면 가장 나쁜 상태 유지
+        if self.status.get(source, "ok") == "ok":
+            self.status[source] = state
+
+    def wait(self, future: Future, source: str, default=None):
+        """남은 시간 안에 결과를 기다리고, 초과/실패 시 default 반환"""
+        try:
+            value = future.result(timeout=self.remaining(source))
+        except FutureTimeoutError:
+            future.cancel()  # 아직 시작되지 않은 작업은 실행하지 않음
+            self._record(source, "timeout")
+            logger.warning(f"DataRetriever source timed out: {source}")
+            return default
+        except Exception as e:
+            self._record(source, "error")
+            self.errors.setdefault(source, e)
+            logger.error(f"DataRetriever source failed: {source}: {e}")
+            return default
+        self._record(source, "ok")
+        return value if value is not None else default
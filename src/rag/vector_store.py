@@ -11,13 +11,25 @@ from openai import OpenAI
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+try:
+    from rag.local_index import LocalVectorIndex, matches_filter
+    from rag.embedding_cache import get_embedding_cache
+    from rag.bm25_index import BM25Index
+    from rag.reranker import RerankerEngine, get_reranker
+    from rag.document_ids import content_hash, document_id, document_key
+    from rag.postgrest_errors import MISSING_FUNCTION, OptionalFeature
+except ImportError:
+    from src.rag.local_index import LocalVectorIndex, matches_filter
+    from src.rag.embedding_cache import get_embedding_cache
+    from src.rag.bm25_index import BM25Index
+    from src.rag.reranker import RerankerEngine, get_reranker
+    from src.rag.document_ids import content_hash, document_id, document_key
+    from src.rag.postgrest_errors import MISSING_FUNCTION, OptionalFeature
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# CrossEncoder 모델 (Lazy Loading)
-_reranker = None
-
 
 class VectorStore:
     """Manages vector embeddings for financial documents using Supabase pgvector"""
@@ -27,6 +39,7 @@ class VectorStore:
         table_name: str = "documents",
         embedding_model: str = "text-embedding-3-small",
         dimension: int = 1536,
+        use_local_index: Optional[bool] = None,
     ):
         """
         Initialize vector store with Supabase
@@ -35,6 +48,8 @@ class VectorStore:
             table_name: Name of the table in Supabase
             embedding_model: Model for generating embeddings
             dimension: Embedding dimension (1536 for text-embedding-3-small)
+            use_local_index: 로컬 인덱스 검색 사용 여부
+                (None이면 USE_LOCAL_VECTOR_INDEX 환경 변수를 따름)
         """
         self.table_name = table_name
         self.embedding_model = embedding_model
@@ -57,14 +72,41 @@ class VectorStore:
 
         self.openai_client = OpenAI(api_key=self.openai_api_key)
 
+        # add_documents(dedup=True)에서 확인된 임베딩 완료 (ticker, section, 해시) (프로세스 내 manifest)
+        self._known_hashes: set = set()
+
+        # match_documents_filtered RPC 미배포 시 클라이언트 필터링 (일시 오류는 cooldown 후 재시도)
+        self._filtered_rpc = OptionalFeature("match_documents_filtered", MISSING_FUNCTION)
+
+        # Local in-process index (pgvector RPC 왕복 대체)
+        if use_local_index is None:
+            use_local_index = (
+                os.getenv("USE_LOCAL_VECTOR_INDEX", "false").lower() == "true"
+            )
+        self.local_index: Optional[LocalVectorIndex] = None
+        if use_local_index:
+            self.local_index = LocalVectorIndex(
+                supabase=self.supabase, table_name=table_name, dimension=dimension
+            )
+            # 백그라운드 로드 시작 (준비될 때까지 similarity_search는 RPC 사용)
+            self.local_index.ensure_loaded()
+
+        # Local BM25 keyword index (scripts/build_search_indexes.py로 빌드된 경우 사용)
+        self.keyword_index = BM25Index(table_name=table_name)
+        self.keyword_index.ensure_loaded()
+
         logger.info(f"Initialized Supabase vector store with table: {table_name}")
 
     def _get_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a single text"""
-        response = self.openai_client.embeddings.create(
-            model=self.embedding_model, input=text
-        )
-        return response.data[0].embedding
+        """Generate embedding for a single text (cached by model + normalized text)"""
+
+        def _create() -> List[float]:
+            response = self.openai_client.embeddings.create(
+                model=self.embedding_model, input=text
+            )
+            return response.data[0].embedding
+
+        return get_embedding_cache().get_or_create(self.embedding_model, text, _create)
 
     def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for multiple texts"""
@@ -73,17 +115,63 @@ class VectorStore:
         )
         return [item.embedding for item in response.data]
 
-    def add_documents(self, documents: List[Dict], batch_size: int = 100) -> int:
+    def _filter_new_documents(self, documents: List[Dict]) -> List[Dict]:
+        """
+        (ticker, section, 콘텐츠 해시) 기준으로 이미 임베딩된 청크 제외
+        (프로세스 내 manifest -> documents 테이블 metadata.content_hash 순으로 확인)
+        """
+        unique: Dict[tuple, Dict] = {}
+        for doc in documents:
+            key = document_key(doc.get("metadata"), content_hash(doc.get("text", "")))
+            unique.setdefault(key, doc)
+
+        unknown = sorted({key[2] for key in unique if key not in self._known_hashes})
+        for i in range(0, len(unknown), 200):
+            chunk = unknown[i : i + 200]
+            try:
+                response = (
+                    self.supabase.table(self.table_name)
+                    .select(
+                        "ticker:metadata->>ticker,section:metadata->>section,"
+                        "content_hash:metadata->>content_hash"
+                    )
+                    .in_("metadata->>content_hash", chunk)
+                    .execute()
+                )
+                self._known_hashes.update(
+                    document_key(row, row["content_hash"])
+                    for row in response.data or []
+                    if row.get("content_hash")
+                )
+            except Exception as e:
+                logger.warning(f"Content hash lookup failed, embedding batch anyway: {e}")
+
+        new_docs = [doc for key, doc in unique.items() if key not in self._known_hashes]
+        logger.info(
+            f"Dedup: {len(documents)} docs -> {len(new_docs)} new/changed "
+            f"({len(documents) - len(new_docs)} skipped)"
+        )
+        return new_docs
+
+    def add_documents(
+        self, documents: List[Dict], batch_size: int = 100, dedup: bool = False
+    ) -> int:
         """
         Add documents to the vector store
 
         Args:
             documents: List of document dictionaries with 'id', 'text', and 'metadata'
             batch_size: Number of documents to process at once
+            dedup: 콘텐츠 주소 모드 - 텍스트 해시를 metadata.content_hash에 저장하고,
+                이미 임베딩된 청크는 건너뛰며 새로운/변경된 청크만 임베딩 후 upsert
+                (ID/해시 규칙은 rag.document_ids - 임베딩 스크립트와 동일)
 
         Returns:
             Number of documents added
         """
+        if dedup:
+            documents = self._filter_new_documents(documents)
+
         total_added = 0
 
         for i in range(0, len(documents), batch_size):
@@ -97,6 +185,7 @@ class VectorStore:
 
                 # Prepare records for Supabase
                 records = []
+                hashes = []
                 for j, doc in enumerate(batch):
                     record = {
                         "content": doc.get("text", ""),
@@ -105,10 +194,23 @@ class VectorStore:
                     }
                     if "id" in doc:
                         record["id"] = doc["id"]
+                    if dedup:
+                        h = content_hash(texts[j])
+                        metadata = record["metadata"]
+                        hashes.append(document_key(metadata, h))
+                        record["metadata"] = {**metadata, "content_hash": h}
+                        # ID가 없으면 (ticker, section, 해시) 기반 결정적 ID (재실행 시 같은 행으로 upsert)
+                        record.setdefault(
+                            "id", document_id(metadata.get("ticker"), metadata.get("section"), h)
+                        )
                     records.append(record)
 
                 # Insert to Supabase
-                self.supabase.table(self.table_name).insert(records).execute()
+                if dedup:
+                    self.supabase.table(self.table_name).upsert(records).execute()
+                    self._known_hashes.update(hashes)
+                else:
+                    self.supabase.table(self.table_name).insert(records).execute()
 
                 total_added += len(batch)
                 logger.info(f"Added batch {i // batch_size + 1}, total: {total_added}")
@@ -119,6 +221,43 @@ class VectorStore:
         logger.info(f"Total documents added: {total_added}")
         return total_added
 
+    def _match_documents(
+        self, query_embedding: List[float], k: int, filter_dict: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        match_documents RPC 호출 (threshold 0.3 -> 결과 없으면 threshold 제거)
+        filter_dict가 있으면 metadata 필터를 DB에서 적용하는 match_documents_filtered 사용
+        """
+        rpc_name = "match_documents_filtered" if filter_dict else "match_documents"
+        params = {"query_embedding": query_embedding, "match_count": k}
+        if filter_dict:
+            params["filter"] = filter_dict
+
+        # Call the match_documents function in Supabase
+        # Note: Adding match_threshold to disambiguate function overload
+        response = self.supabase.rpc(
+            rpc_name,
+            {**params, "match_threshold": 0.3},  # Threshold 조정 (사용자 요청: 0.3)
+        ).execute()
+
+        # 디버깅: 응답 데이터 로깅
+        if not response.data:
+            logger.warning(
+                f"No results from {rpc_name} with threshold 0.3. Retrying without threshold."
+            )
+            # Fallback: Threshold 없이 상위 k개 강제 검색
+            response = self.supabase.rpc(
+                rpc_name,
+                {**params, "match_threshold": 0.0},  # Threshold 제거 (Fallback)
+            ).execute()
+
+        if not response.data:
+            logger.warning(
+                f"Still no results from {rpc_name} (Fallback). Response: {response}"
+            )
+
+        return response.data or []
+
     def similarity_search(
         self, query: str, k: int = 5, filter_dict: Optional[Dict] = None
     ) -> List[Dict]:
@@ -128,7 +267,7 @@ class VectorStore:
         Args:
             query: Search query
             k: Number of results to return
-            filter_dict: Optional metadata filters
+            filter_dict: Optional metadata filters (예: {"ticker": "AAPL", "section": "mda"})
 
         Returns:
             List of similar documents with scores
@@ -137,40 +276,41 @@ class VectorStore:
             # Generate query embedding
             query_embedding = self._get_embedding(query)
 
-            # Call the match_documents function in Supabase
-            # Note: Adding match_threshold to disambiguate function overload
-            response = self.supabase.rpc(
-                "match_documents",
-                {
-                    "query_embedding": query_embedding,
-                    "match_count": k,
-                    "match_threshold": 0.3,  # Threshold 조정 (사용자 요청: 0.3)
-                },
-            ).execute()
-
-            # 디버깅: 응답 데이터 로깅
-            if not response.data:
-                logger.warning(
-                    f"No results from match_documents with threshold 0.3. Retrying without threshold."
-                )
-                # Fallback: Threshold 없이 상위 k개 강제 검색
-                response = self.supabase.rpc(
-                    "match_documents",
-                    {
-                        "query_embedding": query_embedding,
-                        "match_count": k,
-                        "match_threshold": 0.0,  # Threshold 제거 (Fallback)
-                    },
-                ).execute()
-
-            if not response.data:
-                logger.warning(
-                    f"Still no results from match_documents (Fallback). Response: {response}"
-                )
+            # Local index: _match_documents와 같은 threshold 0.3 -> fallback을 한 번의 top-k 계산으로 처리
+            if self.local_index is not None:
+                try:
+                    if self.local_index.ensure_loaded():
+                        return self.local_index.search(
+                            query_embedding,
+                            k=k,
+                            threshold=0.3,
+                            filter_dict=filter_dict,
+                            fallback_top_k=True,
+                        )
+                except Exception as e:
+                    logger.warning(f"Local index search failed, using RPC: {e}")
+
+            rows = None
+            if filter_dict and self._filtered_rpc.available:
+                try:
+                    rows = self._match_documents(query_embedding, k, filter_dict)
+                except Exception as e:
+                    # RPC 미배포/일시 오류: 전역 검색 후 클라이언트 필터링으로 대체
+                    self._filtered_rpc.failed(e)
+
+            if rows is None:
+                fetch_k = max(k, 100) if filter_dict else k
+                rows = self._match_documents(query_embedding, fetch_k)
+                if filter_dict:
+                    rows = [
+                        item
+                        for item in rows
+                        if matches_filter(item.get("metadata"), filter_dict)
+                    ][:k]
 
             # Format results
             documents = []
-            for item in response.data:
+            for item in rows:
                 documents.append(
                     {
                         "id": item.get("id"),
@@ -189,21 +329,10 @@ class VectorStore:
             traceback.print_exc()
             return []
 
-    def _load_reranker(self):
-        """CrossEncoder 모델 로드 (Lazy Loading)"""
-        global _reranker
-        if _reranker is None:
-            try:
-                from sentence_transformers import CrossEncoder
-
-                _reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
-                logger.info("CrossEncoder reranker loaded successfully")
-            except ImportError:
-                logger.warning(
-                    "sentence-transformers not installed. Reranking will be disabled."
-                )
-                return None
-        return _reranker
+    def _load_reranker(self) -> Optional[RerankerEngine]:
+        """CrossEncoder 재정렬 엔진 로드 (Lazy Loading, 프로세스 공유)"""
+        reranker = get_reranker()
+        return reranker if reranker.load() else None
 
     def rerank_results(
         self, query: str, documents: List[Dict], top_k: int = 5
@@ -228,8 +357,8 @@ class VectorStore:
 
         try:
             # CrossEncoder는 (query, document) 쌍의 점수를 계산
-            pairs = [(query, doc.get("content", "")[:1000]) for doc in documents]
-            scores = reranker.predict(pairs)
+            # (동시 요청과 배치 처리, 이미 계산된 (query, chunk) 점수는 캐시 재사용)
+            scores = reranker.score(query, documents, max_chars=1000)
 
             # 점수와 문서를 함께 정렬
             scored_docs = list(zip(documents, scores))
@@ -281,7 +410,14 @@ class VectorStore:
 
         return reranked_results
 
-    def search_by_company(self, query: str, company: str, k: int = 5) -> List[Dict]:
+    def search_by_company(
+        self,
+        query: str,
+        company: str,
+        k: int = 5,
+        section: Optional[str] = None,
+        initial_k: int = 20,
+    ) -> List[Dict]:
         """
         Search for documents related to a specific company
 
@@ -289,26 +425,25 @@ class VectorStore:
             query: Search query
             company: Company ticker or name
             k: Number of results
+            section: 10-K 섹션 필터 (business, risk_factors, mda)
+            initial_k: Reranking 전 후보 수
 
         Returns:
             List of relevant documents
         """
-        # [Optimization] 1. Retrieve a larger pool of documents (k=100) to ensure company-specific docs are included
-        # This drastically improves Recall for specific company queries
-        results = self.similarity_search(query, k=100)
+        # [Optimization] 1. ticker/section 필터를 검색 단계에 적용하여 해당 기업 청크만 스캔
+        # (전역 top 100 후 필터링 시 소형 기업은 결과가 비는 문제 해결)
+        filter_dict = {"ticker": company}
+        if section:
+            filter_dict["section"] = section
 
-        # 2. Filter by company ticker in metadata
-        filtered = [
-            doc for doc in results if doc.get("metadata", {}).get("ticker") == company
-        ]
+        filtered = self.similarity_search(query, k=initial_k, filter_dict=filter_dict)
 
         if not filtered:
-            logger.warning(
-                f"No documents found for company {company} in top 100 results."
-            )
+            logger.warning(f"No documents found for company {company}.")
             return []
 
-        # 3. Rerank the filtered results using CrossEncoder
+        # 2. Rerank the filtered results using CrossEncoder
         # This improves Precision by re-scoring the candidates
         reranked = self.rerank_results(query, filtered, k)
 
@@ -338,22 +473,23 @@ class VectorStore:
             vector_results = self.similarity_search(query, k * 2)
             vector_ids = {doc["id"]: (i, doc) for i, doc in enumerate(vector_results)}
 
-            # 2. Keyword Search (Supabase Full-Text Search)
-            # PostgreSQL의 to_tsquery를 사용하여 키워드 검색
-            keywords = " | ".join(query.split()[:5])  # 상위 5개 키워드만 사용
-
+            # 2. Keyword Search
+            # 로컬 BM25 인덱스가 빌드되어 있으면 전체 질의 토큰으로 점수화,
+            # 없으면 Supabase ILIKE 패턴 매칭으로 대체
+            keyword_results = []
             try:
-                # Supabase Full-Text Search 대신 ILIKE 패턴 매칭 사용
-                # (더 호환성이 좋음)
-                search_pattern = f"%{query.split()[0]}%"  # 첫 번째 키워드로 검색
-                keyword_response = (
-                    self.supabase.table(self.table_name)
-                    .select("id, content, metadata")
-                    .ilike("content", search_pattern)
-                    .limit(k * 2)
-                    .execute()
-                )
-                keyword_results = keyword_response.data or []
+                if self.keyword_index.ensure_loaded():
+                    keyword_results = self.keyword_index.search(query, k * 2)
+                elif query.split():
+                    search_pattern = f"%{query.split()[0]}%"  # 첫 번째 키워드로 검색
+                    keyword_response = (
+                        self.supabase.table(self.table_name)
+                        .select("id, content, metadata")
+                        .ilike("content", search_pattern)
+                        .limit(k * 2)
+                        .execute()
+                    )
+                    keyword_results = keyword_response.data or []
             except Exception as e:
                 logger.warning(f"Keyword search failed, using vector only: {e}")
                 keyword_results = []
@@ -0,0 +1,188 @@
+"""
+Circuit Breaker - 외부 데이터 제공자(Finnhub 엔드포인트, yfinance) 장애 차단
+장애 중인 제공자를 매 호출마다 타임아웃까지 기다리지 않고 즉시 건너뜁니다.
+
+- closed: 정상 호출. window초 안에 failure_threshold번 실패하면 open
+- open: 호출 즉시 거절, 백그라운드 스레드가 recovery_timeout 후 probe 실행
+  (실패하면 대기 시간을 두 배로 늘려 max_recovery_timeout까지 재시도)
+- half_open: probe가 없으면 recovery_timeout 후 실제 호출 1건만 시험 통과
+  (성공하면 closed, 실패하면 대기 시간을 두 배로 늘려 다시 open)
+- probe/시험 호출 성공 시 closed로 복구
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """제공자(또는 엔드포인트) 하나의 건강 상태 (상태/통계는 _lock으로 보호)"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        window: float = 60.0,
+        recovery_timeout: float = 30.0,
+        max_recovery_timeout: float = 300.0,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+
+        self.state = CLOSED
+        self._failures = []  # window 내 실패 시각
+        self._opened_at: Optional[float] = None
+        self._recovery = recovery_timeout  # 현재 open 대기 시간 (시험 호출 실패 시 증가)
+        self._trial_started: Optional[float] = None  # half_open 시험 호출 시작 시각
+        self._probe: Optional[Callable[[], bool]] = None
+        self._probing = False
+        self._lock = threading.Lock()
+        self.stats = {"rejected": 0, "opened": 0, "probes": 0, "trials": 0, "last_error": None}
+
+    def allow(self) -> bool:
+        """호출 허용 여부 (open이면 즉시 False, half_open이면 시험 호출 1건만 True)"""
+        if self.state == CLOSED:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and not self._probing and now - self._opened_at >= self._recovery:
+                self.state = HALF_OPEN
+                self._trial_started = now
+                self.stats["trials"] += 1
+                return True
+            # 시험 호출이 결과를 기록하지 못한 채 끝났으면 다음 호출로 다시 시험
+            if self.state == HALF_OPEN and now - self._trial_started >= self._recovery:
+                self._trial_started = now
+                self.stats["trials"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        if self.state == CLOSED and not self._failures:
+            return
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._close()
+                logger.info(f"Circuit closed: {self.name} (trial call succeeded)")
+            elif self.state == CLOSED:
+                self._failures.clear()
+
+    def record_failure(self, error: str = "", probe: Optional[Callable[[], bool]] = None):
+        """
+        실패 기록 (임계치를 넘으면 open 후 백그라운드 probe 시작)
+
+        Args:
+            probe: 복구 확인 함수 (True면 정상). 가장 최근 실패 호출 기준으로 갱신
+        """
+        with self._lock:
+            now = time.monotonic()
+            if probe is not None:
+                self._probe = probe
+            self.stats["last_error"] = error or None
+            if self.state == HALF_OPEN:
+                # 시험 호출 실패: 대기 시간을 늘려 다시 open
+                self._recovery = min(self._recovery * 2, self.max_recovery_timeout)
+            else:
+                self._failures = [t for t in self._failures if now - t < self.window]
+                self._failures.append(now)
+                if self.state == OPEN or len(self._failures) < self.failure_threshold:
+                    return
+                self._recovery = self.recovery_timeout
+                self.stats["opened"] += 1
+            self.state = OPEN
+            self._opened_at = now
+            self._trial_started = None
+            start_probe = not self._probing and self._probe is not None
+            self._probing = self._probing or start_probe
+
+        logger.warning(f"Circuit opened: {self.name} ({error})")
+        if start_probe:
+            threading.Thread(
+                target=self._probe_loop, name=f"probe-{self.name}", daemon=True
+            ).start()
+
+    def _close(self):
+        """closed로 복구 (_lock 보유 상태에서 호출)"""
+        self.state = CLOSED
+        self._failures.clear()
+        self._opened_at = None
+        self._trial_started = None
+        self._recovery = self.recovery_timeout
+
+    def _probe_loop(self):
+        """open 동안 backoff 간격으로 probe 실행, 성공하면 closed로 복구"""
+        delay = self.recovery_timeout
+        while True:
+            time.sleep(delay)
+            try:
+                healthy = bool(self._probe())
+                error = None
+            except Exception as e:
+                healthy = False
+                error = str(e)
+            with self._lock:
+                self.stats["probes"] += 1
+                if error:
+                    self.stats["last_error"] = error
+                if healthy:
+                    self._close()
+                    self._probing = False
+            if healthy:
+                logger.info(f"Circuit closed: {self.name} (probe succeeded)")
+                return
+            delay = min(delay * 2, self.max_recovery_timeout)
+
+    def get_health(self) -> Dict:
+        with self._lock:
+            opened_for = (
+                round(time.monotonic() - self._opened_at, 1) if self._opened_at else 0.0
+            )
+            return {
+                "state": self.state,
+                "recent_failures": len(self._failures),
+                "opened_for": opened_for,
+                **self.stats,
+            }
+
+
+# 이름별 프로세스 공용 레지스트리
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get or create the process-wide circuit breaker for a provider/endpoint"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(
+                    name,
+                    failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+                    window=float(os.getenv("CIRCUIT_WINDOW_SECONDS", "60")),
+                    recovery_timeout=float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30")),
+                    max_recovery_timeout=float(
+                        os.getenv("CIRCUIT_MAX_RECOVERY_SECONDS", "300")
+                    ),
+                )
+    return breaker
+
+
+def get_health() -> Dict[str, Dict]:
+    """모든 차단기의 상태 (모니터링용)"""
+    return {name: breaker.get_health() for name, breaker in sorted(_breakers.items())}
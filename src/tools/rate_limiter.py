@@ -0,0 +1,173 @@
+"""
+Rate Limiter - Finnhub 호출 예산 관리 (토큰 버킷 + 우선순위 레인)
+무료 플랜 한도(분당 60회)를 넘기 전에 클라이언트에서 호출 속도를 조절합니다.
+
+- 토큰 버킷: FINNHUB_RATE_LIMIT(분당 호출 수)로 충전, FINNHUB_BURST까지 순간 허용
+- interactive 레인: 대기 중이면 batch보다 항상 먼저 토큰을 받음
+- batch 레인: 버킷에 예비분(FINNHUB_BATCH_RESERVE)을 남겨 두고만 사용
+  (백그라운드 작업이 돌아도 채팅/화면 요청의 지연이 예측 가능하도록)
+- 429 응답의 Retry-After 동안 모든 레인 호출 보류
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+LANES = ("interactive", "batch")
+
+
+class TokenBucketLimiter:
+    """프로세스 공용 토큰 버킷 (레인별 우선순위와 통계)"""
+
+    def __init__(
+        self,
+        calls_per_minute: float = 60,
+        burst: int = 30,
+        batch_reserve: float = 0.5,
+    ):
+        """
+        Args:
+            calls_per_minute: 평균 허용 호출 수 (분당)
+            burst: 버킷 용량 (순간 최대 호출 수)
+            batch_reserve: batch 레인이 남겨 둘 버킷 비율 (interactive 전용분)
+        """
+        self.rate = calls_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.batch_floor = self.capacity * min(max(batch_reserve, 0.0), 1.0)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+        self._waiting = {lane: 0 for lane in LANES}
+        self._stats = {
+            lane: {"acquired": 0, "rejected": 0, "wait_seconds": 0.0, "max_wait": 0.0}
+            for lane in LANES
+        }
+        self.throttled = 0  # 429 응답 수
+
+    def _refill(self, now: float):
+        if now <= self._updated:  # Retry-After 보류 중
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, lane: str = "interactive", timeout: Optional[float] = None) -> bool:
+        """
+        토큰 1개 획득 (필요하면 대기)
+
+        Returns:
+            timeout 안에 획득하면 True, 아니면 False
+        """
+        lane = lane if lane in LANES else "interactive"
+        floor = self.batch_floor if lane == "batch" else 0.0
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+
+        with self._cond:
+            self._waiting[lane] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self._blocked_until:
+                        wait = self._blocked_until - now
+                    elif lane == "batch" and self._waiting["interactive"]:
+                        wait = 1.0 / self.rate  # interactive 대기열 우선
+                    elif self.tokens - 1.0 >= floor:
+                        self.tokens -= 1.0
+                        self._record(lane, now - start)
+                        return True
+                    else:
+                        wait = (floor + 1.0 - self.tokens) / self.rate
+
+                    if deadline is not None:
+                        if now >= deadline:
+                            self._stats[lane]["rejected"] += 1
+                            return False
+                        wait = min(wait, deadline - now)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+
+    def try_acquire(self, lane: str = "interactive") -> float:
+        """
+        대기 없이 토큰 획득 시도 (asyncio 호출자용 - 이벤트 루프를 막지 않음)
+
+        Returns:
+            획득하면 0, 아니면 다시 시도할 때까지의 예상 대기 시간(초)
+        """
+        lane = lane if lane in LANES else "interactive"
+        floor = self.batch_floor if lane == "batch" else 0.0
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if lane == "batch" and self._waiting["interactive"]:
+                return 1.0 / self.rate
+            if self.tokens - 1.0 >= floor:
+                self.tokens -= 1.0
+                self._record(lane, 0.0)
+                return 0.0
+            return (floor + 1.0 - self.tokens) / self.rate
+
+    def _record(self, lane: str, waited: float):
+        stats = self._stats[lane]
+        stats["acquired"] += 1
+        stats["wait_seconds"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+
+    def penalize(self, retry_after: float):
+        """429 응답 처리: retry_after 초 동안 모든 호출 보류 후 빈 버킷에서 재시작"""
+        with self._cond:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + max(retry_after, 0.0))
+            self.tokens = 0.0
+            self._updated = max(now, self._blocked_until)
+            self.throttled += 1
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        """모니터링용 통계 (레인별 획득/거절 수, 평균/최대 대기 시간)"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            lanes = {}
+            for lane, stats in self._stats.items():
+                acquired = stats["acquired"]
+                lanes[lane] = {
+                    "acquired": acquired,
+                    "rejected": stats["rejected"],
+                    "waiting": self._waiting[lane],
+                    "avg_wait": round(stats["wait_seconds"] / acquired, 4) if acquired else 0.0,
+                    "max_wait": round(stats["max_wait"], 4),
+                }
+            return {
+                "calls_per_minute": round(self.rate * 60, 2),
+                "capacity": self.capacity,
+                "tokens": round(max(self.tokens, 0.0), 2),
+                "blocked_for": round(max(0.0, self._blocked_until - now), 2),
+                "throttled": self.throttled,
+                "lanes": lanes,
+            }
+
+
+# 싱글톤 인스턴스 (모든 StockAPIClient가 하나의 호출 예산 공유)
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucketLimiter:
+    """Get or create the process-wide Finnhub rate limiter"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = TokenBucketLimiter(
+                    calls_per_minute=float(os.getenv("FINNHUB_RATE_LIMIT", "60")),
+                    burst=int(os.getenv("FINNHUB_BURST", "30")),
+                    batch_reserve=float(os.getenv("FINNHUB_BATCH_RESERVE", "0.5")),
+                )
+    return _limiter
@@ -1,19 +1,235 @@
 """
 Stock API Client - 실시간 주가, 뉴스, SEC 공시 데이터
-Finnhub API + yfinance fallback 지원
+Finnhub API + yfinance fallback 지원 (실적 캘린더는 FMP)
+
+프로세스 내 모든 호출자가 공유하는 단일 클라이언트입니다.
+(src/data/stock_api_client.py는 이 모듈을 재노출)
+- HTTP 연결 풀(keep-alive) / 응답 캐시 / 토큰 버킷 / 차단기를 프로세스 공용으로 사용
 """
 
 import os
 import logging
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+try:
+    from tools.circuit_breaker import get_breaker, get_health
+    from tools.rate_limiter import get_rate_limiter
+except ImportError:
+    from src.tools.circuit_breaker import get_breaker, get_health
+    from src.tools.rate_limiter import get_rate_limiter
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# 엔드포인트별 응답 캐시 TTL(초) - 목록에 없는 엔드포인트는 캐시하지 않음
+ENDPOINT_TTLS = {
+    "quote": 15,
+    "stock/candle": 60,
+    "company-news": 300,
+    "news": 300,
+    "stock/metric": 3600,
+    "stock/recommendation": 3600,
+    "stock/price-target": 3600,
+    "stock/earnings": 3600,
+    "stock/filings": 3600,
+    "stock/profile2": 86400,
+    "stock/peers": 86400,
+}
+
+# get_quotes 결과 컬럼 (Finnhub quote 필드 + 출처/오류)
+QUOTE_COLUMNS = ["c", "d", "dp", "h", "l", "o", "pc", "t", "source", "error"]
+
+# 429 응답 재시도 횟수 / Retry-After 헤더가 없을 때 기본 보류 시간(초)
+RATE_LIMIT_RETRIES = 2
+DEFAULT_RETRY_AFTER = 1.0
+
+
+def _probe_yfinance() -> bool:
+    """yfinance 복구 확인 (SPY 최근 일봉 조회)"""
+    import yfinance as yf
+
+    return not yf.Ticker("SPY").history(period="5d").empty
+
+
+def _is_provider_failure(error: Exception) -> bool:
+    """
+    yfinance 예외가 제공자 장애(연결 실패/타임아웃/5xx/429)인지 판단
+    미상장/상장폐지 종목, 데이터 누락, 파싱 오류 등은 차단기에 집계하지 않음
+    """
+    if isinstance(
+        error,
+        (
+            TimeoutError,
+            ConnectionError,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ),
+    ):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status == 429
+    # yfinance 자체 예외 / curl_cffi 전송 오류 (설치 버전에 따라 모듈이 달라 이름으로 판단)
+    name = type(error).__name__
+    return name == "YFRateLimitError" or "Timeout" in name or "ConnectionError" in name
+
+
+def _retry_after(response) -> float:
+    """429 응답의 대기 시간 (Retry-After 초, 없으면 X-Ratelimit-Reset epoch 기준)"""
+    headers = response.headers or {}
+    try:
+        if headers.get("Retry-After"):
+            return float(headers["Retry-After"])
+        if headers.get("X-Ratelimit-Reset"):
+            return max(0.0, float(headers["X-Ratelimit-Reset"]) - time.time())
+    except (TypeError, ValueError):
+        pass
+    return DEFAULT_RETRY_AFTER
+
+
+class ResponseCache:
+    """
+    엔드포인트별 TTL 응답 캐시 (LRU로 항목 수 제한) + single-flight
+    같은 요청이 동시에 들어오면 첫 요청만 HTTP 호출하고 나머지는 그 결과(또는 예외)를 공유합니다.
+    반환값은 캐시와 공유되므로 호출자가 수정하지 않아야 합니다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttls: Optional[Dict[str, float]] = None,
+        wait_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            max_entries: 최대 캐시 항목 수 (초과 시 LRU 제거)
+            ttls: 엔드포인트별 TTL(초) (None이면 ENDPOINT_TTLS)
+            wait_timeout: 진행 중인 같은 요청을 기다리는 최대 시간(초) - 초과 시 직접 호출
+        """
+        self.max_entries = max_entries
+        self.ttls = ENDPOINT_TTLS if ttls is None else ttls
+        self.wait_timeout = wait_timeout
+        self._entries: "OrderedDict[Tuple, Tuple[float, object]]" = OrderedDict()
+        self._inflight: Dict[Tuple, "_InFlight"] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict) -> Tuple:
+        return (endpoint, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+    def get_or_fetch(
+        self,
+        endpoint: str,
+        params: Dict,
+        fetch: Callable[[], object],
+        cacheable: Callable[[object], bool],
+    ):
+        """캐시 조회 -> 진행 중인 같은 요청 대기 -> 직접 호출 순으로 응답 반환"""
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return fetch()
+
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            flight = self._inflight.get(key)
+            if flight is None:
+                flight = self._inflight[key] = _InFlight()
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.coalesced += 1
+
+        if not leader:
+            if not flight.done.wait(self.wait_timeout):
+                return fetch()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fetch()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            # 성공 응답만 캐시 (예외는 대기 중인 호출자에게만 전달)
+            if cacheable(flight.value):
+                with self._lock:
+                    self._entries[key] = (time.monotonic() + ttl, flight.value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return flight.value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def peek(self, endpoint: str, params: Dict):
+        """만료되지 않은 캐시 값 (없으면 None, 대기하지 않음 - asyncio 호출자용)"""
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return None
+
+    def put(self, endpoint: str, params: Dict, value):
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """캐시 적중률 통계"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class _InFlight:
+    """진행 중인 요청 (완료 시 done 이벤트 설정, 실패 시 error에 예외)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
 
 class StockAPIClient:
     """
@@ -27,49 +243,149 @@ class StockAPIClient:
     """
 
     BASE_URL = "https://finnhub.io/api/v1"
+    FMP_BASE_URL = "https://financialmodelingprep.com/api/v3"
 
-    def __init__(self, api_key: str = None):
-        """Initialize Stock API client"""
+    def __init__(self, api_key: str = None, lane: str = "interactive"):
+        """
+        Initialize Stock API client
+
+        Args:
+            lane: 호출 예산 레인 ("interactive": 채팅/화면 요청, "batch": 백그라운드 작업)
+        """
         self.api_key = api_key or os.getenv("FINNHUB_API_KEY")
+        self.fmp_api_key = os.getenv("FMP_API_KEY")
 
         if self.api_key:
             self.api_key = self.api_key.strip()
 
+        if self.fmp_api_key:
+            self.fmp_api_key = self.fmp_api_key.strip()
+
         if not self.api_key or self.api_key == "your_finnhub_api_key_here":
             logger.warning(
                 "FINNHUB_API_KEY not set. Get free key at https://finnhub.io"
             )
             self.api_key = None
 
-        self.session = requests.Session()
+        # 프로세스 공용 연결 풀 / 엔드포인트별 TTL 캐시 (STOCK_API_CACHE_SIZE=0이면 비활성화)
+        self.session = get_http_session()
+        self.cache = get_response_cache()
+        self.timeout = float(os.getenv("STOCK_API_TIMEOUT", "3"))
+
+        # 프로세스 공용 토큰 버킷 (interactive는 FINNHUB_INTERACTIVE_WAIT초까지만 대기)
+        self.limiter = get_rate_limiter()
+        self.lane = lane
+        self.acquire_timeout = (
+            float(os.getenv("FINNHUB_INTERACTIVE_WAIT", "5"))
+            if lane == "interactive"
+            else None
+        )
 
     def _request(self, endpoint: str, params: dict = None) -> Optional[Dict]:
-        """Make API request"""
+        """Make API request (성공 응답은 엔드포인트별 TTL 동안 캐시)"""
         if not self.api_key:
             return {"error": "Finnhub API key not configured"}
 
         params = params or {}
-        params["token"] = self.api_key
+        if self.cache is None:
+            return self._fetch(endpoint, params)
+        return self.cache.get_or_fetch(
+            endpoint,
+            params,
+            lambda: self._fetch(endpoint, params),
+            cacheable=lambda result: not (isinstance(result, dict) and "error" in result),
+        )
 
-        try:
-            response = self.session.get(
-                f"{self.BASE_URL}/{endpoint}", params=params, timeout=3
+    def _fetch(self, endpoint: str, params: dict) -> Optional[Dict]:
+        """Finnhub HTTP 호출 (엔드포인트 차단기가 open이면 호출 없이 즉시 error 반환)"""
+        breaker = get_breaker(f"finnhub:{endpoint}")
+        if not breaker.allow():
+            return {"error": f"Finnhub {endpoint} temporarily unavailable (circuit open)"}
+
+        result, failure = self._send(endpoint, params)
+        if failure:
+            # 복구 확인은 batch 레인으로 같은 요청을 다시 보내 판단
+            breaker.record_failure(
+                failure, probe=lambda: self._send(endpoint, params, lane="batch")[1] is None
             )
-            response.raise_for_status()
-            return response.json()
+        else:
+            breaker.record_success()
+        return result
+
+    def _send(
+        self, endpoint: str, params: dict, lane: Optional[str] = None
+    ) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        토큰 버킷 통과 후 HTTP 호출 (429는 Retry-After 반영 후 재시도)
+
+        Returns:
+            (응답 또는 error dict, 제공자 장애 사유 - 타임아웃/연결 실패/5xx/401/429 지속 시)
+        """
+        lane = lane or self.lane
+        timeout = self.acquire_timeout if lane == self.lane else None
+        params = {**params, "token": self.api_key}
+
+        try:
+            for _ in range(RATE_LIMIT_RETRIES + 1):
+                if not self.limiter.acquire(lane, timeout=timeout):
+                    logger.warning(f"Finnhub rate limit budget exhausted: {endpoint}")
+                    return {"error": "Finnhub rate limit budget exhausted"}, None
+
+                response = self.session.get(
+                    f"{self.BASE_URL}/{endpoint}", params=params, timeout=self.timeout
+                )
+                if response.status_code == 429:
+                    retry_after = _retry_after(response)
+                    logger.warning(
+                        f"Finnhub API 429 Too Many Requests: {endpoint} (retry after {retry_after:.1f}s)"
+                    )
+                    self.limiter.penalize(retry_after)
+                    continue
+
+                response.raise_for_status()
+                return response.json(), None
+            error = "Finnhub rate limit exceeded (429)"
+            return {"error": error}, error
         except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 403:
+            status = e.response.status_code
+            if status == 403:
                 # logger.warning(
                 #     f"Finnhub API 403 Forbidden (Premium endpoint?): {endpoint}"
                 # )
                 return {
                     "error": "Prediction/Premium endpoint not available on this plan"
-                }
+                }, None
             logger.error(f"Finnhub API error: {e}")
-            return {"error": str(e)}
+            # 잘못된 요청(4xx)은 제공자 장애가 아님 (401: 키 만료/소진은 장애로 간주)
+            failure = str(e) if status >= 500 or status == 401 else None
+            return {"error": str(e)}, failure
         except requests.exceptions.RequestException as e:
             logger.error(f"Finnhub API error: {e}")
-            return {"error": str(e)}
+            return {"error": str(e)}, str(e)
+
+    def get_limiter_stats(self) -> Dict:
+        """호출 예산(토큰 버킷)과 응답 캐시 통계 (모니터링용)"""
+        stats = self.limiter.get_stats()
+        stats["cache"] = self.cache.get_stats() if self.cache else None
+        return stats
+
+    def _yfinance_allowed(self) -> bool:
+        return get_breaker("yfinance").allow()
+
+    def _yfinance_succeeded(self):
+        """yfinance가 응답함 (종목 데이터 유무와 무관하게 제공자는 정상)"""
+        get_breaker("yfinance").record_success()
+
+    def _yfinance_failed(self, error: Exception):
+        """제공자 장애로 분류되는 오류만 yfinance 차단기에 기록 (그 외는 제공자가 응답한 것으로 간주)"""
+        if _is_provider_failure(error):
+            get_breaker("yfinance").record_failure(str(error), probe=_probe_yfinance)
+        else:
+            self._yfinance_succeeded()
+
+    def get_health(self) -> Dict[str, Dict]:
+        """제공자/엔드포인트별 차단기 상태 (closed / open)"""
+        return get_health()
 
     # ========== 주가 데이터 ==========
 
@@ -86,12 +402,15 @@ class StockAPIClient:
         if result and result.get("c", 0) > 0:
             return result
 
-        # yfinance fallback
+        # yfinance fallback (yfinance 차단기가 open이면 즉시 실패)
+        if not self._yfinance_allowed():
+            return {"error": "주가 데이터를 가져오지 못했습니다.", "c": 0}
         try:
             import yfinance as yf
 
             ticker = yf.Ticker(symbol.upper())
             info = ticker.info
+            self._yfinance_succeeded()
 
             if not info or "symbol" not in info:
                 return {"error": "주가 데이터를 가져오지 못했습니다.", "c": 0}
@@ -112,8 +431,98 @@ class StockAPIClient:
             }
         except Exception as e:
             logger.error(f"yfinance quote fallback failed: {e}")
+            self._yfinance_failed(e)
             return {"error": "주가 데이터를 가져오지 못했습니다.", "c": 0}
 
+    def get_quotes(self, symbols: List[str]):
+        """
+        여러 종목 주가 일괄 조회 (관심 종목/대시보드/비교 분석용)
+        - Finnhub quote를 공용 실행기에서 동시 호출 (토큰 버킷/캐시 공유)
+        - 실패한 종목만 모아 yf.download 1회로 fallback
+
+        Returns:
+            pandas.DataFrame (index: symbol, columns: QUOTE_COLUMNS)
+        """
+        import pandas as pd
+
+        symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+        results = dict(
+            zip(
+                symbols,
+                get_quote_executor().map(
+                    lambda sym: self._request("quote", {"symbol": sym}), symbols
+                ),
+            )
+        )
+
+        rows = {}
+        missing = []
+        for symbol, result in results.items():
+            if result and result.get("c", 0) > 0:
+                rows[symbol] = {**result, "source": "finnhub"}
+            else:
+                missing.append(symbol)
+
+        if missing:
+            rows.update(self._download_quotes(missing))
+        for symbol in missing:
+            rows.setdefault(symbol, {"c": 0, "error": "주가 데이터를 가져오지 못했습니다."})
+
+        frame = pd.DataFrame.from_dict(rows, orient="index").reindex(
+            index=symbols, columns=QUOTE_COLUMNS
+        )
+        frame.index.name = "symbol"
+        return frame
+
+    def _download_quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        """yf.download 1회로 여러 종목의 최근 일봉을 받아 quote 형식으로 변환"""
+        if not self._yfinance_allowed():
+            return {}
+        try:
+            import pandas as pd
+            import yfinance as yf
+
+            data = yf.download(
+                symbols,
+                period="5d",
+                interval="1d",
+                group_by="ticker",
+                auto_adjust=False,
+                progress=False,
+                threads=True,
+            )
+            self._yfinance_succeeded()
+        except Exception as e:
+            logger.error(f"yfinance batch quote fallback failed: {e}")
+            self._yfinance_failed(e)
+            return {}
+
+        quotes = {}
+        for symbol in symbols:
+            try:
+                history = (
+                    data[symbol] if isinstance(data.columns, pd.MultiIndex) else data
+                ).dropna(subset=["Close"])
+            except KeyError:
+                continue
+            if history.empty:
+                continue
+            last = history.iloc[-1]
+            current = float(last["Close"])
+            prev_close = float(history["Close"].iloc[-2]) if len(history) > 1 else current
+            quotes[symbol] = {
+                "c": current,
+                "d": current - prev_close,
+                "dp": (current - prev_close) / prev_close * 100 if prev_close else 0,
+                "h": float(last["High"]),
+                "l": float(last["Low"]),
+                "o": float(last["Open"]),
+                "pc": prev_close,
+                "t": int(history.index[-1].timestamp()),
+                "source": "yfinance",
+            }
+        return quotes
+
     def get_candles(
         self,
         symbol: str,
@@ -144,7 +553,9 @@ class StockAPIClient:
         if result and result.get("s") == "ok":
             return result
 
-        # yfinance fallback
+        # yfinance fallback (yfinance 차단기가 open이면 즉시 실패)
+        if not self._yfinance_allowed():
+            return {"error": "주가 데이터를 가져오지 못했습니다."}
         try:
             import yfinance as yf
 
@@ -154,6 +565,7 @@ class StockAPIClient:
 
             ticker = yf.Ticker(symbol.upper())
             hist = ticker.history(period=period)
+            self._yfinance_succeeded()
 
             if hist.empty:
                 return {"error": "주가 데이터를 가져오지 못했습니다."}
@@ -170,6 +582,7 @@ class StockAPIClient:
             }
         except Exception as e:
             logger.error(f"yfinance fallback failed: {e}")
+            self._yfinance_failed(e)
             return {"error": "주가 데이터를 가져오지 못했습니다."}
 
     # ========== 기업 정보 ==========
@@ -256,12 +669,15 @@ class StockAPIClient:
         if result and "metric" in result and result["metric"]:
             return result
 
-        # yfinance fallback
+        # yfinance fallback (yfinance 차단기가 open이면 즉시 실패)
+        if not self._yfinance_allowed():
+            return {"error": "재무 지표를 가져오지 못했습니다."}
         try:
             import yfinance as yf
 
             ticker = yf.Ticker(symbol.upper())
             info = ticker.info
+            self._yfinance_succeeded()
 
             if not info or "symbol" not in info:
                 return {"error": "재무 지표를 가져오지 못했습니다."}
@@ -296,6 +712,7 @@ class StockAPIClient:
             }
         except Exception as e:
             logger.error(f"yfinance financials fallback failed: {e}")
+            self._yfinance_failed(e)
             return {"error": "재무 지표를 가져오지 못했습니다."}
 
     def get_financials_reported(self, symbol: str, freq: str = "annual") -> Dict:
@@ -331,12 +748,15 @@ class StockAPIClient:
         if result and "error" not in result:
             return result
 
-        # yfinance fallback
+        # yfinance fallback (yfinance 차단기가 open이면 즉시 실패)
+        if not self._yfinance_allowed():
+            return {"error": "목표주가 데이터를 가져오지 못했습니다."}
         try:
             import yfinance as yf
 
             ticker = yf.Ticker(symbol.upper())
             info = ticker.info
+            self._yfinance_succeeded()
 
             return {
                 "symbol": symbol.upper(),
@@ -349,6 +769,7 @@ class StockAPIClient:
             }
         except Exception as e:
             logger.error(f"yfinance fallback failed: {e}")
+            self._yfinance_failed(e)
             return {"error": "목표주가 데이터를 가져오지 못했습니다."}
 
     def get_earnings_surprises(self, symbol: str) -> List[Dict]:
@@ -356,16 +777,42 @@ class StockAPIClient:
         result = self._request("stock/earnings", {"symbol": symbol.upper()})
         return result if isinstance(result, list) else []
 
-    # ========== 캘린더 (미사용) ==========
+    # ========== 캘린더 (FMP) ==========
 
     def get_earnings_calendar(
         self, from_date: str = None, to_date: str = None
     ) -> List[Dict]:
         """
-        실적 발표 캘린더 (FMP 미사용으로 인해 빈 리스트 반환 or 추후 Finnhub 유료 기능 연동)
+        실적 발표 캘린더 (FMP API 사용, FMP_API_KEY가 없으면 빈 리스트)
+        Returns: list of dictionary
         """
-        # 현재 FMP를 사용하지 않으므로 빈 리스트 반환
-        return []
+        if not self.fmp_api_key:
+            logger.warning("FMP API Key가 없어 캘린더 조회 불가")
+            return []
+
+        if not from_date:
+            from_date = datetime.now().strftime("%Y-%m-%d")
+        if not to_date:
+            to_date = (datetime.now() + timedelta(days=14)).strftime("%Y-%m-%d")
+
+        try:
+            url = f"{self.FMP_BASE_URL}/earning_calendar"
+            params = {
+                "from": from_date,
+                "to": to_date,
+                "apikey": self.fmp_api_key,
+            }
+            response = self.session.get(url, params=params, timeout=10)
+            response.raise_for_status()
+
+            data = response.json()
+            if isinstance(data, list):
+                return data
+            return []
+
+        except Exception as e:
+            logger.error(f"FMP Earnings Calendar API error: {e}")
+            return []
 
     # ========== 유틸리티 ==========
 
@@ -412,13 +859,81 @@ class StockAPIClient:
 
 # 싱글톤 인스턴스
 _client = None
+_client_lock = threading.Lock()
+
+# 프로세스 공용 HTTP 세션 / 응답 캐시
+_session = None
+_cache = None
+_cache_configured = False  # STOCK_API_CACHE_SIZE는 최초 호출 때 한 번만 읽음
+_shared_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get or create the process-wide HTTP session (keep-alive connection pool)
+    풀 크기는 동시에 호출할 수 있는 실행기 폭에 맞춤 (STOCK_API_POOL_SIZE,
+    기본값 DATA_RETRIEVER_WORKERS / STOCK_API_WORKERS 중 큰 값)
+    """
+    global _session
+    if _session is None:
+        with _shared_lock:
+            if _session is None:
+                pool_size = int(
+                    os.getenv("STOCK_API_POOL_SIZE")
+                    or max(
+                        int(os.getenv("DATA_RETRIEVER_WORKERS", "32")),
+                        int(os.getenv("STOCK_API_WORKERS", "8")),
+                    )
+                )
+                session = requests.Session()
+                # 재시도는 _send의 429 처리와 차단기가 담당
+                adapter = HTTPAdapter(
+                    pool_connections=4, pool_maxsize=pool_size, max_retries=0
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get or create the process-wide Finnhub response cache (STOCK_API_CACHE_SIZE=0이면 None)"""
+    global _cache, _cache_configured
+    if not _cache_configured:
+        with _shared_lock:
+            if not _cache_configured:
+                cache_size = int(os.getenv("STOCK_API_CACHE_SIZE", "2048"))
+                if cache_size > 0:
+                    _cache = ResponseCache(max_entries=cache_size)
+                _cache_configured = True
+    return _cache
+
+
+# get_quotes 동시 호출용 공용 실행기 (STOCK_API_WORKERS)
+_quote_executor = None
+_quote_executor_lock = threading.Lock()
+
+
+def get_quote_executor() -> ThreadPoolExecutor:
+    """Get or create the process-wide executor for multi-symbol quotes"""
+    global _quote_executor
+    if _quote_executor is None:
+        with _quote_executor_lock:
+            if _quote_executor is None:
+                _quote_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("STOCK_API_WORKERS", "8")),
+                    thread_name_prefix="stock-api",
+                )
+    return _quote_executor
 
 
 def get_stock_api_client() -> StockAPIClient:
     """Get or create Stock API client singleton"""
     global _client
     if _client is None:
-        _client = StockAPIClient()
+        with _client_lock:
+            if _client is None:
+                _client = StockAPIClient()
     return _client
 
 
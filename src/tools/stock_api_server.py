@@ -14,7 +14,7 @@ start_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if start_path not in sys.path:
     sys.path.append(start_path)
 
-from data.stock_api_client import get_stock_api_client
+from tools.stock_api_client import get_stock_api_client
 
 # 환경 변수 로드
 load_dotenv()
@@ -0,0 +1,6 @@
+"""pytest 공용 설정 - app.py와 같이 src를 import 경로에 추가"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -0,0 +1,103 @@
+"""BM25Index - 빌드/로드, 점수 순위, 공유 metadata, 재빌드 감지"""
+
+import json
+
+from rag.bm25_index import BM25Index, tokenize
+from rag.local_index import LocalVectorIndex
+
+DOCUMENTS = [
+    {"id": 1, "content": "Apple iPhone revenue grew", "metadata": {"ticker": "AAPL"}},
+    {"id": 2, "content": "TSMC supplies chips to Apple and Nvidia", "metadata": {"ticker": "TSM"}},
+    {"id": 3, "content": "Nvidia data center GPU demand", "metadata": {"ticker": "NVDA"}},
+]
+
+
+def _loaded(tmp_path, documents=DOCUMENTS) -> BM25Index:
+    index = BM25Index(index_dir=tmp_path)
+    index.build(documents)
+    assert index.load()
+    return index
+
+
+def test_tokenize_drops_stopwords_and_single_letters():
+    assert tokenize("The iPhone is a 반도체 product, x") == ["iphone", "반도체", "product"]
+
+
+def test_search_ranks_by_bm25(tmp_path):
+    index = _loaded(tmp_path)
+
+    results = index.search("apple revenue", k=2)
+    assert [doc["id"] for doc in results] == [1, 2]
+    assert results[0]["bm25_score"] > results[1]["bm25_score"] > 0
+    assert results[0]["content"] == DOCUMENTS[0]["content"]
+    assert index.search("unknownterm") == []
+
+
+def test_search_applies_metadata_filter(tmp_path):
+    index = _loaded(tmp_path)
+    results = index.search("apple nvidia", filter_dict={"ticker": "NVDA"})
+    assert [doc["id"] for doc in results] == [3]
+
+
+def test_search_before_load_starts_background_load(tmp_path):
+    BM25Index(index_dir=tmp_path).build(DOCUMENTS)
+    index = BM25Index(index_dir=tmp_path)
+
+    index.search("apple")  # 쿼리 경로에서는 로드를 시작만 함
+    assert index._loader is not None
+    index._loader.join()
+    assert index.is_loaded and len(index) == 3
+
+
+def test_reloads_after_rebuild(tmp_path):
+    index = _loaded(tmp_path)
+    index.reload_interval = 0
+
+    BM25Index(index_dir=tmp_path).build(
+        DOCUMENTS + [{"id": 4, "content": "Apple services margin", "metadata": {}}]
+    )
+    assert index.ensure_loaded()  # 재로드 동안 기존 인덱스로 검색
+    index.start_background_load().join()
+    assert len(index) == 4
+    assert index.search("services")[0]["id"] == 4
+
+
+def test_rejects_arrays_from_a_different_build(tmp_path):
+    index = _loaded(tmp_path)
+    meta_path = tmp_path / BM25Index.META_FILE
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["version"] = "other-build"
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    assert not BM25Index(index_dir=tmp_path).load()
+    assert index.search("apple")  # 이미 로드한 인덱스는 그대로 사용
+
+
+def _write_vector_meta(tmp_path, version: str):
+    documents = {
+        "ids": [doc["id"] for doc in DOCUMENTS],
+        "contents": [doc["content"] for doc in DOCUMENTS],
+        "metadatas": [doc["metadata"] for doc in DOCUMENTS],
+    }
+    (tmp_path / LocalVectorIndex.META_FILE).write_text(json.dumps(documents), encoding="utf-8")
+    (tmp_path / LocalVectorIndex.VERSION_FILE).write_text(version)
+
+
+def test_build_from_local_index_shares_documents(tmp_path):
+    _write_vector_meta(tmp_path, "v1")
+    BM25Index(index_dir=tmp_path).build_from_local_index()
+
+    meta = json.loads((tmp_path / BM25Index.META_FILE).read_text(encoding="utf-8"))
+    assert "contents" not in meta and meta["documents_version"] == "v1"
+
+    index = BM25Index(index_dir=tmp_path)
+    assert index.load()
+    assert index.search("gpu")[0]["metadata"] == {"ticker": "NVDA"}
+
+
+def test_shared_documents_from_another_vector_build_are_rejected(tmp_path):
+    _write_vector_meta(tmp_path, "v1")
+    BM25Index(index_dir=tmp_path).build_from_local_index()
+    (tmp_path / LocalVectorIndex.VERSION_FILE).write_text("v2")
+
+    assert not BM25Index(index_dir=tmp_path).load()
@@ -0,0 +1,93 @@
+"""CircuitBreaker - open 임계치, half_open 시험 호출, backoff, 백그라운드 probe"""
+
+import time
+
+from tools.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _wait_until(condition, timeout: float = 2.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def _open(breaker: CircuitBreaker, probe=None):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure("boom", probe=probe)
+    assert breaker.state == OPEN
+
+
+def test_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=60)
+    breaker.record_failure("boom")
+    breaker.record_failure("boom")
+    assert breaker.allow()
+
+    breaker.record_failure("boom")
+    assert not breaker.allow()
+    health = breaker.get_health()
+    assert (health["state"], health["opened"], health["rejected"]) == (OPEN, 1, 1)
+    assert health["last_error"] == "boom"
+
+
+def test_success_clears_recent_failures():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    breaker.record_failure("boom")
+    breaker.record_success()
+    breaker.record_failure("boom")
+    assert breaker.state == CLOSED
+
+
+def test_failures_outside_window_do_not_open():
+    breaker = CircuitBreaker("test", failure_threshold=2, window=0.05)
+    breaker.record_failure("boom")
+    time.sleep(0.06)
+    breaker.record_failure("boom")
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_one_trial_call():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+    _open(breaker)
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # 시험 호출은 1건만
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_doubles_recovery_timeout():
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, recovery_timeout=0.05, max_recovery_timeout=0.08
+    )
+    _open(breaker)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure("still down")
+
+    assert breaker.state == OPEN
+    time.sleep(0.06)
+    assert not breaker.allow()  # 대기 시간이 0.08초(최대값)로 증가
+    time.sleep(0.03)
+    assert breaker.allow()
+
+
+def test_background_probe_closes_circuit():
+    probes = []
+
+    def probe():
+        probes.append(1)
+        return len(probes) >= 2  # 첫 probe는 실패, 두 번째에 복구
+
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.01)
+    _open(breaker, probe=probe)
+
+    assert _wait_until(lambda: breaker.state == CLOSED)
+    assert breaker.get_health()["probes"] == 2
@@ -0,0 +1,56 @@
+"""EmbeddingCache - 키 정규화, LRU, SQLite 디스크 캐시"""
+
+from rag.embedding_cache import EmbeddingCache, make_key
+
+
+def test_make_key_normalizes_text():
+    assert make_key("m", "  Apple   Revenue ") == make_key("m", "apple revenue")
+    assert make_key("m", "ｆｕｌｌ") == make_key("m", "full")  # NFKC
+    assert make_key("m", "apple") != make_key("other", "apple")
+
+
+def test_lru_eviction_and_stats():
+    cache = EmbeddingCache(max_entries=2)
+    cache.set("m", "a", [1.0])
+    cache.set("m", "b", [2.0])
+    assert cache.get("m", "a") == [1.0]  # a가 최근 사용
+    cache.set("m", "c", [3.0])
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+    assert cache.get("m", "c") == [3.0]
+    stats = cache.get_stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (2, 3, 1)
+
+
+def test_get_or_create_calls_factory_once():
+    cache = EmbeddingCache()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return [0.5, 0.25]
+
+    assert cache.get_or_create("m", "query", factory) == [0.5, 0.25]
+    assert cache.get_or_create("m", "QUERY", factory) == [0.5, 0.25]
+    assert len(calls) == 1
+
+
+def test_get_or_create_does_not_cache_empty_result():
+    cache = EmbeddingCache()
+    assert cache.get_or_create("m", "query", lambda: []) == []
+    assert cache.get("m", "query") is None
+
+
+def test_disk_cache_survives_new_instance(tmp_path):
+    db_path = tmp_path / "cache" / "embeddings.sqlite"
+    cache = EmbeddingCache(db_path=str(db_path))
+    cache.set("m", "vector", [0.5, -1.0])
+    cache.set("m", "translation", "번역된 검색어")
+
+    reopened = EmbeddingCache(db_path=str(db_path))
+    assert reopened.get("m", "vector") == [0.5, -1.0]
+    assert reopened.get("m", "translation") == "번역된 검색어"
+
+    reopened.clear()  # 메모리만 비우고 디스크는 유지
+    assert reopened.get("m", "vector") == [0.5, -1.0]
@@ -0,0 +1,83 @@
+"""PathEngine - 방향 무시 BFS/Dijkstra, k-최단 경로, 구간 방향, 메모이제이션"""
+
+import networkx as nx
+import pytest
+
+from rag.graph_paths import PathEngine
+from rag.graph_snapshot import GraphSnapshot
+
+# A-B-D: 2홉이지만 신뢰도 낮음 / A-C-E-D: 3홉이지만 신뢰도 높음 / X-Y: 분리된 컴포넌트
+EDGES = {
+    ("A", "B"): ("supplier", 0.2),
+    ("D", "B"): ("customer", 0.2),
+    ("A", "C"): ("partner", 0.9),
+    ("C", "E"): ("partner", 0.9),
+    ("E", "D"): ("partner", 0.9),
+    ("X", "Y"): ("competitor", 0.5),
+}
+
+
+@pytest.fixture
+def engine() -> PathEngine:
+    return PathEngine(GraphSnapshot.from_edges(EDGES, {}))
+
+
+def _tickers(engine, path):
+    return [engine.snapshot.tickers[i] for i in path]
+
+
+def _ids(engine, *tickers):
+    return [engine.snapshot.ticker_index[t] for t in tickers]
+
+
+def test_hop_count_shortest_path(engine):
+    a, d = _ids(engine, "A", "D")
+    [(path, cost)] = engine.find_paths(a, d)
+    assert _tickers(engine, path) == ["A", "B", "D"]
+    assert cost == 2.0
+
+
+def test_confidence_weighted_shortest_path(engine):
+    a, d = _ids(engine, "A", "D")
+    [(path, cost)] = engine.find_paths(a, d, weighted=True)
+    assert _tickers(engine, path) == ["A", "C", "E", "D"]
+    assert cost == pytest.approx(0.3, abs=1e-6)
+
+
+def test_k_shortest_paths_match_networkx(engine):
+    a, d = _ids(engine, "A", "D")
+    paths = engine.find_paths(a, d, k=3)
+    assert [_tickers(engine, path) for path, _ in paths] == [
+        ["A", "B", "D"],
+        ["A", "C", "E", "D"],
+    ]
+
+    graph = nx.Graph(list(EDGES))
+    expected = [len(p) - 1 for p in nx.shortest_simple_paths(graph, "A", "D")]
+    assert [cost for _, cost in paths] == expected
+
+
+def test_path_details_keep_original_direction(engine):
+    a, b, d = _ids(engine, "A", "B", "D")
+    details = engine.path_details([a, b, d])
+    assert [(s["from"], s["to"], s["direction"]) for s in details] == [
+        ("A", "B", "→"),
+        ("B", "D", "←"),
+    ]
+    assert details[1]["relationship"] == "customer"
+
+
+def test_disconnected_and_same_node(engine):
+    a, x = _ids(engine, "A", "X")
+    assert engine.find_paths(a, x) == []
+    assert engine.find_paths(a, a) == [([a], 0.0)]
+
+
+def test_results_are_memoized_with_lru_limit():
+    engine = PathEngine(GraphSnapshot.from_edges(EDGES, {}), cache_size=1)
+    a, d, x, y = _ids(engine, "A", "D", "X", "Y")
+
+    first = engine.find_paths(a, d)
+    assert engine.find_paths(a, d) is first
+    engine.find_paths(x, y)
+    assert engine.find_paths(a, d) is not first  # LRU 제거 후 다시 계산
@@ -0,0 +1,139 @@
+"""GraphSnapshot - CSR 구성, 증분 병합/중복 제거, 저장/로드, fingerprint"""
+
+import pytest
+
+from rag.graph_snapshot import GraphSnapshot
+
+ROWS = [
+    {
+        "id": 1,
+        "source_ticker": "TSM",
+        "target_ticker": "AAPL",
+        "relationship_type": "supplier",
+        "confidence": 0.9,
+        "source_company": "TSMC",
+        "target_company": "Apple",
+        "created_at": "2024-01-01T00:00:00+00:00",
+    },
+    {
+        "id": 2,
+        "source_ticker": "TSM",
+        "target_ticker": "NVDA",
+        "relationship_type": "supplier",
+        "confidence": 0.8,
+        "created_at": "2024-01-02T00:00:00+00:00",
+    },
+    {
+        "id": 3,
+        "source_ticker": "AMD",
+        "target_ticker": "NVDA",
+        "relationship_type": "competitor",
+        "confidence": None,
+        "created_at": "2024-01-03T00:00:00+00:00",
+    },
+]
+
+
+def _row(row_id, source, target, created_at, rel_type="partner"):
+    return {
+        "id": row_id,
+        "source_ticker": source,
+        "target_ticker": target,
+        "relationship_type": rel_type,
+        "confidence": 0.7,
+        "created_at": created_at,
+    }
+
+
+def test_from_rows_builds_forward_and_reverse_csr():
+    snapshot = GraphSnapshot.from_rows(ROWS)
+    assert snapshot.tickers == ["AAPL", "AMD", "NVDA", "TSM"]
+    assert (snapshot.num_nodes, snapshot.num_edges) == (4, 3)
+    assert snapshot.synced_at == "2024-01-03T00:00:00+00:00"
+
+    tsm, nvda = snapshot.ticker_index["TSM"], snapshot.ticker_index["NVDA"]
+    assert [snapshot.tickers[i] for i in snapshot.successors(tsm)] == ["AAPL", "NVDA"]
+    assert sorted(snapshot.tickers[i] for i in snapshot.predecessors(nvda)) == ["AMD", "TSM"]
+
+    edge = snapshot.find_edge(tsm, nvda)
+    assert snapshot.edge_attrs(edge)["relationship_type"] == "supplier"
+    assert snapshot.find_edge(nvda, tsm) is None
+    amd = snapshot.ticker_index["AMD"]
+    assert snapshot.edge_attrs(snapshot.find_edge(amd, nvda))["confidence"] == 0.5
+
+
+def test_edge_map_round_trip():
+    snapshot = GraphSnapshot.from_rows(ROWS)
+    names = dict(zip(snapshot.tickers, snapshot.names))
+    rebuilt = GraphSnapshot.from_edges(snapshot.edge_map(), names)
+    assert rebuilt.fingerprint == snapshot.fingerprint
+
+
+def test_merge_rows_skips_rows_already_applied():
+    snapshot = GraphSnapshot.from_rows(ROWS, lookback=86400)
+    assert snapshot.merge_rows([ROWS[-1]], lookback=86400) is snapshot
+
+    late = _row(4, "AAPL", "NVDA", "2024-01-02T12:00:00+00:00")  # 늦게 커밋된 이전 시각 행
+    merged = snapshot.merge_rows([ROWS[-1], late], lookback=86400)
+    assert merged is not snapshot
+    assert merged.num_edges == 4
+    assert merged.synced_at == snapshot.synced_at
+    assert "4" in merged.recent_ids
+    assert merged.merge_rows([late], lookback=86400) is merged
+
+
+def test_sync_start_subtracts_lookback():
+    snapshot = GraphSnapshot.from_rows(ROWS)
+    assert snapshot.sync_start(60).startswith("2024-01-02T23:59:00")
+
+
+def test_recent_ids_keep_only_the_lookback_window():
+    snapshot = GraphSnapshot.from_rows(ROWS, lookback=86400)
+    assert set(snapshot.recent_ids) == {"2", "3"}
+
+
+def test_save_and_load(tmp_path):
+    snapshot = GraphSnapshot.from_rows(ROWS, lookback=86400)
+    assert snapshot.save(tmp_path) == 1
+    assert snapshot.version == 1
+
+    loaded = GraphSnapshot.load(tmp_path)
+    assert loaded.version == 1
+    assert loaded.fingerprint == snapshot.fingerprint
+    assert loaded.recent_ids == snapshot.recent_ids
+    assert loaded.names[loaded.ticker_index["AAPL"]] == "Apple"
+
+
+def test_save_keeps_recent_versions_only(tmp_path):
+    snapshot = GraphSnapshot.from_rows(ROWS)
+    for expected in (1, 2, 3):
+        assert snapshot.save(tmp_path) == expected
+    assert sorted(p.name for p in tmp_path.glob("v*")) == ["v000002", "v000003"]
+    assert GraphSnapshot.load(tmp_path).version == 3
+
+
+def test_failed_save_keeps_version(tmp_path, monkeypatch):
+    snapshot = GraphSnapshot.from_rows(ROWS)
+    snapshot.save(tmp_path)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("rag.graph_snapshot.os.replace", fail)
+    with pytest.raises(OSError):
+        snapshot.save(tmp_path)
+    assert snapshot.version == 1
+    assert sorted(p.name for p in tmp_path.glob("v*")) == ["v000001"]
+    assert GraphSnapshot.load(tmp_path).version == 1
+
+
+def test_fingerprint_tracks_edge_attributes():
+    original = GraphSnapshot.from_rows(ROWS).fingerprint
+
+    changed = [dict(row) for row in ROWS]
+    changed[0]["confidence"] = 0.1
+    assert GraphSnapshot.from_rows(changed).fingerprint != original
+
+    retyped = [dict(row) for row in ROWS]
+    retyped[2]["relationship_type"] = "partner"
+    assert GraphSnapshot.from_rows(retyped).fingerprint != original
@@ -0,0 +1,73 @@
+"""TokenBucketLimiter - 버스트, 충전, batch 예비분, interactive 우선, 429 보류"""
+
+import threading
+import time
+
+from tools.rate_limiter import TokenBucketLimiter
+
+
+def _wait_until(condition, timeout: float = 2.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_burst_then_reject_without_waiting():
+    limiter = TokenBucketLimiter(calls_per_minute=60, burst=3, batch_reserve=0)
+    assert all(limiter.acquire(timeout=0) for _ in range(3))
+    assert not limiter.acquire(timeout=0)
+
+    lanes = limiter.get_stats()["lanes"]
+    assert lanes["interactive"]["acquired"] == 3
+    assert lanes["interactive"]["rejected"] == 1
+
+
+def test_refills_over_time():
+    limiter = TokenBucketLimiter(calls_per_minute=6000, burst=1)  # 초당 100개
+    assert limiter.acquire(timeout=0)
+    assert limiter.try_acquire() > 0
+    assert limiter.acquire(timeout=1)
+    assert limiter.get_stats()["lanes"]["interactive"]["max_wait"] > 0
+
+
+def test_batch_lane_leaves_reserve_for_interactive():
+    limiter = TokenBucketLimiter(calls_per_minute=60, burst=4, batch_reserve=0.5)
+    assert limiter.try_acquire("batch") == 0
+    assert limiter.try_acquire("batch") == 0
+    assert limiter.try_acquire("batch") > 0  # 남은 2개는 interactive 전용
+    assert limiter.try_acquire("interactive") == 0
+    assert limiter.try_acquire("interactive") == 0
+
+
+def test_batch_yields_while_interactive_is_waiting():
+    limiter = TokenBucketLimiter(calls_per_minute=60, burst=2, batch_reserve=0)
+    assert limiter.acquire(timeout=0) and limiter.acquire(timeout=0)
+
+    waiter = threading.Thread(target=limiter.acquire, kwargs={"timeout": 5})
+    waiter.start()
+    assert _wait_until(lambda: limiter.get_stats()["lanes"]["interactive"]["waiting"] == 1)
+    with limiter._cond:
+        limiter.tokens = 2.0  # 충전되어도 batch는 대기 중인 interactive에 양보
+    assert limiter.try_acquire("batch") > 0
+
+    with limiter._cond:
+        limiter._cond.notify_all()
+    waiter.join()
+    assert limiter.get_stats()["lanes"]["interactive"]["acquired"] == 3
+    assert limiter.try_acquire("batch") == 0
+
+
+def test_penalize_blocks_all_lanes():
+    limiter = TokenBucketLimiter(calls_per_minute=6000, burst=5)
+    limiter.penalize(0.2)
+    assert limiter.try_acquire() > 0
+    assert limiter.try_acquire("batch") > 0
+    assert not limiter.acquire(timeout=0.05)
+    assert limiter.acquire(timeout=1)
+
+    stats = limiter.get_stats()
+    assert stats["throttled"] == 1
+    assert stats["lanes"]["interactive"]["rejected"] == 1
@@ -0,0 +1,145 @@
+"""ResponseCache - TTL/LRU 캐시와 single-flight (성공 응답만 캐시, 예외는 대기자에게 전달)"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+
+from tools.stock_api_client import ResponseCache  # noqa: E402
+
+TTLS = {"quote": 60, "short": 0.05}
+
+
+def _always(value):
+    return True
+
+
+def _wait_until(condition, timeout: float = 2.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def _start_leader(cache, release: threading.Event, result):
+    """release될 때까지 fetch를 붙잡고 있는 첫 요청 (결과 또는 예외 반환)"""
+    started = threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(5)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def run():
+        try:
+            cache.get_or_fetch("quote", {"symbol": "AAPL"}, fetch, _always)
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert started.wait(5)
+    return thread
+
+
+def test_caches_until_ttl_expires():
+    cache = ResponseCache(ttls=TTLS)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"c": len(calls)}
+
+    assert cache.get_or_fetch("short", {"symbol": "AAPL"}, fetch, _always) == {"c": 1}
+    assert cache.get_or_fetch("short", {"symbol": "AAPL"}, fetch, _always) == {"c": 1}
+    time.sleep(0.06)
+    assert cache.get_or_fetch("short", {"symbol": "AAPL"}, fetch, _always) == {"c": 2}
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_uncached_endpoint_and_uncacheable_value_always_fetch():
+    cache = ResponseCache(ttls=TTLS)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {}
+
+    cache.get_or_fetch("profile", {}, fetch, _always)
+    cache.get_or_fetch("profile", {}, fetch, _always)
+    cache.get_or_fetch("quote", {}, fetch, lambda value: bool(value))
+    cache.get_or_fetch("quote", {}, fetch, lambda value: bool(value))
+    assert len(calls) == 4
+
+
+def test_lru_limits_entries():
+    cache = ResponseCache(max_entries=1, ttls=TTLS)
+    cache.put("quote", {"symbol": "AAPL"}, 1)
+    cache.put("quote", {"symbol": "MSFT"}, 2)
+    assert cache.peek("quote", {"symbol": "AAPL"}) is None
+    assert cache.peek("quote", {"symbol": "MSFT"}) == 2
+
+
+def test_concurrent_requests_share_one_fetch():
+    cache = ResponseCache(ttls=TTLS)
+    release = threading.Event()
+    leader = _start_leader(cache, release, {"c": 1})
+
+    results = []
+    waiter = threading.Thread(
+        target=lambda: results.append(
+            cache.get_or_fetch("quote", {"symbol": "AAPL"}, lambda: {"c": 2}, _always)
+        )
+    )
+    waiter.start()
+    assert _wait_until(lambda: cache.coalesced == 1)
+    release.set()
+    leader.join()
+    waiter.join()
+
+    assert results == [{"c": 1}]
+    assert cache.get_stats()["coalesced"] == 1
+
+
+def test_failed_fetch_is_raised_to_waiters_and_not_cached():
+    cache = ResponseCache(ttls=TTLS)
+    release = threading.Event()
+    leader = _start_leader(cache, release, ConnectionError("down"))
+
+    errors = []
+
+    def wait():
+        try:
+            cache.get_or_fetch("quote", {"symbol": "AAPL"}, lambda: {"c": 2}, _always)
+        except ConnectionError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    assert _wait_until(lambda: cache.coalesced == 1)
+    release.set()
+    leader.join()
+    waiter.join()
+
+    assert [str(e) for e in errors] == ["down"]
+    assert cache.peek("quote", {"symbol": "AAPL"}) is None
+    assert cache.get_or_fetch("quote", {"symbol": "AAPL"}, lambda: {"c": 3}, _always) == {"c": 3}
+
+
+def test_waiter_fetches_directly_after_wait_timeout():
+    cache = ResponseCache(ttls=TTLS, wait_timeout=0.05)
+    release = threading.Event()
+    leader = _start_leader(cache, release, {"c": 1})
+    try:
+        value = cache.get_or_fetch("quote", {"symbol": "AAPL"}, lambda: {"c": 2}, _always)
+        assert value == {"c": 2}
+    finally:
+        release.set()
+        leader.join()